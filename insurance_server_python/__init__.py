@@ -1,5 +1,10 @@
 """Export the FastMCP app so uvicorn can auto-discover it."""
 
-from .main import app, mcp
+from dotenv import load_dotenv
+
+# Load ``.env`` before any submodule reads configuration at import time.
+load_dotenv()
+
+from .main import app, mcp  # noqa: E402
 
 __all__ = ["app", "mcp"]
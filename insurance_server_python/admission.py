@@ -0,0 +1,234 @@
+"""Admission control for calls to the zrater rating gateway."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from .deadlines import remaining_time
+from .metrics import admission_queue_depth, admission_rejected, admission_wait
+from .utils import _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a gateway call cannot be admitted in time."""
+
+
+@asynccontextmanager
+async def _timeout_fallback(delay: float) -> AsyncIterator[None]:
+    """Cancel the block after ``delay`` seconds (``asyncio.timeout`` before 3.11)."""
+    task = asyncio.current_task()
+    assert task is not None
+    expired = False
+
+    def expire() -> None:
+        nonlocal expired
+        expired = True
+        task.cancel()
+
+    handle = asyncio.get_running_loop().call_later(delay, expire)
+    try:
+        yield
+    except asyncio.CancelledError:
+        if expired:
+            raise asyncio.TimeoutError from None
+        raise
+    finally:
+        handle.cancel()
+
+
+_timeout: Callable[[float], AsyncContextManager[None]] = getattr(
+    asyncio, "timeout", _timeout_fallback
+)
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking."""
+
+    def __init__(
+        self, rate: float, burst: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self._clock = clock
+        self.tokens = self.burst
+        self.updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it."""
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a token reserved by a caller that gave up."""
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + 1)
+
+
+class UpstreamAdmission:
+    """Global concurrency cap plus per-state token buckets and a bounded queue.
+
+    Callers wait first for their state's rate limit and then for a global
+    slot; the whole wait shares one deadline, which never extends past the
+    calling tool's own deadline. When the queue is full or the
+    deadline passes the call is rejected with :class:`AdmissionRejected`.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int = 16,
+        state_rate: float = 2.0,
+        state_burst: float = 5.0,
+        max_queue: int = 100,
+        max_wait: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[object]] = asyncio.sleep,
+    ) -> None:
+        self.max_concurrency = max(max_concurrency, 1)
+        self.state_rate = state_rate
+        self.state_burst = state_burst
+        self.max_queue = max(max_queue, 0)
+        self.max_wait = max_wait
+        self._clock = clock
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.waiting = 0
+        self.in_flight = 0
+        self.max_queue_depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    @classmethod
+    def from_env(cls) -> "UpstreamAdmission":
+        """Build the limiter from ``ZRATER_*`` admission environment variables."""
+        return cls(
+            max_concurrency=_env_int("ZRATER_MAX_CONCURRENCY", 16),
+            state_rate=_env_float("ZRATER_STATE_RATE_PER_SECOND", 2.0),
+            state_burst=_env_float("ZRATER_STATE_BURST", 5.0),
+            max_queue=_env_int("ZRATER_ADMISSION_QUEUE_LIMIT", 100),
+            max_wait=_env_float("ZRATER_ADMISSION_MAX_WAIT_SECONDS", 10.0),
+        )
+
+    def _bucket(self, state_code: str) -> TokenBucket:
+        key = state_code.upper()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(self.state_rate, self.state_burst, self._clock)
+            self._buckets[key] = bucket
+        return bucket
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives bind to the loop that first waits on them, so keep
+        # one semaphore per running loop (relevant for tests and reloads).
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        self.rejected += 1
+        admission_rejected.inc()
+        logger.warning("Rejected rating gateway call: %s", reason)
+        return AdmissionRejected(
+            f"The rating gateway is busy ({reason}); please try again shortly."
+        )
+
+    @asynccontextmanager
+    async def admit(self, state_code: Optional[str] = None) -> AsyncIterator[None]:
+        """Hold an upstream slot for the duration of the ``async with`` block.
+
+        Hold it around a single gateway attempt, not around a whole retry
+        loop, so backoff sleeps do not keep other callers waiting.
+        """
+        if self.waiting >= self.max_queue:
+            raise self._reject("admission queue is full")
+
+        started = self._clock()
+        max_wait = self.max_wait
+        remaining = remaining_time()
+        if remaining is not None:
+            max_wait = min(max_wait, max(remaining, 0.0))
+        deadline = started + max_wait
+        semaphore = self._get_semaphore()
+        self.waiting += 1
+        admission_queue_depth.inc()
+        self.max_queue_depth = max(self.max_queue_depth, self.waiting)
+        try:
+            if state_code:
+                bucket = self._bucket(state_code)
+                delay = bucket.reserve()
+                if delay > deadline - self._clock():
+                    bucket.refund()
+                    raise self._reject(f"rate limit for state {state_code.upper()}")
+                if delay > 0:
+                    try:
+                        await self._sleep(delay)
+                    except BaseException:
+                        bucket.refund()
+                        raise
+
+            if semaphore.locked():
+                remaining = deadline - self._clock()
+                acquired = False
+                try:
+                    async with _timeout(max(remaining, 0.0)):
+                        acquired = await semaphore.acquire()
+                except BaseException as exc:
+                    # A timeout or cancellation that lands once the permit
+                    # is granted must give it back.
+                    if acquired:
+                        semaphore.release()
+                    if isinstance(exc, asyncio.TimeoutError):
+                        raise self._reject("concurrency limit reached") from None
+                    raise
+            else:
+                await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+            admission_queue_depth.dec()
+
+        waited = self._clock() - started
+        admission_wait.observe(waited)
+        self.admitted += 1
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            semaphore.release()
+
+    def stats(self) -> Dict[str, float]:
+        """Return queue depth, in-flight calls, and wait time counters."""
+        return {
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+upstream_admission = UpstreamAdmission.from_env()
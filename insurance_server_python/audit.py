@@ -0,0 +1,235 @@
+"""Asynchronous NDJSON audit log of personal auto rate submissions."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any, AsyncIterator, Dict, List, Mapping, Optional, Union
+
+from .metrics import audit_records_dropped, audit_records_written, audit_write_errors
+from .serialization import dumps, loads
+from .utils import _env_bool, _env_int
+
+logger = logging.getLogger(__name__)
+
+# Relative to the working directory, so installed packages are never written to.
+DEFAULT_AUDIT_PATH = Path("audit") / "rate_requests.ndjson"
+DEBUG_PRETTY_PATH = Path(__file__).with_name("personal_auto_rate_request.json")
+
+
+def _encode_line(entry: Dict[str, Any]) -> bytes:
+    request = entry["request"]
+    if not isinstance(request, bytes):
+        return dumps(entry) + b"\n"
+    metadata = dumps({key: value for key, value in entry.items() if key != "request"})
+    return metadata[:-1] + b',"request":' + request + b"}\n"
+
+
+class RateAuditSink:
+    """Append one JSON line per rate submission from a background task.
+
+    :meth:`record` never blocks: records go onto a bounded queue and are
+    counted as dropped when it is full. The writer drains the queue in
+    batches, writes them in a worker thread, rotates the file by size, and
+    fsyncs after every batch, so a crash loses at most the batch being
+    written; batching keeps that to one fsync per burst. With
+    ``debug_pretty`` the latest request body is also written, indented, to
+    ``personal_auto_rate_request.json`` for local debugging.
+    """
+
+    def __init__(
+        self,
+        path: Path = DEFAULT_AUDIT_PATH,
+        *,
+        enabled: bool = True,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+        queue_size: int = 1000,
+        batch_size: int = 100,
+        debug_pretty: bool = False,
+        debug_pretty_path: Path = DEBUG_PRETTY_PATH,
+    ) -> None:
+        self.path = Path(path)
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backups = max(backups, 0)
+        self.queue_size = max(queue_size, 1)
+        self.batch_size = max(batch_size, 1)
+        self.debug_pretty = debug_pretty
+        self.debug_pretty_path = Path(debug_pretty_path)
+        self._queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+        self._writer: Optional["asyncio.Task[None]"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._file: Optional[IO[bytes]] = None
+        self.queued = 0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.fsyncs = 0
+        self.write_errors = 0
+
+    @classmethod
+    def from_env(cls) -> "RateAuditSink":
+        """Build the sink from ``INSURANCE_AUDIT_*`` environment variables."""
+        path = os.getenv("INSURANCE_AUDIT_PATH")
+        return cls(
+            Path(path) if path else DEFAULT_AUDIT_PATH,
+            enabled=_env_bool("INSURANCE_AUDIT_ENABLED", True),
+            max_bytes=_env_int("INSURANCE_AUDIT_MAX_BYTES", 10 * 1024 * 1024),
+            backups=_env_int("INSURANCE_AUDIT_BACKUPS", 5),
+            queue_size=_env_int("INSURANCE_AUDIT_QUEUE_SIZE", 1000),
+            batch_size=_env_int("INSURANCE_AUDIT_BATCH_SIZE", 100),
+            debug_pretty=_env_bool("INSURANCE_AUDIT_DEBUG_PRETTY", False),
+        )
+
+    def start(self) -> None:
+        """Start the writer task on the running loop if it is not running."""
+        loop = asyncio.get_running_loop()
+        if self._writer is not None and self._loop is loop and not self._writer.done():
+            return
+        # asyncio queues bind to one loop; start fresh when the loop changes.
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._writer = loop.create_task(self._run(self._queue))
+
+    async def close(self) -> None:
+        """Flush queued records, fsync, and stop the writer."""
+        writer, queue = self._writer, self._queue
+        self._writer = None
+        self._queue = None
+        if writer is not None and queue is not None and self._loop is asyncio.get_running_loop():
+            await queue.join()
+            writer.cancel()
+            try:
+                await writer
+            except asyncio.CancelledError:
+                pass
+        await asyncio.to_thread(self._close_file)
+
+    def record(
+        self,
+        request_body: Union[Mapping[str, Any], bytes],
+        *,
+        identifier: Optional[str],
+        transaction_id: Optional[str],
+        **fields: Any,
+    ) -> bool:
+        """Queue an audit record; return ``False`` if it was dropped.
+
+        ``request_body`` may be JSON bytes that were already serialized for
+        the gateway; they are spliced into the line without re-encoding.
+        """
+        if not self.enabled:
+            return False
+        self.start()
+        assert self._queue is not None
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "identifier": identifier,
+            "transactionId": transaction_id,
+            **fields,
+            "request": request_body,
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            audit_records_dropped.inc()
+            if self.dropped == 1 or self.dropped % 100 == 0:
+                logger.warning("Audit queue full; dropped %s records so far", self.dropped)
+            return False
+        self.queued += 1
+        return True
+
+    async def _run(self, queue: "asyncio.Queue[Dict[str, Any]]") -> None:
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception:
+                self.write_errors += 1
+                audit_write_errors.inc()
+                logger.exception("Failed to write %s audit records", len(batch))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    def _open(self) -> IO[bytes]:
+        if self._file is None or self._file.closed:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("ab")
+        return self._file
+
+    def _rotate(self) -> None:
+        self._close_file()
+        if self.backups > 0:
+            for index in range(self.backups - 1, 0, -1):
+                source = self.path.with_name(f"{self.path.name}.{index}")
+                if source.exists():
+                    source.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink(missing_ok=True)
+        self.rotations += 1
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> None:
+        handle = self._open()
+        handle.write(b"".join(_encode_line(entry) for entry in batch))
+        handle.flush()
+        os.fsync(handle.fileno())
+        self.fsyncs += 1
+        self.written += len(batch)
+        audit_records_written.inc(amount=len(batch))
+
+        if self.debug_pretty:
+            request = batch[-1]["request"]
+            if isinstance(request, bytes):
+                request = loads(request)
+            self.debug_pretty_path.write_text(
+                json.dumps(request, indent=2, sort_keys=True, default=str),
+                encoding="utf-8",
+            )
+
+        if self.max_bytes > 0 and handle.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _close_file(self) -> None:
+        handle, self._file = self._file, None
+        if handle is not None and not handle.closed:
+            handle.flush()
+            os.fsync(handle.fileno())
+            self.fsyncs += 1
+            handle.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth and write, drop, rotation, and fsync counters."""
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queued": self.queued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "fsyncs": self.fsyncs,
+            "write_errors": self.write_errors,
+        }
+
+
+rate_audit_sink = RateAuditSink.from_env()
+
+
+@asynccontextmanager
+async def audit_sink_lifespan() -> AsyncIterator[RateAuditSink]:
+    """Run the audit writer for the lifetime of the ASGI app."""
+    if rate_audit_sink.enabled:
+        rate_audit_sink.start()
+    try:
+        yield rate_audit_sink
+    finally:
+        await rate_audit_sink.close()
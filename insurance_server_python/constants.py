@@ -1,6 +1,7 @@
 """Constants, mappings, and enumerations for the insurance server."""
 
 from typing import Any, Dict, Mapping, Tuple, Literal, get_args
+import os
 import re
 
 # State mappings
@@ -408,12 +409,18 @@ AIS_POLICY_COVERAGE_SUMMARY = (
     + "."
 )
 
-# API endpoints
-PERSONAL_AUTO_RATE_ENDPOINT = (
-    "https://gateway.zrater.io/api/v2/linesOfBusiness/personalAuto/states"
+# API endpoints (override the base URL or either endpoint to target a local
+# gateway stand-in such as ``fake_gateway``)
+ZRATER_GATEWAY_BASE_URL = os.getenv(
+    "ZRATER_GATEWAY_BASE_URL", "https://gateway.zrater.io"
+).rstrip("/")
+PERSONAL_AUTO_RATE_ENDPOINT = os.getenv(
+    "PERSONAL_AUTO_RATE_ENDPOINT",
+    f"{ZRATER_GATEWAY_BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
 )
-PERSONAL_AUTO_RATE_RESULTS_ENDPOINT = (
-    "https://gateway.zrater.io/api/v2/linesOfBusiness/personalAuto/getRateResultsById"
+PERSONAL_AUTO_RATE_RESULTS_ENDPOINT = os.getenv(
+    "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT",
+    f"{ZRATER_GATEWAY_BASE_URL}/api/v2/linesOfBusiness/personalAuto/getRateResultsById",
 )
 
 # Default carrier information
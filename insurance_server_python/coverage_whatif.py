@@ -0,0 +1,150 @@
+"""Helpers for rating coverage variants of one quote and tabulating premiums."""
+
+from __future__ import annotations
+
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+_COVERAGE_LABELS = (
+    ("LiabilityBiLimit", "BI"),
+    ("LiabilityPdLimit", "PD"),
+    ("MedPayLimit", "MedPay"),
+    ("UninsuredMotoristBiLimit", "UMBI"),
+    ("AccidentalDeathLimit", "AD"),
+    ("UninsuredMotoristPd/CollisionDamageWaiver", "UMPD/CDW"),
+)
+
+_started_variants: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "insurance_started_variants", default=None
+)
+
+
+@contextmanager
+def track_started_variants() -> Iterator[List[str]]:
+    """Collect the identifiers of variants whose submission starts in the block.
+
+    Variants wait for a concurrency slot before they are submitted, so a call
+    that runs out of time may not have started all of them.
+    """
+    started: List[str] = []
+    token = _started_variants.set(started)
+    try:
+        yield started
+    finally:
+        _started_variants.reset(token)
+
+
+def record_started_variant(identifier: str) -> None:
+    """Note that the variant ``identifier`` is being submitted."""
+    started = _started_variants.get()
+    if started is not None:
+        started.append(identifier)
+
+
+def variant_arguments(
+    base_arguments: Mapping[str, Any],
+    coverages: Mapping[str, Any],
+    index: int,
+) -> Dict[str, Any]:
+    """Return rate request arguments for one coverage variant of the base quote.
+
+    Variant limits override the base ``PolicyCoverages``; each variant gets its
+    own ``Identifier`` so it is deduplicated, cached, and stored separately.
+    """
+    arguments = dict(base_arguments)
+    arguments["PolicyCoverages"] = {
+        **(base_arguments.get("PolicyCoverages") or {}),
+        **coverages,
+    }
+    arguments["Identifier"] = f"{base_arguments['Identifier']}-v{index + 1}"
+    return arguments
+
+
+def variant_label(coverages: Mapping[str, Any]) -> str:
+    """Return a short label such as ``BI 100/300, PD 50000``."""
+    parts = []
+    for key, label in _COVERAGE_LABELS:
+        value = coverages.get(key)
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        parts.append(f"{label} {value}")
+    return ", ".join(parts) or "Base coverages"
+
+
+def _carrier_key(result: Mapping[str, Any]) -> Optional[str]:
+    for key in ("ProductName", "productName", "ProgramName", "programName", "CarrierName", "carrierName"):
+        value = result.get(key)
+        if isinstance(value, str) and value.strip():
+            return value.strip()
+    return None
+
+
+def lowest_premiums_by_carrier(rate_results: Any) -> Dict[str, float]:
+    """Return the cheapest total premium per carrier product."""
+    if not isinstance(rate_results, Mapping):
+        return {}
+    carrier_results = rate_results.get("CarrierResults") or rate_results.get("carrierResults")
+    premiums: Dict[str, float] = {}
+    for result in carrier_results or []:
+        if not isinstance(result, Mapping):
+            continue
+        carrier = _carrier_key(result)
+        premium = result.get("TotalPremium")
+        if premium is None:
+            premium = result.get("totalPremium")
+        if carrier is None or not isinstance(premium, (int, float)) or isinstance(premium, bool):
+            continue
+        premiums[carrier] = min(premium, premiums.get(carrier, premium))
+    return premiums
+
+
+def premium_matrix(variants: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Build a variants × carriers premium matrix.
+
+    Each variant mapping carries ``label``, ``coverages``, ``identifier``,
+    ``transaction_id``, ``rate_results``, ``complete``, and ``error``. Cells are
+    the lowest premium a carrier quoted for that variant, or ``None``.
+    """
+    per_variant = [lowest_premiums_by_carrier(v.get("rate_results")) for v in variants]
+    carriers: List[str] = sorted({carrier for premiums in per_variant for carrier in premiums})
+    rows = []
+    for variant, premiums in zip(variants, per_variant):
+        cells = [premiums.get(carrier) for carrier in carriers]
+        quoted = [cell for cell in cells if cell is not None]
+        rows.append(
+            {
+                "label": variant.get("label"),
+                "identifier": variant.get("identifier"),
+                "transactionId": variant.get("transaction_id"),
+                "coverages": variant.get("coverages"),
+                "premiums": cells,
+                "bestPremium": min(quoted) if quoted else None,
+                "complete": bool(variant.get("complete")),
+                "error": variant.get("error"),
+            }
+        )
+    return {"carriers": carriers, "variants": rows}
+
+
+def format_premium_matrix(matrix: Mapping[str, Any]) -> str:
+    """Render the premium matrix as a Markdown table for the model."""
+    carriers = list(matrix.get("carriers") or [])
+    header = ["Coverages", *carriers, "Best"]
+    lines = [
+        "| " + " | ".join(header) + " |",
+        "| " + " | ".join("---" for _ in header) + " |",
+    ]
+    for row in matrix.get("variants") or []:
+        if row.get("error"):
+            cells = ["error"] * len(carriers) + ["—"]
+        else:
+            cells = [
+                f"${cell:,.2f}" if cell is not None else "—" for cell in row["premiums"]
+            ]
+            best = row.get("bestPremium")
+            cells.append(f"${best:,.2f}" if best is not None else "—")
+        lines.append("| " + " | ".join([str(row.get("label")), *cells]) + " |")
+    return "\n".join(lines)
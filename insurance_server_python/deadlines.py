@@ -0,0 +1,77 @@
+"""Request deadlines shared by a tool call and the upstream calls it makes."""
+
+from __future__ import annotations
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "insurance_tool_deadline", default=None
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a tool call's time budget is already spent."""
+
+
+def current_deadline() -> Optional[float]:
+    """Return the active deadline on the ``time.monotonic`` clock, if any."""
+    return _deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Return seconds left before the active deadline, or ``None`` without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    """Return ``True`` when an active deadline has passed."""
+    remaining = remaining_time()
+    return remaining is not None and remaining <= 0
+
+
+def detached_context() -> contextvars.Context:
+    """Return a copy of the current context with no active deadline.
+
+    Work shared by several callers runs in it, so the budget of whichever
+    caller started it does not bound the others.
+    """
+    context = contextvars.copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def timeout_for(default: float) -> float:
+    """Return ``default`` clipped to the time left; raise once none is left."""
+    remaining = remaining_time()
+    if remaining is None:
+        return default
+    if remaining <= 0:
+        raise DeadlineExceeded("The tool call's time budget is exhausted.")
+    return min(default, remaining)
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float]) -> Iterator[Optional[float]]:
+    """Set a deadline ``budget`` seconds from now for the enclosed code.
+
+    An enclosing, earlier deadline is kept. ``None`` leaves the current
+    deadline unchanged.
+    """
+    if budget is None:
+        yield _deadline.get()
+        return
+    deadline = time.monotonic() + max(budget, 0.0)
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
@@ -0,0 +1,367 @@
+"""Local stand-in for the zrater rating gateway.
+
+The app implements the two contracts the insurance server depends on:
+
+- ``POST /api/v2/linesOfBusiness/personalAuto/states/{state_code}/rates/latest``
+  accepts a rate request and returns ``{"transactionId": ...}``.
+- ``GET /api/v2/linesOfBusiness/personalAuto/getRateResultsById?Id=...``
+  returns the carrier results rated so far for that transaction.
+
+Each requested carrier product finishes at a random point inside the
+configured rating window, so early polls see partial results. Latency, result
+size, and 429/5xx injection are configurable, which lets load tests and
+benchmarks run without touching gateway.zrater.io. Run it with::
+
+    python -m insurance_server_python.fake_gateway --port 8100
+
+and start the server with ``ZRATER_GATEWAY_BASE_URL=http://127.0.0.1:8100``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from .constants import (
+    AIS_LIABILITY_BI_LIMITS,
+    AIS_LIABILITY_PD_LIMITS,
+    DEFAULT_CARRIER_INFORMATION,
+)
+from .utils import _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+RATE_PATH = "/api/v2/linesOfBusiness/personalAuto/states/{state_code}/rates/latest"
+RESULTS_PATH = "/api/v2/linesOfBusiness/personalAuto/getRateResultsById"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+_PLAN_TEMPLATES = (
+    ("Full Pay", "Paid In Full", 0),
+    ("Monthly Card", "Standard", 5),
+    ("Monthly EFT", "Electronic Funds Transfer", 5),
+    ("Monthly Invoice", "Default", 5),
+)
+
+
+@dataclass
+class FakeGatewaySettings:
+    """Behaviour knobs for the gateway stand-in."""
+
+    latency: str = "fixed"
+    latency_mean: float = 0.05
+    latency_spread: float = 0.0
+    rating_seconds: float = 3.0
+    plans_per_product: int = 4
+    error_rate_429: float = 0.0
+    error_rate_5xx: float = 0.0
+    seed: Optional[int] = None
+    max_transactions: int = 10000
+    transaction_ttl: float = 600.0
+
+    @classmethod
+    def from_env(cls) -> "FakeGatewaySettings":
+        """Build settings from ``FAKE_GATEWAY_*`` environment variables."""
+        seed = os.getenv("FAKE_GATEWAY_SEED")
+        return cls(
+            latency=os.getenv("FAKE_GATEWAY_LATENCY", cls.latency),
+            latency_mean=_env_float("FAKE_GATEWAY_LATENCY_MEAN_SECONDS", cls.latency_mean),
+            latency_spread=_env_float("FAKE_GATEWAY_LATENCY_SPREAD", cls.latency_spread),
+            rating_seconds=_env_float("FAKE_GATEWAY_RATING_SECONDS", cls.rating_seconds),
+            plans_per_product=_env_int("FAKE_GATEWAY_PLANS_PER_PRODUCT", cls.plans_per_product),
+            error_rate_429=_env_float("FAKE_GATEWAY_429_RATE", cls.error_rate_429),
+            error_rate_5xx=_env_float("FAKE_GATEWAY_5XX_RATE", cls.error_rate_5xx),
+            seed=int(seed) if seed and seed.strip().isdigit() else None,
+            max_transactions=_env_int("FAKE_GATEWAY_MAX_TRANSACTIONS", cls.max_transactions),
+            transaction_ttl=_env_float(
+                "FAKE_GATEWAY_TRANSACTION_TTL_SECONDS", cls.transaction_ttl
+            ),
+        )
+
+
+def _coverage_factor(coverages: Mapping[str, Any]) -> float:
+    """Scale premiums with the requested liability limits so variants differ."""
+    factor = 1.0
+    bi_limit = coverages.get("LiabilityBiLimit")
+    if bi_limit in AIS_LIABILITY_BI_LIMITS:
+        factor += 0.06 * (AIS_LIABILITY_BI_LIMITS.index(bi_limit) % 7)
+    pd_limit = coverages.get("LiabilityPdLimit")
+    if pd_limit in AIS_LIABILITY_PD_LIMITS:
+        factor += 0.02 * (AIS_LIABILITY_PD_LIMITS.index(pd_limit) % 7)
+    return factor
+
+
+@dataclass
+class _Transaction:
+    transaction_id: str
+    state_code: str
+    created_at: float
+    products: List[Mapping[str, Any]]
+    ready_after: List[float]
+    base_premiums: List[float]
+    coverages: Mapping[str, Any] = field(default_factory=dict)
+
+
+class FakeGateway:
+    """In-memory rating engine behind the stand-in routes.
+
+    Transactions are forgotten ``transaction_ttl`` seconds after submission,
+    and the least recently polled ones are evicted beyond
+    ``max_transactions``, so long load tests run in bounded memory.
+    """
+
+    def __init__(self, settings: Optional[FakeGatewaySettings] = None) -> None:
+        self.settings = settings or FakeGatewaySettings.from_env()
+        if self.settings.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution {self.settings.latency!r}; "
+                f"expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+        self._random = random.Random(self.settings.seed)
+        self.transactions: "OrderedDict[str, _Transaction]" = OrderedDict()
+        self.requests = {"submit": 0, "results": 0, "injected_errors": 0}
+        self.evicted = 0
+
+    def sample_latency(self) -> float:
+        """Draw a response delay from the configured distribution."""
+        mean = max(self.settings.latency_mean, 0.0)
+        spread = max(self.settings.latency_spread, 0.0)
+        kind = self.settings.latency
+        if kind == "uniform":
+            return max(0.0, self._random.uniform(mean - spread, mean + spread))
+        if kind == "exponential":
+            return self._random.expovariate(1.0 / mean) if mean > 0 else 0.0
+        if kind == "lognormal":
+            if mean <= 0:
+                return 0.0
+            # ``spread`` is sigma of the underlying normal; keep the requested mean.
+            mu = math.log(mean) - spread**2 / 2
+            return self._random.lognormvariate(mu, spread)
+        return mean
+
+    def injected_error(self) -> Optional[JSONResponse]:
+        """Return a synthetic 429/5xx response according to the error rates."""
+        roll = self._random.random()
+        if roll < self.settings.error_rate_429:
+            self.requests["injected_errors"] += 1
+            return JSONResponse(
+                {"message": "Too Many Requests"}, status_code=429, headers={"Retry-After": "1"}
+            )
+        if roll < self.settings.error_rate_429 + self.settings.error_rate_5xx:
+            self.requests["injected_errors"] += 1
+            status = self._random.choice((500, 502, 503))
+            return JSONResponse({"message": "Upstream carrier error"}, status_code=status)
+        return None
+
+    def create_transaction(self, state_code: str, body: Mapping[str, Any]) -> _Transaction:
+        carrier_information = body.get("CarrierInformation") or DEFAULT_CARRIER_INFORMATION
+        products = [
+            product
+            for product in carrier_information.get("Products") or []
+            if isinstance(product, Mapping)
+        ]
+        window = max(self.settings.rating_seconds, 0.0)
+        transaction = _Transaction(
+            transaction_id=str(uuid.uuid4()),
+            state_code=state_code.upper(),
+            created_at=time.monotonic(),
+            products=products,
+            ready_after=[self._random.uniform(0, window) for _ in products],
+            base_premiums=[round(self._random.uniform(900, 2600), 2) for _ in products],
+            coverages=body.get("PolicyCoverages") or {},
+        )
+        self.transactions[transaction.transaction_id] = transaction
+        self._prune(transaction.created_at)
+        return transaction
+
+    def get_transaction(self, transaction_id: str) -> Optional[_Transaction]:
+        """Return a live transaction, refreshing its place in the LRU order."""
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            return None
+        if self._expired(transaction, time.monotonic()):
+            del self.transactions[transaction_id]
+            self.evicted += 1
+            return None
+        self.transactions.move_to_end(transaction_id)
+        return transaction
+
+    def _expired(self, transaction: _Transaction, now: float) -> bool:
+        ttl = self.settings.transaction_ttl
+        return ttl > 0 and now - transaction.created_at >= ttl
+
+    def _prune(self, now: float) -> None:
+        # Creation order is roughly expiry order, so stop at the first live entry.
+        while self.transactions:
+            oldest = next(iter(self.transactions.values()))
+            if not self._expired(oldest, now):
+                break
+            del self.transactions[oldest.transaction_id]
+            self.evicted += 1
+        limit = max(self.settings.max_transactions, 1)
+        while len(self.transactions) > limit:
+            self.transactions.popitem(last=False)
+            self.evicted += 1
+
+    def _product_records(
+        self, transaction: _Transaction, index: int
+    ) -> List[Dict[str, Any]]:
+        product = transaction.products[index]
+        total = round(
+            transaction.base_premiums[index] * _coverage_factor(transaction.coverages), 2
+        )
+        liability = transaction.coverages.get("LiabilityBiLimit") or "30/60"
+        property_damage = transaction.coverages.get("LiabilityPdLimit") or "15"
+        records = []
+        for plan_index in range(max(self.settings.plans_per_product, 1)):
+            plan_name, payment_method, installments = _PLAN_TEMPLATES[
+                plan_index % len(_PLAN_TEMPLATES)
+            ]
+            if plan_index >= len(_PLAN_TEMPLATES):
+                plan_name = f"{plan_name} {plan_index // len(_PLAN_TEMPLATES) + 1}"
+            down = total if installments == 0 else round(total * 0.18, 2)
+            record: Dict[str, Any] = {
+                "CarrierId": product.get("CarrierId"),
+                "CarrierName": product.get("CarrierName"),
+                "ProductId": product.get("ProductId"),
+                "ProductName": product.get("ProductName"),
+                "ProgramName": product.get("ProductName"),
+                "PlanName": plan_name,
+                "PaymentMethod": payment_method,
+                "TermMonths": 6,
+                "TotalPremium": total,
+                "DownPayment": down,
+                "InstallmentCount": installments,
+                "BodilyInjuryLimit": liability,
+                "PropertyDamageLimit": property_damage,
+                "UninsuredMotoristLimit": liability,
+                "PolicyFee": 39.6,
+            }
+            if installments:
+                record["InstallmentAmount"] = round((total - down) / installments + 6, 2)
+            records.append(record)
+        return records
+
+    def results_for(self, transaction: _Transaction) -> Dict[str, Any]:
+        elapsed = time.monotonic() - transaction.created_at
+        carrier_results: List[Dict[str, Any]] = []
+        for index, ready_after in enumerate(transaction.ready_after):
+            if elapsed >= ready_after:
+                carrier_results.extend(self._product_records(transaction, index))
+        return {
+            "transactionId": transaction.transaction_id,
+            "State": transaction.state_code,
+            "CarrierResults": carrier_results,
+        }
+
+
+def create_fake_gateway_app(settings: Optional[FakeGatewaySettings] = None) -> Starlette:
+    """Build the Starlette app that mimics the zrater gateway."""
+    gateway = FakeGateway(settings)
+
+    async def _delay() -> None:
+        latency = gateway.sample_latency()
+        if latency > 0:
+            await asyncio.sleep(latency)
+
+    async def submit(request: Request) -> JSONResponse:
+        gateway.requests["submit"] += 1
+        await _delay()
+        error = gateway.injected_error()
+        if error is not None:
+            return error
+        try:
+            body = await request.json()
+        except ValueError:
+            return JSONResponse({"message": "Request body must be JSON"}, status_code=400)
+        if not isinstance(body, Mapping):
+            return JSONResponse({"message": "Request body must be an object"}, status_code=400)
+        transaction = gateway.create_transaction(request.path_params["state_code"], body)
+        return JSONResponse({"transactionId": transaction.transaction_id})
+
+    async def results(request: Request) -> JSONResponse:
+        gateway.requests["results"] += 1
+        await _delay()
+        error = gateway.injected_error()
+        if error is not None:
+            return error
+        transaction = gateway.get_transaction(request.query_params.get("Id", ""))
+        if transaction is None:
+            return JSONResponse({"message": "Unknown transaction"}, status_code=404)
+        return JSONResponse(gateway.results_for(transaction))
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(
+            {
+                **gateway.requests,
+                "transactions": len(gateway.transactions),
+                "evicted_transactions": gateway.evicted,
+            }
+        )
+
+    app = Starlette(
+        routes=[
+            Route(RATE_PATH, submit, methods=["POST"]),
+            Route(RESULTS_PATH, results, methods=["GET"]),
+            Route("/_stats", stats, methods=["GET"]),
+        ]
+    )
+    app.state.gateway = gateway
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the stand-in with uvicorn."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS)
+    parser.add_argument("--latency-mean", type=float)
+    parser.add_argument("--latency-spread", type=float)
+    parser.add_argument("--rating-seconds", type=float)
+    parser.add_argument("--plans-per-product", type=int)
+    parser.add_argument("--error-rate-429", type=float)
+    parser.add_argument("--error-rate-5xx", type=float)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--max-transactions", type=int)
+    parser.add_argument("--transaction-ttl", type=float)
+    args = parser.parse_args(argv)
+
+    settings = FakeGatewaySettings.from_env()
+    for name in (
+        "latency",
+        "latency_mean",
+        "latency_spread",
+        "rating_seconds",
+        "plans_per_product",
+        "error_rate_429",
+        "error_rate_5xx",
+        "seed",
+        "max_transactions",
+        "transaction_ttl",
+    ):
+        value = getattr(args, name)
+        if value is not None:
+            setattr(settings, name, value)
+
+    import uvicorn
+
+    uvicorn.run(create_fake_gateway_app(settings), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""Shared upstream HTTP client for the zrater rating gateway."""
+
+from __future__ import annotations
+
+import importlib.util
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from .deadlines import remaining_time, timeout_for
+from .utils import _env_bool, _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPSTREAM_TIMEOUT_SECONDS = 15.0
+
+
+@dataclass(frozen=True)
+class UpstreamClientSettings:
+    """Connection pool settings for the shared upstream client."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = DEFAULT_UPSTREAM_TIMEOUT_SECONDS
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "UpstreamClientSettings":
+        """Build settings from ``ZRATER_*`` environment variables."""
+        return cls(
+            max_connections=_env_int("ZRATER_MAX_CONNECTIONS", cls.max_connections),
+            max_keepalive_connections=_env_int(
+                "ZRATER_MAX_KEEPALIVE_CONNECTIONS", cls.max_keepalive_connections
+            ),
+            keepalive_expiry=_env_float(
+                "ZRATER_KEEPALIVE_EXPIRY_SECONDS", cls.keepalive_expiry
+            ),
+            timeout=_env_float("ZRATER_TIMEOUT_SECONDS", cls.timeout),
+            http2=_env_bool("ZRATER_HTTP2", cls.http2),
+        )
+
+
+class _RequestTrace:
+    """httpcore trace callback that records whether a new connection was opened."""
+
+    __slots__ = ("opened_connection",)
+
+    def __init__(self) -> None:
+        self.opened_connection = False
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self.opened_connection = True
+
+
+class UpstreamConnectionStats:
+    """Counters describing how often pooled connections are reused."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+
+    async def on_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+        request.extensions["trace"] = _RequestTrace()
+
+    async def on_response(self, response: httpx.Response) -> None:
+        trace = response.request.extensions.get("trace")
+        if not isinstance(trace, _RequestTrace):
+            return
+        if trace.opened_connection:
+            self.connections_opened += 1
+        else:
+            self.connections_reused += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "connections_opened": self.connections_opened,
+            "connections_reused": self.connections_reused,
+        }
+
+
+_client: Optional[httpx.AsyncClient] = None
+_stats = UpstreamConnectionStats()
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def create_upstream_client(
+    settings: Optional[UpstreamClientSettings] = None,
+    *,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Create a pooled client configured for the rating gateway."""
+    settings = settings or UpstreamClientSettings.from_env()
+    http2 = settings.http2
+    if http2 and transport is None and not _http2_available():
+        logger.warning(
+            "ZRATER_HTTP2 is enabled but the 'h2' package is not installed; "
+            "falling back to HTTP/1.1."
+        )
+        http2 = False
+
+    kwargs: Dict[str, Any] = {}
+    if transport is not None:
+        kwargs["transport"] = transport
+    else:
+        kwargs["http2"] = http2
+
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(settings.timeout),
+        limits=httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        event_hooks={
+            "request": [_stats.on_request],
+            "response": [_stats.on_response],
+        },
+        **kwargs,
+    )
+
+
+def get_upstream_client() -> httpx.AsyncClient:
+    """Return the shared upstream client, creating it on first use.
+
+    The ASGI lifespan normally opens the client at startup; the lazy path keeps
+    handlers usable when they are invoked outside the app (scripts, tests).
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        logger.debug("Creating shared upstream HTTP client outside of app lifespan")
+        _client = create_upstream_client()
+    return _client
+
+
+async def close_upstream_client() -> None:
+    """Close the shared upstream client if it is open."""
+    global _client
+    client, _client = _client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def upstream_client_lifespan() -> AsyncIterator[httpx.AsyncClient]:
+    """Open the shared upstream client for the lifetime of the ASGI app."""
+    global _client
+    settings = UpstreamClientSettings.from_env()
+    await close_upstream_client()
+    _client = create_upstream_client(settings)
+    logger.info(
+        "Opened upstream HTTP client (max_connections=%s, max_keepalive=%s, http2=%s)",
+        settings.max_connections,
+        settings.max_keepalive_connections,
+        settings.http2,
+    )
+    try:
+        yield _client
+    finally:
+        await close_upstream_client()
+
+
+def upstream_timeout(client: httpx.AsyncClient) -> httpx.Timeout:
+    """Return the client's timeouts clipped to the active tool deadline."""
+    configured = client.timeout
+    remaining = remaining_time()
+    if remaining is None:
+        return configured
+    limit = timeout_for(remaining)
+    return httpx.Timeout(
+        connect=min(configured.connect, limit) if configured.connect is not None else limit,
+        read=min(configured.read, limit) if configured.read is not None else limit,
+        write=min(configured.write, limit) if configured.write is not None else limit,
+        pool=min(configured.pool, limit) if configured.pool is not None else limit,
+    )
+
+
+def upstream_client_stats() -> Dict[str, int]:
+    """Return connection reuse counters for the shared upstream client."""
+    return _stats.snapshot()
@@ -0,0 +1,107 @@
+"""Deduplication of identical personal auto rate submissions."""
+
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Union
+
+from .serialization import dumps_canonical
+from .utils import _env_float, _env_int
+
+
+def canonical_request_hash(request_body: Union[Mapping[str, Any], bytes]) -> str:
+    """Return a stable SHA-256 hex digest of a sanitized rate request body.
+
+    ``request_body`` may already be serialized with
+    :func:`serialization.dumps_canonical`, in which case the bytes are hashed
+    as they are.
+    """
+    if not isinstance(request_body, bytes):
+        request_body = dumps_canonical(request_body)
+    return hashlib.sha256(request_body).hexdigest()
+
+
+@dataclass(frozen=True)
+class RateSubmission:
+    """Outcome of a successful POST to the rating gateway."""
+
+    transaction_id: Optional[str]
+    status: int
+    response: Any
+
+
+class RecentSubmissions:
+    """Remember recent submissions by request hash for a configurable window."""
+
+    def __init__(
+        self,
+        *,
+        window: float = 120.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = window
+        self.max_entries = max(max_entries, 0)
+        self._clock = clock
+        self._entries: "OrderedDict[str, tuple[float, RateSubmission]]" = OrderedDict()
+        self._transactions: "OrderedDict[str, str]" = OrderedDict()
+        self.deduplicated = 0
+
+    @classmethod
+    def from_env(cls) -> "RecentSubmissions":
+        """Build the index from ``INSURANCE_RATE_DEDUP_*`` environment variables."""
+        return cls(
+            window=_env_float("INSURANCE_RATE_DEDUP_WINDOW_SECONDS", 120.0),
+            max_entries=_env_int("INSURANCE_RATE_DEDUP_MAX_ENTRIES", 1024),
+        )
+
+    def get(self, request_hash: str) -> Optional[RateSubmission]:
+        """Return the submission recorded for ``request_hash`` inside the window."""
+        record = self._entries.get(request_hash)
+        if record is None:
+            return None
+        expires_at, submission = record
+        if expires_at <= self._clock():
+            del self._entries[request_hash]
+            return None
+        self.deduplicated += 1
+        return submission
+
+    def record(self, request_hash: str, submission: RateSubmission) -> None:
+        """Remember ``submission`` for ``request_hash``."""
+        if self.window <= 0 or self.max_entries == 0 or not submission.transaction_id:
+            return
+        self._entries[request_hash] = (self._clock() + self.window, submission)
+        self._entries.move_to_end(request_hash)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def remember_identifier(self, identifier: str, transaction_id: Optional[str]) -> None:
+        """Map a quote identifier to its transaction, bounded by ``max_entries``."""
+        if not transaction_id or self.max_entries == 0:
+            return
+        key = identifier.strip().lower()
+        self._transactions[key] = transaction_id
+        self._transactions.move_to_end(key)
+        while len(self._transactions) > self.max_entries:
+            self._transactions.popitem(last=False)
+
+    def transaction_for(self, identifier: str) -> Optional[str]:
+        """Return the transaction last submitted for a quote identifier."""
+        return self._transactions.get(identifier.strip().lower())
+
+    def clear(self) -> None:
+        """Forget every recorded submission."""
+        self._entries.clear()
+        self._transactions.clear()
+        self.deduplicated = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of remembered and deduplicated submissions."""
+        return {"entries": len(self._entries), "deduplicated": self.deduplicated}
+
+
+recent_submissions = RecentSubmissions.from_env()
@@ -0,0 +1,163 @@
+"""Production launcher for the insurance MCP server.
+
+``python -m insurance_server_python.launcher --workers 4`` runs uvicorn with
+several worker processes, uvloop and httptools when they are installed, and
+explicit backlog and keep-alive settings. Every option falls back on an
+``INSURANCE_*`` environment variable. With more than one worker the launcher
+points ``INSURANCE_SHARED_STATE_PATH`` at a SQLite file in a private
+temporary directory (unless it is already set) so the workers share rate results and submission deduplication instead
+of each calling the gateway on its own.
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import importlib.util
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from .utils import _env_int
+
+logger = logging.getLogger(__name__)
+
+APP = "insurance_server_python.main:app"
+
+
+def _available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def resolve_workers(raw: str) -> int:
+    """Return the worker count for ``raw`` (a number, or ``auto`` for one per CPU)."""
+    if raw.strip().lower() == "auto":
+        return os.cpu_count() or 1
+    return max(int(raw), 1)
+
+
+def resolve_loop(name: str) -> str:
+    """Return ``uvloop`` for ``auto`` when it is installed, else ``asyncio``."""
+    if name == "auto":
+        return "uvloop" if _available("uvloop") else "asyncio"
+    return name
+
+
+def resolve_http(name: str) -> str:
+    """Return ``httptools`` for ``auto`` when it is installed, else ``h11``."""
+    if name == "auto":
+        return "httptools" if _available("httptools") else "h11"
+    return name
+
+
+@dataclass(frozen=True)
+class LaunchSettings:
+    """Options passed to :func:`uvicorn.run`."""
+
+    host: str = "0.0.0.0"
+    port: int = 8000
+    workers: int = 1
+    loop: str = "auto"
+    http: str = "auto"
+    backlog: int = 2048
+    keep_alive: int = 5
+
+    def uvicorn_options(self) -> Dict[str, Any]:
+        return {
+            "host": self.host,
+            "port": self.port,
+            "workers": self.workers,
+            "loop": resolve_loop(self.loop),
+            "http": resolve_http(self.http),
+            "backlog": self.backlog,
+            "timeout_keep_alive": self.keep_alive,
+        }
+
+
+def parse_args(argv: Optional[List[str]] = None) -> LaunchSettings:
+    """Read launch settings from ``argv``, defaulting to the environment."""
+    parser = argparse.ArgumentParser(description="Run the insurance MCP server.")
+    parser.add_argument("--host", default=os.getenv("INSURANCE_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=_env_int("INSURANCE_PORT", 8000))
+    parser.add_argument(
+        "--workers",
+        default=os.getenv("INSURANCE_WORKERS", "1"),
+        help="Worker processes, or 'auto' for one per CPU.",
+    )
+    parser.add_argument(
+        "--loop",
+        choices=("auto", "asyncio", "uvloop"),
+        default=os.getenv("INSURANCE_EVENT_LOOP", "auto"),
+    )
+    parser.add_argument(
+        "--http",
+        choices=("auto", "h11", "httptools"),
+        default=os.getenv("INSURANCE_HTTP_PARSER", "auto"),
+    )
+    parser.add_argument("--backlog", type=int, default=_env_int("INSURANCE_BACKLOG", 2048))
+    parser.add_argument(
+        "--keep-alive",
+        type=int,
+        default=_env_int("INSURANCE_KEEPALIVE_SECONDS", 5),
+        help="Seconds an idle keep-alive connection stays open.",
+    )
+    args = parser.parse_args(argv)
+    try:
+        workers = resolve_workers(args.workers)
+    except ValueError:
+        parser.error(f"--workers must be a number or 'auto', not {args.workers!r}")
+    return LaunchSettings(
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        keep_alive=args.keep_alive,
+    )
+
+
+def prepare_shared_state(settings: LaunchSettings) -> Optional[str]:
+    """Make sure multi-worker runs share state; return the path in use.
+
+    Worker processes inherit the environment, so setting the variable here
+    is enough for every worker to open the same file. A default file goes in
+    a new directory only this user can open (``mkdtemp`` creates it with mode
+    0700), so other local users cannot plant or read the database; the
+    directory is removed when the launcher exits.
+    """
+    path = os.getenv("INSURANCE_SHARED_STATE_PATH", "").strip()
+    if settings.workers > 1 and not path:
+        directory = tempfile.mkdtemp(prefix=f"insurance-shared-state-{settings.port}-")
+        atexit.register(shutil.rmtree, directory, True)
+        path = os.path.join(directory, "shared-state.sqlite3")
+        os.environ["INSURANCE_SHARED_STATE_PATH"] = path
+        logger.info("Sharing worker state through %s", path)
+    return path or None
+
+
+def main(argv: Optional[List[str]] = None) -> None:  # pragma: no cover - starts a server
+    import uvicorn
+
+    logging.basicConfig(level=logging.INFO)
+    settings = parse_args(argv)
+    prepare_shared_state(settings)
+    options = settings.uvicorn_options()
+    logger.info(
+        "Starting %d worker(s) on %s:%d (loop=%s, http=%s, backlog=%d, keep-alive=%ds)",
+        settings.workers,
+        settings.host,
+        settings.port,
+        options["loop"],
+        options["http"],
+        settings.backlog,
+        settings.keep_alive,
+    )
+    uvicorn.run(APP, **options)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,269 @@
+"""Logging setup: background log I/O, payload caps, and body sampling.
+
+``configure_logging`` routes every record through a
+:class:`logging.handlers.QueueHandler` so stream writes run on a
+:class:`logging.handlers.QueueListener` thread instead of the event loop.
+Network payloads are wrapped in :class:`CappedPayload`, which is only turned
+into text on that thread when a record is actually emitted and is cut to a
+byte limit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from .utils import _env_bool, _env_float, _env_int, _sanitize_headers_for_logging
+
+upstream_logger = logging.getLogger("insurance.upstream")
+
+_RESERVED_RECORD_FIELDS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+class CappedPayload:
+    """Defer serializing a payload until it is logged, then cap its size."""
+
+    __slots__ = ("value", "max_bytes")
+
+    def __init__(self, value: Any, max_bytes: int) -> None:
+        self.value = value
+        self.max_bytes = max_bytes
+
+    def __str__(self) -> str:
+        value = self.value
+        if isinstance(value, bytes):
+            raw = value
+        elif isinstance(value, str):
+            raw = value.encode("utf-8", "replace")
+        else:
+            from .serialization import dumps
+
+            raw = dumps(value)
+        if self.max_bytes <= 0 or len(raw) <= self.max_bytes:
+            return raw.decode("utf-8", "replace")
+        clipped = raw[: self.max_bytes].decode("utf-8", "ignore")
+        return f"{clipped}…(+{len(raw) - self.max_bytes} bytes)"
+
+    __repr__ = __str__
+
+
+@dataclass
+class PayloadLogPolicy:
+    """How much of each network payload to log at INFO."""
+
+    max_bytes: int = 2048
+    sample_rate: float = 0.01
+    rng: Callable[[], float] = random.random
+
+    @classmethod
+    def from_env(cls) -> "PayloadLogPolicy":
+        """Build the policy from ``INSURANCE_LOG_PAYLOAD_*`` environment variables."""
+        return cls(
+            max_bytes=_env_int("INSURANCE_LOG_PAYLOAD_MAX_BYTES", 2048),
+            sample_rate=_env_float("INSURANCE_LOG_PAYLOAD_SAMPLE_RATE", 0.01),
+        )
+
+    def body(self, value: Any) -> Any:
+        """Return a capped, lazily formatted body, or a marker when not sampled."""
+        if value is None:
+            return None
+        if self.sample_rate < 1.0 and self.rng() >= self.sample_rate:
+            return "<not sampled>"
+        return CappedPayload(value, self.max_bytes)
+
+
+payload_log_policy = PayloadLogPolicy.from_env()
+
+
+def _log_network_request(
+    *, method: str, url: str, headers: Mapping[str, str], payload: Any
+) -> None:
+    """Log an outgoing network request.
+
+    At DEBUG the sanitized headers and the full payload are logged. At INFO
+    only a sampled, size-capped payload is included.
+    """
+    if upstream_logger.isEnabledFor(logging.DEBUG):
+        upstream_logger.debug(
+            "Sending %s request to %s with headers=%s payload=%s",
+            method,
+            url,
+            _sanitize_headers_for_logging(headers),
+            CappedPayload(payload, 0),
+        )
+    elif upstream_logger.isEnabledFor(logging.INFO):
+        upstream_logger.info(
+            "Sending %s request to %s payload=%s",
+            method,
+            url,
+            payload_log_policy.body(payload),
+            extra={"event": "upstream_request", "method": method, "url": url},
+        )
+
+
+def _log_network_response(
+    *, method: str, url: str, status: int, response_text: str
+) -> None:
+    """Log the response received for a network request.
+
+    The full body is logged at DEBUG; at INFO it is sampled and size-capped.
+    """
+    if upstream_logger.isEnabledFor(logging.DEBUG):
+        upstream_logger.debug(
+            "Received %s response from %s with status=%s body=%s",
+            method,
+            url,
+            status,
+            response_text,
+        )
+    elif upstream_logger.isEnabledFor(logging.INFO):
+        upstream_logger.info(
+            "Received %s response from %s with status=%s body=%s",
+            method,
+            url,
+            status,
+            payload_log_policy.body(response_text),
+            extra={
+                "event": "upstream_response",
+                "method": method,
+                "url": url,
+                "status": status,
+                "body_length": len(response_text),
+            },
+        )
+
+
+class JsonLogFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_RECORD_FIELDS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+_exception_formatter = logging.Formatter()
+
+
+class _PayloadSlot:
+    """Stand-in for a :class:`CappedPayload` while the rest of a message is formatted."""
+
+    __slots__ = ("marker",)
+
+    def __init__(self, index: int) -> None:
+        self.marker = f"\x00payload{index}\x00"
+
+    def __str__(self) -> str:
+        return self.marker
+
+    __repr__ = __str__
+
+
+class _DeferredMessage:
+    """A formatted log message whose capped payloads are rendered on emit."""
+
+    __slots__ = ("text", "payloads")
+
+    def __init__(self, text: str, payloads: List[CappedPayload]) -> None:
+        self.text = text
+        self.payloads = payloads
+
+    def __str__(self) -> str:
+        text = self.text
+        for index, payload in enumerate(self.payloads):
+            text = text.replace(_PayloadSlot(index).marker, str(payload), 1)
+        return text
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """Queue records with their message resolved but payloads still lazy.
+
+    Like :class:`QueueHandler`, the message and any traceback are formatted
+    on the calling thread, so later changes to the arguments and released
+    traceback frames cannot alter what is logged. Only :class:`CappedPayload`
+    arguments are left for the listener thread, which is where their
+    serialization cost belongs.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if isinstance(args, tuple) and any(isinstance(arg, CappedPayload) for arg in args):
+            payloads: List[CappedPayload] = []
+            slots: List[Any] = []
+            for arg in args:
+                if isinstance(arg, CappedPayload):
+                    slots.append(_PayloadSlot(len(payloads)))
+                    payloads.append(arg)
+                else:
+                    slots.append(arg)
+            message: Any = _DeferredMessage(str(record.msg) % tuple(slots), payloads)
+        else:
+            message = record.getMessage()
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging(level: int) -> None:
+    """Install root logging unless the host application already did.
+
+    ``INSURANCE_LOG_FORMAT=json`` switches to structured JSON lines and
+    ``INSURANCE_LOG_QUEUE=false`` writes synchronously (useful when debugging
+    logging itself).
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    target = logging.StreamHandler()
+    if os.getenv("INSURANCE_LOG_FORMAT", "text").strip().lower() == "json":
+        target.setFormatter(JsonLogFormatter())
+    else:
+        target.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    root.setLevel(level)
+
+    if not _env_bool("INSURANCE_LOG_QUEUE", True):
+        root.addHandler(target)
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root.addHandler(_DeferredQueueHandler(log_queue))
+    _listener = QueueListener(log_queue, target, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
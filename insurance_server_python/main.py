@@ -6,27 +6,65 @@ reusable resource so the ChatGPT client can render it inline."""
 
 from __future__ import annotations
 
+import asyncio
 import inspect
 import json
 import logging
 import os
-from copy import deepcopy
-from typing import Any, List, Mapping
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Tuple
 
 import mcp.types as types
 from dotenv import load_dotenv
 from mcp.server.fastmcp import FastMCP
 from pydantic import ValidationError
+from starlette.applications import Starlette
 from starlette.requests import Request
-from starlette.responses import JSONResponse
-
-from .widget_registry import (
-    TOOL_REGISTRY,
-    WIDGETS_BY_URI,
-    widgets,
-    _resource_description,
-    _tool_meta,
+from starlette.responses import JSONResponse, Response
+
+from .admission import upstream_admission
+from .audit import audit_sink_lifespan
+from .constants import MIME_TYPE
+from .coverage_whatif import track_started_variants
+from .deadlines import DeadlineExceeded, deadline_scope
+from .http_client import upstream_client_lifespan, upstream_client_stats
+from .log_config import configure_logging
+from .metrics import (
+    PROMETHEUS_CONTENT_TYPE,
+    listing_bytes,
+    metrics_registry,
+    tool_latency,
+    tool_result_bytes,
+    tool_result_meta_bytes,
+    validation_failures,
 )
+from .profiling import (
+    PSTATS_SORT_KEYS,
+    ProfilerBusy,
+    authorized,
+    capture_allocations,
+    capture_cprofile,
+    capture_samples,
+    clamp_duration,
+    profiling_token,
+)
+from .progress import set_session_log_level
+from .quote_store import quote_store_lifespan
+from .rate_jobs import rate_job_lifespan, rate_job_queue
+from .resilience import export_breaker_states, resilience_snapshot
+from .serialization import JSONBytesResponse, dumps
+from .shared_state import shared_state, shared_state_lifespan
+from .tool_handlers import rate_results_flight, rate_submission_flight
+from .tracing import current_span, span, start_trace, tracer, tracing_lifespan
+from .utils import _env_int, _extract_request_id
+from .widget_assets import (
+    WIDGET_ASSETS,
+    WIDGET_ASSETS_BY_PATH,
+    choose_encoding,
+    etag_matches,
+)
+from .widget_registry import TOOL_REGISTRY, registry_snapshot
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -44,9 +82,7 @@ try:
 except AttributeError:  # pragma: no cover - defensive guard for unexpected values
     _log_level_value = logging.INFO
 
-root_logger = logging.getLogger()
-if not root_logger.handlers:
-    logging.basicConfig(level=_log_level_value)
+configure_logging(_log_level_value)
 
 logger.setLevel(_log_level_value)
 
@@ -60,71 +96,127 @@ mcp = FastMCP(
 
 
 # MCP protocol handlers
-@mcp._mcp_server.list_tools()
-async def _list_tools() -> List[types.Tool]:
-    """List all available tools."""
-    return [deepcopy(registration.tool) for registration in TOOL_REGISTRY.values()]
-
-
-@mcp._mcp_server.list_resources()
-async def _list_resources() -> List[types.Resource]:
-    """List all available widget resources."""
-    return [
-        types.Resource(
-            name=widget.title,
-            title=widget.title,
-            uri=widget.template_uri,
-            description=_resource_description(widget),
-            mimeType="text/html+skybridge",
-            _meta=_tool_meta(widget),
-        )
-        for widget in widgets
-    ]
-
-
-@mcp._mcp_server.list_resource_templates()
-async def _list_resource_templates() -> List[types.ResourceTemplate]:
-    """List all available resource templates."""
-    return [
-        types.ResourceTemplate(
-            name=widget.title,
-            title=widget.title,
-            uriTemplate=widget.template_uri,
-            description=_resource_description(widget),
-            mimeType="text/html+skybridge",
-            _meta=_tool_meta(widget),
-        )
-        for widget in widgets
-    ]
+async def _list_tools_request(req: types.ListToolsRequest) -> types.ServerResult:
+    """List all available tools from the frozen registry snapshot."""
+    snapshot = registry_snapshot()
+    listing_bytes.inc("tools/list", amount=len(snapshot.list_tools_json))
+    return snapshot.list_tools
+
+
+async def _list_resources_request(req: types.ListResourcesRequest) -> types.ServerResult:
+    """List all available widget resources from the frozen registry snapshot."""
+    snapshot = registry_snapshot()
+    listing_bytes.inc("resources/list", amount=len(snapshot.list_resources_json))
+    return snapshot.list_resources
+
+
+async def _list_resource_templates_request(
+    req: types.ListResourceTemplatesRequest,
+) -> types.ServerResult:
+    """List all available resource templates from the frozen registry snapshot."""
+    snapshot = registry_snapshot()
+    listing_bytes.inc(
+        "resources/templates/list", amount=len(snapshot.list_resource_templates_json)
+    )
+    return snapshot.list_resource_templates
 
 
 async def _handle_read_resource(req: types.ReadResourceRequest) -> types.ServerResult:
-    """Handle resource read requests."""
-    widget = WIDGETS_BY_URI.get(str(req.params.uri))
-    if widget is None:
+    """Handle resource read requests with the widget's prebuilt result."""
+    asset = WIDGET_ASSETS.get(str(req.params.uri))
+    if asset is None:
         return types.ServerResult(
             types.ReadResourceResult(
                 contents=[],
                 _meta={"error": f"Unknown resource: {req.params.uri}"},
             )
         )
-
-    contents = [
-        types.TextResourceContents(
-            uri=widget.template_uri,
-            mimeType="text/html+skybridge",
-            text=widget.html,
-            _meta=_tool_meta(widget),
+    return asset.read_result
+
+
+def _extract_identifier(arguments: Mapping[str, Any]) -> Optional[str]:
+    """Return the quote identifier a tool call refers to, if it has one."""
+    for source in (arguments, arguments.get("BaseRequest")):
+        if not isinstance(source, Mapping):
+            continue
+        for key in ("Identifier", "identifier", "Id"):
+            value = source.get(key)
+            if isinstance(value, str) and value.strip():
+                return value.strip()
+    return None
+
+
+def _still_processing_result(
+    tool_name: str,
+    arguments: Mapping[str, Any],
+    time_budget: Optional[float],
+    started_variants: List[str],
+) -> types.ServerResult:
+    """Build the structured reply for a tool call that ran out of time.
+
+    What-if variants are rated as separate quotes named
+    ``<Identifier>-v<n>``; only those in ``started_variants`` were submitted
+    and can be retrieved.
+    """
+    identifier = _extract_identifier(arguments)
+    structured: Dict[str, Any] = {
+        "status": "processing",
+        "identifier": identifier,
+        "time_budget_seconds": time_budget,
+    }
+    lookup: Optional[str] = f"identifier {identifier}" if identifier else None
+    variants = arguments.get("CoverageVariants")
+    if identifier and isinstance(variants, list):
+        structured["variant_identifiers"] = list(started_variants)
+        lookup = f"identifiers {', '.join(started_variants)}" if started_variants else None
+    if lookup:
+        text = (
+            f"The {tool_name} call is still processing. Call "
+            f"retrieve-personal-auto-rate-results with {lookup} "
+            "in a few seconds to get the results."
         )
-    ]
+        if isinstance(variants, list) and len(started_variants) < len(variants):
+            text += (
+                f" The other {len(variants) - len(started_variants)} coverage variants "
+                "were not submitted; call the tool again to rate them."
+            )
+    else:
+        text = f"The {tool_name} call did not finish in time; please try again."
+    return types.ServerResult(
+        types.CallToolResult(
+            content=[types.TextContent(type="text", text=text)],
+            structuredContent=structured,
+        )
+    )
 
-    return types.ServerResult(types.ReadResourceResult(contents=contents))
+
+def _record_tool_outcome(tool_name: str, outcome: str, started: float) -> None:
+    """Record a finished tool call's latency and tag its trace with the outcome."""
+    tool_latency.observe(time.perf_counter() - started, tool_name, outcome)
+    root = current_span()
+    if root is not None:
+        root.set_attribute("outcome", outcome)
 
 
 async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
-    """Handle tool call requests."""
+    """Handle tool call requests, tracing each call."""
+    arguments: Mapping[str, Any] = req.params.arguments or {}
+    request_id = _extract_request_id(arguments)
+    if request_id is None and req.params.meta is not None:
+        request_id = _extract_request_id(req.params.meta.model_dump())
+    with start_trace("tool_call", tool=req.params.name, request_id=request_id):
+        return await _dispatch_tool_call(req, arguments)
+
+
+async def _dispatch_tool_call(
+    req: types.CallToolRequest, arguments: Mapping[str, Any]
+) -> types.ServerResult:
+    """Run a tool handler and build its ``CallToolResult``."""
+    started = time.perf_counter()
     registration = TOOL_REGISTRY.get(req.params.name)
     if registration is None:
+        # Arbitrary names would create unbounded label values, so they share one series.
+        _record_tool_outcome("<unknown>", "unknown_tool", started)
         return types.ServerResult(
             types.CallToolResult(
                 content=[
@@ -137,13 +229,26 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
             )
         )
 
-    arguments: Mapping[str, Any] = req.params.arguments or {}
+    time_budget = registration.time_budget
+    if time_budget is not None and time_budget <= 0:
+        time_budget = None
 
     try:
-        handler_result = registration.handler(arguments)
-        if inspect.isawaitable(handler_result):
-            handler_result = await handler_result
+        with deadline_scope(time_budget), track_started_variants() as started_variants:
+            handler_result = registration.handler(arguments)
+            if inspect.isawaitable(handler_result):
+                handler_result = await asyncio.wait_for(handler_result, timeout=time_budget)
+    except (asyncio.TimeoutError, DeadlineExceeded):
+        logger.warning(
+            "Tool '%s' exceeded its %.1fs time budget", req.params.name, time_budget or 0.0
+        )
+        _record_tool_outcome(req.params.name, "timeout", started)
+        return _still_processing_result(
+            req.params.name, arguments, time_budget, started_variants
+        )
     except ValidationError as exc:
+        validation_failures.inc(exc.title)
+        _record_tool_outcome(req.params.name, "validation_error", started)
         logger.exception(
             "Validation error while invoking tool '%s' with arguments %s",
             req.params.name,
@@ -161,6 +266,7 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
             )
         )
     except Exception as exc:  # pragma: no cover - defensive safety net
+        _record_tool_outcome(req.params.name, "error", started)
         logger.exception(
             "Unhandled exception while invoking tool '%s' with arguments %s",
             req.params.name,
@@ -178,56 +284,118 @@ async def _call_tool_request(req: types.CallToolRequest) -> types.ServerResult:
             )
         )
 
-    handler_payload = handler_result or {}
-    structured_content = handler_payload.get("structured_content") or {}
-    response_text = handler_payload.get("response_text")
-    if response_text is None:
-        response_text = registration.default_response_text
-    content = handler_payload.get("content")
-    if content is None:
-        if response_text is not None:
-            content = [types.TextContent(type="text", text=response_text)]
-        else:
-            content = []
-    meta = handler_payload.get("meta") or registration.default_meta
+    with span("build_result"):
+        handler_payload = handler_result or {}
+        structured_content = handler_payload.get("structured_content") or {}
+        response_text = handler_payload.get("response_text")
+        if response_text is None:
+            response_text = registration.default_response_text
+        content = handler_payload.get("content")
+        if content is None:
+            if response_text is not None:
+                content = [types.TextContent(type="text", text=response_text)]
+            else:
+                content = []
+        meta = handler_payload.get("meta") or registration.default_meta
+        if meta:
+            tool_result_meta_bytes.observe(len(dumps(meta)), req.params.name)
+        result = types.ServerResult(
+            types.CallToolResult(
+                content=list(content),
+                structuredContent=structured_content,
+                _meta=meta,
+            )
+        )
 
     # Log what we're sending for key tools
-    if req.params.name in ["request-personal-auto-rate", "retrieve-personal-auto-rate-results"]:
-        logger.info("=== TOOL HANDLER SENDING RESPONSE FOR %s ===", req.params.name)
-        logger.info("Content array length: %s", len(content))
+    if logger.isEnabledFor(logging.DEBUG) and req.params.name in ["request-personal-auto-rate", "retrieve-personal-auto-rate-results"]:
+        logger.debug("=== TOOL HANDLER SENDING RESPONSE FOR %s ===", req.params.name)
+        logger.debug("Content array length: %s", len(content))
         for idx, item in enumerate(content):
-            logger.info("Content[%s] type: %s", idx, item.type)
+            logger.debug("Content[%s] type: %s", idx, item.type)
             if hasattr(item, 'text'):
-                logger.info("Content[%s] text preview: %s", idx, item.text[:200] if item.text else "None")
+                logger.debug("Content[%s] text preview: %s", idx, item.text[:200] if item.text else "None")
             if hasattr(item, 'annotations') and item.annotations:
-                logger.info("Content[%s] annotations: %s", idx, item.annotations.model_dump(mode="json"))
-        logger.info("Structured content keys: %s", list(structured_content.keys()))
+                logger.debug("Content[%s] annotations: %s", idx, item.annotations.model_dump(mode="json"))
+        logger.debug("Structured content keys: %s", list(structured_content.keys()))
         if "rate_results" in structured_content:
             rate_results = structured_content["rate_results"]
-            logger.info("rate_results type: %s", type(rate_results))
+            logger.debug("rate_results type: %s", type(rate_results))
             if isinstance(rate_results, dict):
-                logger.info("rate_results keys: %s", list(rate_results.keys()))
-        logger.info("Meta keys: %s", list(meta.keys()) if meta else "None")
-        logger.info("=== END TOOL HANDLER RESPONSE ===")
+                logger.debug("rate_results keys: %s", list(rate_results.keys()))
+        logger.debug("Meta keys: %s", list(meta.keys()) if meta else "None")
+        logger.debug("=== END TOOL HANDLER RESPONSE ===")
+
+    _record_tool_outcome(req.params.name, "ok", started)
+    return result
 
-    return types.ServerResult(
-        types.CallToolResult(
-            content=list(content),
-            structuredContent=structured_content,
-            _meta=meta,
-        )
-    )
+
+async def _set_logging_level_request(req: types.SetLevelRequest) -> types.ServerResult:
+    """Apply the client's minimum level to this session's log notifications."""
+    set_session_log_level(mcp._mcp_server.request_context.session, req.params.level)
+    return types.ServerResult(types.EmptyResult())
 
 
 # Register custom handlers
+mcp._mcp_server.request_handlers[types.ListToolsRequest] = _list_tools_request
+mcp._mcp_server.request_handlers[types.ListResourcesRequest] = _list_resources_request
+mcp._mcp_server.request_handlers[types.ListResourceTemplatesRequest] = (
+    _list_resource_templates_request
+)
 mcp._mcp_server.request_handlers[types.CallToolRequest] = _call_tool_request
 mcp._mcp_server.request_handlers[types.ReadResourceRequest] = _handle_read_resource
+# Registering logging/setLevel also advertises the logging capability.
+mcp._mcp_server.request_handlers[types.SetLevelRequest] = _set_logging_level_request
 
 # Create the ASGI app
 app = mcp.streamable_http_app()
 
+_mcp_lifespan = app.router.lifespan_context
+
+
+@asynccontextmanager
+async def _app_lifespan(starlette_app: Starlette) -> AsyncIterator[None]:
+    """Open process-wide resources (upstream client, audit sink, stores, jobs, traces)."""
+    async with upstream_client_lifespan(), audit_sink_lifespan(), quote_store_lifespan():
+        async with shared_state_lifespan(), rate_job_lifespan(), tracing_lifespan():
+            async with _mcp_lifespan(starlette_app):
+                yield
+
+
+app.router.lifespan_context = _app_lifespan
+
+
+# Listing methods the legacy route answers from the pre-serialized snapshot.
+_LEGACY_LIST_METHODS = {
+    "listTools": "list_tools_json",
+    "tools/list": "list_tools_json",
+    "listResources": "list_resources_json",
+    "resources/list": "list_resources_json",
+    "listResourceTemplates": "list_resource_templates_json",
+    "resources/templates/list": "list_resource_templates_json",
+}
+
+_LEGACY_READ_METHODS = frozenset({"readResource", "resources/read"})
+
+
+# A legacy reply: the JSON-RPC response bytes, HTTP status, and extra headers.
+_LegacyReply = Tuple[bytes, int, Dict[str, str]]
+
+
+def _legacy_error(
+    request_id: Any, code: int, message: str, status_code: int, data: Any = None
+) -> _LegacyReply:
+    error: Dict[str, Any] = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return dumps({"jsonrpc": "2.0", "id": request_id, "error": error}), status_code, {}
 
-async def _legacy_call_tool_route(request: Request) -> JSONResponse:
+
+def _legacy_result(request_id: Any, result_json: bytes) -> bytes:
+    return b'{"jsonrpc":"2.0","id":' + dumps(request_id) + b',"result":' + result_json + b"}"
+
+
+async def _legacy_call_tool_route(request: Request) -> Response:
     """Handle legacy ``callTool`` HTTP requests.
 
     Older MCP HTTP clients (including early Apps SDK builds) issue JSON-RPC
@@ -237,37 +405,95 @@ async def _legacy_call_tool_route(request: Request) -> JSONResponse:
     negotiation, which causes the legacy clients to fail before the tool handler
     runs. This adapter normalizes those requests so the rest of the server can
     reuse the canonical handler logic.
+
+    The body may also be a JSON-RPC batch array; see :func:`_legacy_batch`.
     """
 
     try:
         payload = await request.json()
     except json.JSONDecodeError as exc:
-        return JSONResponse(
-            {
-                "jsonrpc": "2.0",
-                "id": None,
-                "error": {
-                    "code": -32700,
-                    "message": f"Parse error: {exc}",
-                },
-            },
-            status_code=400,
+        body, status_code, _ = _legacy_error(None, -32700, f"Parse error: {exc}", 400)
+        return JSONBytesResponse(body, status_code=status_code)
+
+    if isinstance(payload, list):
+        return await _legacy_batch(payload)
+
+    body, status_code, headers = await _legacy_message(payload)
+    return JSONBytesResponse(body, status_code=status_code, headers=headers)
+
+
+async def _legacy_batch(items: List[Any]) -> Response:
+    """Answer a JSON-RPC batch with one ordered array of responses.
+
+    Items run concurrently, at most ``INSURANCE_LEGACY_BATCH_CONCURRENCY`` at
+    a time, and a failing item only produces an error entry for itself.
+    Notifications (items without an ``id``) get no entry; a batch made only
+    of notifications returns ``204``.
+    """
+    if not items:
+        body, status_code, _ = _legacy_error(None, -32600, "Invalid Request: empty batch", 400)
+        return JSONBytesResponse(body, status_code=status_code)
+    max_items = _env_int("INSURANCE_LEGACY_BATCH_MAX_ITEMS", 20)
+    if len(items) > max_items:
+        body, status_code, _ = _legacy_error(
+            None, -32600, f"Invalid Request: batch exceeds {max_items} items", 400
         )
+        return JSONBytesResponse(body, status_code=status_code)
+
+    semaphore = asyncio.Semaphore(max(_env_int("INSURANCE_LEGACY_BATCH_CONCURRENCY", 4), 1))
+
+    async def run(item: Any) -> bytes:
+        async with semaphore:
+            try:
+                body, _, _ = await _legacy_message(item)
+            except Exception:
+                logger.exception("Legacy batch item failed")
+                request_id = item.get("id") if isinstance(item, dict) else None
+                body, _, _ = _legacy_error(request_id, -32603, "Internal error", 500)
+            return body
+
+    bodies = await asyncio.gather(*(run(item) for item in items))
+    replies = [
+        body
+        for item, body in zip(items, bodies)
+        if not (isinstance(item, dict) and "id" not in item)
+    ]
+    if not replies:
+        return Response(status_code=204)
+    return JSONBytesResponse(b"[" + b",".join(replies) + b"]")
+
+
+async def _legacy_message(payload: Any) -> _LegacyReply:
+    """Dispatch one legacy JSON-RPC request object."""
+    if not isinstance(payload, dict):
+        return _legacy_error(None, -32600, "Invalid Request", 400)
 
+    request_id = payload.get("id")
     method = payload.get("method")
-    if method != "callTool":
-        return JSONResponse(
-            {
-                "jsonrpc": "2.0",
-                "id": payload.get("id"),
-                "error": {
-                    "code": -32601,
-                    "message": f"Unsupported method: {method}",
-                },
-            },
-            status_code=405,
+    list_field = _LEGACY_LIST_METHODS.get(method)
+    if list_field is not None:
+        snapshot = registry_snapshot()
+        return (
+            _legacy_result(request_id, getattr(snapshot, list_field)),
+            200,
+            {"X-Registry-Version": snapshot.version},
         )
 
+    if method in _LEGACY_READ_METHODS:
+        params = payload.get("params")
+        uri = params.get("uri") if isinstance(params, dict) else None
+        asset = WIDGET_ASSETS.get(str(uri))
+        if asset is not None:
+            return (
+                _legacy_result(request_id, asset.read_result_json),
+                200,
+                {"ETag": asset.etag("identity")},
+            )
+        return _legacy_error(request_id, -32602, f"Unknown resource: {uri}", 404)
+
+    if method != "callTool":
+        return _legacy_error(request_id, -32601, f"Unsupported method: {method}", 405)
+
     # Clone the payload but swap in the protocol-compliant method name so we
     # can delegate back to the shared handler.
     normalized_payload = {**payload, "method": "tools/call"}
@@ -275,30 +501,149 @@ async def _legacy_call_tool_route(request: Request) -> JSONResponse:
     try:
         call_request = types.CallToolRequest.model_validate(normalized_payload)
     except ValidationError as exc:
-        return JSONResponse(
-            {
-                "jsonrpc": "2.0",
-                "id": payload.get("id"),
-                "error": {
-                    "code": -32602,
-                    "message": "Invalid request parameters",
-                    "data": exc.errors(),
-                },
-            },
-            status_code=400,
-        )
+        return _legacy_error(request_id, -32602, "Invalid request parameters", 400, exc.errors())
 
     server_result = await _call_tool_request(call_request)
-    response_payload = server_result.model_dump(mode="json")
+    result_json = server_result.model_dump_json().encode("utf-8")
+    tool_result_bytes.observe(len(result_json), call_request.params.name)
 
     # Legacy clients expect a JSON-RPC response envelope with either ``result``
     # or ``error``. ``ServerResult`` always wraps a ``CallToolResult`` so we
-    # surface it as a ``result`` here.
-    return JSONResponse({"jsonrpc": "2.0", "id": payload.get("id"), "result": response_payload})
+    # surface it as a ``result`` here. The result is serialized once by
+    # pydantic and spliced into the envelope as bytes.
+    return _legacy_result(request_id, result_json), 200, {}
+
+
+async def _upstream_status_route(request: Request) -> JSONResponse:
+    """Report gateway health, admission, pool reuse, rate jobs, flights, and shared state."""
+    return JSONResponse(
+        {
+            **resilience_snapshot(),
+            "admission": upstream_admission.stats(),
+            "connection_pool": upstream_client_stats(),
+            "rate_jobs": rate_job_queue.stats(),
+            "singleflight": {
+                rate_results_flight.name: rate_results_flight.stats(),
+                rate_submission_flight.name: rate_submission_flight.stats(),
+            },
+            "shared_state": shared_state.stats(),
+        }
+    )
+
+
+async def _metrics_route(request: Request) -> Response:
+    """Expose tool, upstream, and validation metrics in Prometheus text format."""
+    export_breaker_states()
+    return Response(metrics_registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _admin_token(request: Request) -> Optional[str]:
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        return authorization[7:].strip()
+    return request.headers.get("x-admin-token")
+
+
+def _admin_denied(request: Request) -> Optional[Response]:
+    """Return an error response unless debug routes are on and the caller is an admin."""
+    if profiling_token() is None:
+        return JSONResponse({"error": "Debug routes are disabled."}, status_code=404)
+    if not authorized(_admin_token(request)):
+        return JSONResponse({"error": "Invalid or missing admin token."}, status_code=401)
+    return None
+
+
+async def _debug_traces_route(request: Request) -> Response:
+    """Return the slowest buffered tool call traces (``?limit=N``, default 10)."""
+    denied = _admin_denied(request)
+    if denied is not None:
+        return denied
+    try:
+        limit = max(int(request.query_params.get("limit", "10")), 1)
+    except ValueError:
+        limit = 10
+    return JSONResponse(
+        {
+            "buffered": len(tracer.buffer),
+            "traces": [trace.to_dict() for trace in tracer.buffer.slowest(limit)],
+        }
+    )
+
+
+def _query_float(request: Request, name: str, default: float) -> float:
+    try:
+        return float(request.query_params.get(name, default))
+    except ValueError:
+        return default
+
+
+async def _debug_profile_route(request: Request) -> Response:
+    """Profile this worker for ``?seconds=N``.
+
+    ``?mode=sample`` (the default) returns collapsed stacks for flame graphs;
+    ``?mode=cprofile`` returns pstats text sorted by ``?sort=``.
+    """
+    denied = _admin_denied(request)
+    if denied is not None:
+        return denied
+    seconds = clamp_duration(_query_float(request, "seconds", 5.0))
+    mode = request.query_params.get("mode", "sample")
+    sort = request.query_params.get("sort", "cumulative")
+    if sort not in PSTATS_SORT_KEYS:
+        return JSONResponse({"error": f"Unknown sort key: {sort}"}, status_code=400)
+    try:
+        if mode == "cprofile":
+            report = await capture_cprofile(seconds, sort=sort)
+        elif mode == "sample":
+            report = await capture_samples(seconds)
+        else:
+            return JSONResponse({"error": f"Unknown profiling mode: {mode}"}, status_code=400)
+    except ProfilerBusy as exc:
+        return JSONResponse({"error": str(exc)}, status_code=409)
+    return Response(report, media_type="text/plain; charset=utf-8")
+
+
+async def _debug_tracemalloc_route(request: Request) -> Response:
+    """Return the allocation growth over ``?seconds=N`` (``?package=true`` to filter)."""
+    denied = _admin_denied(request)
+    if denied is not None:
+        return denied
+    seconds = clamp_duration(_query_float(request, "seconds", 5.0))
+    package_only = request.query_params.get("package", "false").lower() in {"1", "true", "yes"}
+    try:
+        report = await capture_allocations(seconds, package_only=package_only)
+    except ProfilerBusy as exc:
+        return JSONResponse({"error": str(exc)}, status_code=409)
+    return Response(report, media_type="text/plain; charset=utf-8")
+
+
+async def _widget_route(request: Request) -> Response:
+    """Serve widget HTML with ETag revalidation and precompressed encodings."""
+    asset = WIDGET_ASSETS_BY_PATH.get(request.url.path)
+    if asset is None:
+        return Response("Unknown widget", status_code=404, media_type="text/plain")
+    encoding = choose_encoding(asset, request.headers.get("accept-encoding", ""))
+    etag = asset.etag(encoding)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(asset.encodings[encoding], media_type=MIME_TYPE, headers=headers)
 
 
 # Add legacy route
 app.add_route("/mcp/messages", _legacy_call_tool_route, methods=["POST"])
+app.add_route("/upstream/status", _upstream_status_route, methods=["GET"])
+app.add_route("/metrics", _metrics_route, methods=["GET"])
+app.add_route("/debug/traces", _debug_traces_route, methods=["GET"])
+app.add_route("/widgets/{name}", _widget_route, methods=["GET"])
+app.add_route("/debug/profile", _debug_profile_route, methods=["POST"])
+app.add_route("/debug/tracemalloc", _debug_tracemalloc_route, methods=["POST"])
 
 # Add CORS middleware
 try:
@@ -317,6 +662,6 @@ except Exception:
 
 # Entry point
 if __name__ == "__main__":
-    import uvicorn
+    from .launcher import main as launch
 
-    uvicorn.run("insurance_server_python.main:app", host="0.0.0.0", port=8000)
+    launch()
@@ -0,0 +1,289 @@
+"""In-process metrics registry rendered in the Prometheus text format.
+
+Counters, gauges, and histograms keep plain per-label-set lists, so recording a
+value is a dict lookup, a bisect over the bucket bounds, and a few additions. No
+collector process is needed; ``GET /metrics`` renders the current values.
+"""
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+SIZE_BUCKETS: Tuple[float, ...] = (
+    256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonic counter keyed by label values."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Add ``amount`` to the series for ``label_values``."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Return the current value of one series (``0`` when never incremented)."""
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}"
+
+
+class Gauge:
+    """Point-in-time value keyed by label values."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *label_values: str) -> None:
+        """Replace the series for ``label_values`` with ``value``."""
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Add ``amount`` (which may be negative) to the series for ``label_values``."""
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def dec(self, *label_values: str, amount: float = 1.0) -> None:
+        """Subtract ``amount`` from the series for ``label_values``."""
+        self.inc(*label_values, amount=-amount)
+
+    def value(self, *label_values: str) -> float:
+        """Return the current value of one series (``0`` when never set)."""
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for label_values, value in items:
+            yield f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}"
+
+
+class Histogram:
+    """Cumulative-bucket histogram keyed by label values."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: one count per finite bucket plus +Inf, then the sum.
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation for the series ``label_values``."""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0.0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, *label_values: str) -> int:
+        """Return how many observations one series has recorded."""
+        series = self._series.get(label_values)
+        return int(sum(series[:-1])) if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        bounds = [*self.buckets, float("inf")]
+        for label_values, series in items:
+            cumulative = 0.0
+            for bound, bucket_count in zip(bounds, series):
+                cumulative += bucket_count
+                le = f'le="{_format_number(bound)}"'
+                yield (
+                    f"{self.name}_bucket{_format_labels(self.labels, label_values, le)} "
+                    f"{_format_number(cumulative)}"
+                )
+            labels = _format_labels(self.labels, label_values)
+            yield f"{self.name}_sum{labels} {_format_number(series[-1])}"
+            yield f"{self.name}_count{labels} {_format_number(cumulative)}"
+
+
+class MetricsRegistry:
+    """Named collection of counters, gauges, and histograms."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Counter | Gauge | Histogram] = {}
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labels)
+        self._metrics[name] = metric
+        return metric
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        metric = Gauge(name, documentation, labels)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labels, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+tool_latency = metrics_registry.histogram(
+    "insurance_tool_duration_seconds",
+    "Time spent handling a tool call.",
+    ("tool", "outcome"),
+)
+upstream_latency = metrics_registry.histogram(
+    "insurance_upstream_duration_seconds",
+    "Time spent waiting on a rating gateway call.",
+    ("endpoint", "status"),
+)
+upstream_request_bytes = metrics_registry.histogram(
+    "insurance_upstream_request_bytes",
+    "Size of request bodies sent to the rating gateway.",
+    ("endpoint",),
+    SIZE_BUCKETS,
+)
+upstream_response_bytes = metrics_registry.histogram(
+    "insurance_upstream_response_bytes",
+    "Size of response bodies received from the rating gateway.",
+    ("endpoint",),
+    SIZE_BUCKETS,
+)
+validation_failures = metrics_registry.counter(
+    "insurance_validation_failures_total",
+    "Tool arguments rejected by input validation.",
+    ("model",),
+)
+tool_result_meta_bytes = metrics_registry.histogram(
+    "insurance_tool_result_meta_bytes",
+    "Serialized size of the _meta attached to a tool call result.",
+    ("tool",),
+    SIZE_BUCKETS,
+)
+tool_result_bytes = metrics_registry.histogram(
+    "insurance_tool_result_bytes",
+    "Serialized size of tool call results returned on the legacy HTTP route.",
+    ("tool",),
+    SIZE_BUCKETS,
+)
+listing_bytes = metrics_registry.counter(
+    "insurance_listing_bytes_total",
+    "Serialized bytes of tools/list and resource listings served.",
+    ("method",),
+)
+rate_cache_hits = metrics_registry.counter(
+    "insurance_rate_cache_hits_total",
+    "Rate results cache lookups answered from the cache.",
+)
+rate_cache_misses = metrics_registry.counter(
+    "insurance_rate_cache_misses_total",
+    "Rate results cache lookups that found no usable entry.",
+)
+rate_cache_evictions = metrics_registry.counter(
+    "insurance_rate_cache_evictions_total",
+    "Rate results cache entries evicted by the LRU bound.",
+)
+singleflight_coalesced = metrics_registry.counter(
+    "singleflight_coalesced_total",
+    "Callers that waited on another caller's in-flight call instead of starting one.",
+    ("flight",),
+)
+audit_records_written = metrics_registry.counter(
+    "insurance_audit_records_written_total",
+    "Rate request audit records written to the NDJSON log.",
+)
+audit_records_dropped = metrics_registry.counter(
+    "insurance_audit_records_dropped_total",
+    "Rate request audit records dropped because the audit queue was full.",
+)
+audit_write_errors = metrics_registry.counter(
+    "insurance_audit_write_errors_total",
+    "Audit record batches that failed to write.",
+)
+circuit_breaker_state = metrics_registry.gauge(
+    "insurance_circuit_breaker_state",
+    "Current state of each gateway circuit breaker: 1 for the active state, 0 otherwise.",
+    ("endpoint", "state"),
+)
+admission_queue_depth = metrics_registry.gauge(
+    "insurance_upstream_admission_queue_depth",
+    "Gateway calls waiting for admission.",
+)
+admission_wait = metrics_registry.histogram(
+    "insurance_upstream_admission_wait_seconds",
+    "Time gateway calls waited for admission before being sent.",
+)
+admission_rejected = metrics_registry.counter(
+    "insurance_upstream_admission_rejected_total",
+    "Gateway calls rejected by admission control.",
+)
@@ -0,0 +1,340 @@
+"""Conservative minification of the inline widget HTML, CSS, and JavaScript.
+
+The widgets ship as hand-written markup with comments, deep indentation, and
+many ``console.log`` calls. :func:`minify_widget_html` strips comments and
+indentation from every part of the document and, unless ``is_testing`` is
+set, removes ``console.log``/``console.debug``/``console.info`` calls.
+``console.warn`` and ``console.error`` are kept. The JavaScript pass
+understands strings, template literals, regular expression literals, and
+comments, and keeps line breaks wherever dropping one could change how
+automatic semicolon insertion reads the code.
+
+Run ``python -m insurance_server_python.minify`` to print the bytes saved
+for each widget.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+_BLOCK_RE = re.compile(
+    r"(<script\b[^>]*>)(.*?)(</script\s*>)|(<style\b[^>]*>)(.*?)(</style\s*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+_CSS_COLON_RE = re.compile(r":\s+")
+_DEBUG_CALL_RE = re.compile(r"console\s*\.\s*(?:log|debug|info)\s*\(")
+
+_IDENT_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$")
+# A "/" after one of these characters starts a regular expression literal.
+_REGEX_AFTER_CHARS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_AFTER_WORDS = frozenset(
+    {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw",
+     "yield", "await", "instanceof"}
+)
+# Spaces next to these characters never separate two tokens that would merge.
+_JS_TIGHT_CHARS = frozenset("{}()[];,:=<>?!&|*%^~")
+# Line breaks after or before these characters cannot affect semicolon insertion.
+_NEWLINE_AFTER_SAFE = frozenset("{[(,;")
+_NEWLINE_BEFORE_SAFE = frozenset("}])")
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+
+
+@dataclass(frozen=True)
+class MinifyReport:
+    """Sizes of one widget's markup before and after minification."""
+
+    name: str
+    original_bytes: int
+    minified_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.minified_bytes
+
+
+def _last_significant(out: List[str]) -> Tuple[str, str]:
+    """Return the last non-space output character and the word ending there."""
+    for chunk in reversed(out):
+        stripped = chunk.rstrip(" \n")
+        if stripped:
+            char = stripped[-1]
+            word = ""
+            if char in _IDENT_CHARS:
+                match = re.search(r"[A-Za-z0-9_$]+$", stripped)
+                word = match.group(0) if match else ""
+            return char, word
+    return "", ""
+
+
+class _UnbalancedScript(ValueError):
+    """Raised when a script's strings or brackets do not close."""
+
+
+class _JsMinifier:
+    def __init__(self, source: str, strip_debug_logging: bool) -> None:
+        self.src = source
+        self.strip_debug_logging = strip_debug_logging
+
+    def run(self) -> str:
+        out: List[str] = []
+        self._scan(0, out, None)
+        return "".join(out).strip()
+
+    def _unterminated(self, what: str) -> None:
+        raise _UnbalancedScript(f"unterminated {what}")
+
+    def _skip_string(self, i: int, quote: str) -> int:
+        src = self.src
+        i += 1
+        while i < len(src):
+            char = src[i]
+            if char == "\\":
+                i += 2
+                continue
+            if char == quote:
+                return i + 1
+            if char == "\n":
+                self._unterminated("string")
+            i += 1
+        self._unterminated("string")
+        return i
+
+    def _skip_regex(self, i: int) -> int:
+        src = self.src
+        i += 1
+        in_class = False
+        while i < len(src):
+            char = src[i]
+            if char == "\\":
+                i += 2
+                continue
+            if char == "[":
+                in_class = True
+            elif char == "]":
+                in_class = False
+            elif char == "/" and not in_class:
+                i += 1
+                while i < len(src) and src[i] in _IDENT_CHARS:
+                    i += 1
+                return i
+            elif char == "\n":
+                return i
+            i += 1
+        return i
+
+    def _copy_template(self, i: int, out: List[str]) -> int:
+        src = self.src
+        out.append("`")
+        i += 1
+        while i < len(src):
+            char = src[i]
+            if char == "\\":
+                out.append(src[i : i + 2])
+                i += 2
+                continue
+            if char == "`":
+                out.append("`")
+                return i + 1
+            if char == "$" and src.startswith("${", i):
+                out.append("${")
+                i = self._scan(i + 2, out, "}") + 1
+                out.append("}")
+                continue
+            out.append(char)
+            i += 1
+        self._unterminated("template literal")
+        return i
+
+    def _emit_space(self, out: List[str], has_newline: bool, next_char: str) -> None:
+        prev, _ = _last_significant(out)
+        if not prev:
+            return
+        while out and out[-1] in (" ", "\n"):
+            if out.pop() == "\n":
+                has_newline = True
+        if has_newline:
+            if prev in _NEWLINE_AFTER_SAFE or next_char in _NEWLINE_BEFORE_SAFE:
+                return
+            out.append("\n")
+            return
+        if prev in _JS_TIGHT_CHARS or next_char in _JS_TIGHT_CHARS:
+            return
+        out.append(" ")
+
+    def _strip_debug_call(self, i: int, out: List[str]) -> Optional[int]:
+        match = _DEBUG_CALL_RE.match(self.src, i)
+        if match is None:
+            return None
+        if i > 0 and (self.src[i - 1] in _IDENT_CHARS or self.src[i - 1] == "."):
+            return None
+        end = self._scan(match.end(), [], ")") + 1
+        prev, _ = _last_significant(out)
+        if prev in ("", ";", "{", "}"):
+            # A whole statement: drop it along with its semicolon.
+            j = end
+            while j < len(self.src) and self.src[j] in " \t":
+                j += 1
+            if j < len(self.src) and self.src[j] == ";":
+                end = j + 1
+            return end
+        # Part of an expression or the body of an unbraced if/else/arrow.
+        out.append("void 0")
+        return end
+
+    def _scan(self, i: int, out: List[str], stop: Optional[str]) -> int:
+        """Minify code from ``i`` until an unmatched ``stop`` character."""
+        src = self.src
+        closers: List[str] = []
+        while i < len(src):
+            char = src[i]
+            if char in " \t\r\n":
+                j = i
+                while j < len(src) and src[j] in " \t\r\n":
+                    j += 1
+                next_char = src[j] if j < len(src) else ""
+                self._emit_space(out, "\n" in src[i:j], next_char)
+                i = j
+                continue
+            if char == "/" and src.startswith("//", i):
+                j = src.find("\n", i)
+                i = len(src) if j < 0 else j
+                continue
+            if char == "/" and src.startswith("/*", i):
+                j = src.find("*/", i + 2)
+                j = len(src) if j < 0 else j + 2
+                comment = src[i:j]
+                i = j
+                # Stand in for the comment so adjacent tokens stay separated.
+                self._emit_space(out, "\n" in comment, src[i] if i < len(src) else "")
+                continue
+            if char in "'\"":
+                j = self._skip_string(i, char)
+                out.append(src[i:j])
+                i = j
+                continue
+            if char == "`":
+                i = self._copy_template(i, out)
+                continue
+            if char == "/":
+                prev, word = _last_significant(out)
+                if prev == "" or prev in _REGEX_AFTER_CHARS or word in _REGEX_AFTER_WORDS:
+                    j = self._skip_regex(i)
+                    out.append(src[i:j])
+                    i = j
+                    continue
+            if self.strip_debug_logging and char == "c":
+                end = self._strip_debug_call(i, out)
+                if end is not None:
+                    i = end
+                    continue
+            if char in _OPENERS:
+                closers.append(_OPENERS[char])
+            elif char in ")]}":
+                if closers:
+                    closers.pop()
+                elif stop is not None and char == stop:
+                    return i
+            if char in _IDENT_CHARS:
+                j = i
+                while j < len(src) and src[j] in _IDENT_CHARS:
+                    j += 1
+                out.append(src[i:j])
+                i = j
+                continue
+            out.append(char)
+            i += 1
+        if closers or stop is not None:
+            self._unterminated("bracket")
+        return i
+
+
+def minify_js(source: str, *, strip_debug_logging: bool = True) -> str:
+    """Remove comments, indentation, and optionally debug ``console`` calls.
+
+    A script whose strings, template literals, or brackets do not close is
+    returned unchanged rather than risk rewriting code the scanner misread.
+    """
+    try:
+        return _JsMinifier(source, strip_debug_logging).run()
+    except _UnbalancedScript:
+        return source
+
+
+def minify_css(source: str) -> str:
+    """Remove comments and whitespace that carries no meaning in CSS."""
+    css = _CSS_COMMENT_RE.sub("", source)
+    css = _CSS_SPACE_RE.sub(" ", css)
+    css = _CSS_PUNCT_RE.sub(r"\1", css)
+    css = _CSS_COLON_RE.sub(":", css)
+    return css.replace(";}", "}").strip()
+
+
+def _minify_markup(markup: str) -> str:
+    markup = _HTML_COMMENT_RE.sub("", markup)
+    lines = (line.strip() for line in markup.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def minify_widget_html(html: str, *, is_testing: bool = False) -> str:
+    """Minify a widget document; debug logging is kept when ``is_testing``."""
+    parts: List[str] = []
+    position = 0
+    for match in _BLOCK_RE.finditer(html):
+        parts.append(_minify_markup(html[position : match.start()]))
+        if match.group(1) is not None:
+            open_tag, body, close_tag = match.group(1), match.group(2), match.group(3)
+            if "json" in open_tag.lower():
+                body = body.strip()
+            else:
+                body = minify_js(body, strip_debug_logging=not is_testing)
+        else:
+            open_tag, body, close_tag = match.group(4), match.group(5), match.group(6)
+            body = minify_css(body)
+        parts.append(open_tag + body + close_tag)
+        position = match.end()
+    parts.append(_minify_markup(html[position:]))
+    return "\n".join(part for part in parts if part)
+
+
+def minify_with_report(
+    name: str, html: str, *, is_testing: bool = False
+) -> Tuple[str, MinifyReport]:
+    """Minify ``html`` and return it with its before and after sizes."""
+    minified = minify_widget_html(html, is_testing=is_testing)
+    report = MinifyReport(
+        name=name,
+        original_bytes=len(html.encode("utf-8")),
+        minified_bytes=len(minified.encode("utf-8")),
+    )
+    return minified, report
+
+
+def _main() -> None:  # pragma: no cover - command-line report
+    from .insurance_quote_options_widget import INSURANCE_QUOTE_OPTIONS_WIDGET_HTML
+    from .insurance_rate_results_widget import INSURANCE_RATE_RESULTS_WIDGET_HTML
+    from .insurance_state_widget import INSURANCE_STATE_WIDGET_HTML
+    from .insurance_wizard_widget import generate_insurance_wizard_html
+
+    sources = {
+        "insurance_state_widget": INSURANCE_STATE_WIDGET_HTML,
+        "insurance_rate_results_widget": INSURANCE_RATE_RESULTS_WIDGET_HTML,
+        "insurance_wizard_widget": generate_insurance_wizard_html(is_testing=False),
+        "insurance_quote_options_widget": INSURANCE_QUOTE_OPTIONS_WIDGET_HTML,
+    }
+    for name, html in sources.items():
+        _, report = minify_with_report(name, html)
+        percent = 100.0 * report.saved_bytes / max(report.original_bytes, 1)
+        print(
+            f"{name}: {report.original_bytes} -> {report.minified_bytes} bytes "
+            f"(saved {report.saved_bytes}, {percent:.1f}%)"
+        )
+
+
+if __name__ == "__main__":  # pragma: no cover
+    _main()
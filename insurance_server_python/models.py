@@ -507,6 +507,22 @@ class PersonalAutoRateResultsRequest(BaseModel):
     _strip_identifier = field_validator("identifier", mode="before")(_strip_string)
 
 
+class PersonalAutoCoverageWhatIfRequest(BaseModel):
+    base_request: PersonalAutoRateRequest = Field(..., alias="BaseRequest")
+    coverage_variants: List[PolicyCoveragesInput] = Field(
+        ...,
+        alias="CoverageVariants",
+        min_length=1,
+        max_length=12,
+        description=(
+            "Policy coverage variants to rate. Each variant overrides the base "
+            "request's PolicyCoverages; omitted limits keep the base values."
+        ),
+    )
+
+    model_config = ConfigDict(populate_by_name=True, extra="forbid")
+
+
 # TypedDicts for tool handling
 class ToolInvocationResult(TypedDict, total=False):
     """Result structure returned by tool handlers."""
@@ -0,0 +1,167 @@
+"""On-demand CPU and allocation profiling for a running worker.
+
+Both captures are off unless ``INSURANCE_PROFILING_TOKEN`` is set, and
+callers must present that token. Only one capture runs per worker at a
+time, captures are capped at ``INSURANCE_PROFILING_MAX_SECONDS``, and the
+report formatting runs in a worker thread so the event loop keeps serving
+requests while a capture is taken.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from types import FrameType
+from typing import List, Optional
+
+from .utils import _env_float
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PSTATS_SORT_KEYS = frozenset({"cumulative", "tottime", "calls", "ncalls", "time"})
+
+
+class ProfilerBusy(RuntimeError):
+    """Raised when a capture is requested while another one is running."""
+
+
+def profiling_token() -> Optional[str]:
+    """Return the admin token that enables profiling, or ``None`` when off."""
+    token = os.getenv("INSURANCE_PROFILING_TOKEN", "").strip()
+    return token or None
+
+
+def authorized(presented: Optional[str]) -> bool:
+    """Return ``True`` when ``presented`` matches the configured admin token."""
+    token = profiling_token()
+    if token is None or not presented:
+        return False
+    return hmac.compare_digest(presented.encode("utf-8"), token.encode("utf-8"))
+
+
+def clamp_duration(seconds: float) -> float:
+    """Limit a requested capture length to ``(0, INSURANCE_PROFILING_MAX_SECONDS]``."""
+    limit = _env_float("INSURANCE_PROFILING_MAX_SECONDS", 30.0)
+    return min(max(seconds, 0.1), limit)
+
+
+_capture_lock = threading.Lock()
+
+
+def _exclusive() -> None:
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("Another profiling capture is already running on this worker.")
+
+
+def _format_pstats(profiler: cProfile.Profile, sort: str, limit: int) -> str:
+    stream = io.StringIO()
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+async def capture_cprofile(seconds: float, *, sort: str = "cumulative", limit: int = 50) -> str:
+    """Profile the event loop thread with :mod:`cProfile` and return pstats text."""
+    _exclusive()
+    try:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            profiler.disable()
+        return await asyncio.to_thread(_format_pstats, profiler, sort, limit)
+    finally:
+        _capture_lock.release()
+
+
+def _collapse(frame: Optional[FrameType]) -> str:
+    names: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _sample_thread(
+    thread_id: int, seconds: float, interval: float, samples: "Counter[str]"
+) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is not None:
+            samples[_collapse(frame)] += 1
+        time.sleep(interval)
+
+
+async def capture_samples(seconds: float, *, interval: float = 0.005) -> str:
+    """Sample the event loop thread's stack and return collapsed-stack lines.
+
+    Each output line is ``frame;frame;... count`` (root first), the input
+    format of flame graph tools. Sampling runs in a separate thread, so the
+    loop itself carries no profiler hook.
+    """
+    _exclusive()
+    try:
+        samples: "Counter[str]" = Counter()
+        await asyncio.to_thread(
+            _sample_thread, threading.get_ident(), seconds, max(interval, 0.001), samples
+        )
+        return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+    finally:
+        _capture_lock.release()
+
+
+def _format_allocation_diff(
+    before: tracemalloc.Snapshot,
+    after: tracemalloc.Snapshot,
+    *,
+    package_only: bool,
+    limit: int,
+) -> str:
+    if package_only:
+        filters = [tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*"))]
+        before = before.filter_traces(filters)
+        after = after.filter_traces(filters)
+    lines = [f"Top {limit} allocation changes by line:"]
+    for stat in after.compare_to(before, "lineno")[:limit]:
+        lines.append(str(stat))
+    current, peak = tracemalloc.get_traced_memory()
+    lines.append(f"Traced memory: current={current} bytes peak={peak} bytes")
+    return "\n".join(lines) + "\n"
+
+
+async def capture_allocations(
+    seconds: float, *, package_only: bool = False, limit: int = 25, frames: int = 1
+) -> str:
+    """Diff two :mod:`tracemalloc` snapshots taken ``seconds`` apart.
+
+    Tracing is started for the capture and stopped afterwards unless it was
+    already running. ``package_only`` keeps allocations made in this
+    package's files (widget resources, rate result handling) and drops the
+    rest.
+    """
+    _exclusive()
+    started_here = not tracemalloc.is_tracing()
+    try:
+        if started_here:
+            tracemalloc.start(max(frames, 1))
+        before = await asyncio.to_thread(tracemalloc.take_snapshot)
+        await asyncio.sleep(seconds)
+        after = await asyncio.to_thread(tracemalloc.take_snapshot)
+        return await asyncio.to_thread(
+            _format_allocation_diff, before, after, package_only=package_only, limit=limit
+        )
+    finally:
+        if started_here:
+            tracemalloc.stop()
+        _capture_lock.release()
@@ -0,0 +1,149 @@
+"""MCP progress and log notifications while carrier rate results arrive."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Iterable, List, Mapping, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from mcp.server.lowlevel.server import request_ctx
+
+from .rate_polling import completed_products
+from .utils import _env_bool
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_LOGGER_NAME = "insurance.rating"
+PROGRESS_LOG_LEVEL = "info"
+
+# MCP logging levels, least to most severe.
+LOG_LEVELS: Tuple[str, ...] = (
+    "debug", "info", "notice", "warning", "error", "critical", "alert", "emergency",
+)
+
+# Minimum level each client session asked for with ``logging/setLevel``.
+_session_log_levels: "WeakKeyDictionary[Any, str]" = WeakKeyDictionary()
+
+
+def set_session_log_level(session: Any, level: str) -> None:
+    """Record the minimum log level ``session`` wants to receive."""
+    _session_log_levels[session] = level
+
+
+def log_level_enabled(session: Any, level: str) -> bool:
+    """Return whether ``session`` accepts log messages at ``level``.
+
+    Sessions that never sent ``logging/setLevel`` receive every level.
+    """
+    minimum = _session_log_levels.get(session)
+    return minimum is None or LOG_LEVELS.index(level) >= LOG_LEVELS.index(minimum)
+
+
+def best_premium(rate_results: Any) -> Optional[float]:
+    """Return the lowest total premium quoted so far, if any."""
+    if not isinstance(rate_results, Mapping):
+        return None
+    carrier_results = rate_results.get("CarrierResults") or rate_results.get("carrierResults")
+    best: Optional[float] = None
+    for result in carrier_results or []:
+        if not isinstance(result, Mapping):
+            continue
+        premium = result.get("TotalPremium")
+        if premium is None:
+            premium = result.get("totalPremium")
+        if isinstance(premium, (int, float)) and not isinstance(premium, bool):
+            best = premium if best is None else min(best, premium)
+    return best
+
+
+class RateProgressReporter:
+    """Report carriers completed and the best premium for one tool call.
+
+    The reporter binds to the MCP request being served when it is created.
+    Progress notifications are sent only when the client supplied a
+    ``progressToken``; log notifications are sent for every change unless
+    ``INSURANCE_RATE_PROGRESS_LOGS`` is disabled or the client raised its
+    level above ``info`` with ``logging/setLevel``. Outside an MCP request (for
+    example the legacy ``/mcp/messages`` route) reporting is a no-op.
+    Notification failures are logged and never fail the rating call.
+    """
+
+    def __init__(
+        self,
+        transaction_id: Optional[str],
+        expected_products: Iterable[Tuple[Optional[str], Optional[str]]],
+        *,
+        send_logs: Optional[bool] = None,
+    ) -> None:
+        self.transaction_id = transaction_id
+        self.expected_products: List[Tuple[Optional[str], Optional[str]]] = list(
+            expected_products
+        )
+        self.send_logs = (
+            _env_bool("INSURANCE_RATE_PROGRESS_LOGS", True) if send_logs is None else send_logs
+        )
+        self.sent = 0
+        self._last: Optional[Tuple[int, Optional[float], bool]] = None
+
+        context = request_ctx.get(None)
+        self._session = context.session if context is not None else None
+        self._request_id = context.request_id if context is not None else None
+        meta = context.meta if context is not None else None
+        self._progress_token = getattr(meta, "progressToken", None)
+
+    @property
+    def enabled(self) -> bool:
+        return self._session is not None and (
+            self._progress_token is not None or self.send_logs
+        )
+
+    def _message(self, completed: int, total: int, premium: Optional[float]) -> str:
+        message = f"{completed} of {total} carriers rated"
+        if premium is not None:
+            message += f"; best premium so far ${premium:,.2f}"
+        return message
+
+    async def update(self, rate_results: Any, complete: bool) -> None:
+        """Send a notification if the carrier count or best premium changed."""
+        if not self.enabled:
+            return
+        send_log = self.send_logs and log_level_enabled(self._session, PROGRESS_LOG_LEVEL)
+        if self._progress_token is None and not send_log:
+            return
+        total = len(self.expected_products)
+        completed = completed_products(rate_results, self.expected_products)
+        if complete:
+            completed = max(completed, total)
+        premium = best_premium(rate_results)
+        state = (completed, premium, complete)
+        if state == self._last:
+            return
+        self._last = state
+
+        message = self._message(completed, total, premium)
+        try:
+            if self._progress_token is not None:
+                await self._session.send_progress_notification(
+                    self._progress_token,
+                    float(completed),
+                    total=float(total) if total else None,
+                    message=message,
+                    related_request_id=self._request_id,
+                )
+            if send_log:
+                await self._session.send_log_message(
+                    PROGRESS_LOG_LEVEL,
+                    {
+                        "transactionId": self.transaction_id,
+                        "carriersCompleted": completed,
+                        "carriersTotal": total,
+                        "bestPremium": premium,
+                        "complete": complete,
+                        "message": message,
+                    },
+                    logger=PROGRESS_LOGGER_NAME,
+                    related_request_id=self._request_id,
+                )
+            self.sent += 1
+        except Exception as exc:  # pragma: no cover - depends on client transport
+            logger.debug("Failed to send rating progress notification: %s", exc)
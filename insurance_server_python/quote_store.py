@@ -0,0 +1,276 @@
+"""Durable SQLite store linking quote identifiers to rate transactions."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional
+
+from .serialization import dumps, loads
+from .utils import _env_bool, _env_float
+
+logger = logging.getLogger(__name__)
+
+# Relative to the working directory, like the audit log.
+DEFAULT_QUOTE_STORE_PATH = Path("quote_store") / "quotes.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quotes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    identifier TEXT NOT NULL COLLATE NOCASE,
+    transaction_id TEXT NOT NULL COLLATE NOCASE,
+    request_hash TEXT,
+    state TEXT,
+    status INTEGER,
+    request BLOB,
+    created_at REAL NOT NULL,
+    UNIQUE (identifier, transaction_id)
+);
+CREATE INDEX IF NOT EXISTS quotes_identifier ON quotes (identifier);
+CREATE INDEX IF NOT EXISTS quotes_transaction_id ON quotes (transaction_id);
+CREATE INDEX IF NOT EXISTS quotes_created_at ON quotes (created_at);
+CREATE TABLE IF NOT EXISTS rate_results (
+    transaction_id TEXT PRIMARY KEY COLLATE NOCASE,
+    status INTEGER,
+    complete INTEGER NOT NULL DEFAULT 0,
+    results BLOB,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _pack(value: Any) -> bytes:
+    # Already-serialized bodies are compressed without re-encoding them.
+    return zlib.compress(value if isinstance(value, bytes) else dumps(value), 6)
+
+
+def _unpack(blob: Optional[bytes]) -> Any:
+    if blob is None:
+        return None
+    return loads(zlib.decompress(blob))
+
+
+@dataclass(frozen=True)
+class StoredQuote:
+    """A quote identifier, its transaction, and the latest stored results."""
+
+    identifier: str
+    transaction_id: str
+    status: Optional[int]
+    created_at: float
+    rate_results: Any = None
+    rate_results_status: Optional[int] = None
+    rate_results_complete: bool = False
+
+
+class QuoteStore:
+    """SQLite (WAL mode) store of rate submissions and compressed results.
+
+    Identifier and transaction id columns compare case-insensitively, like
+    the rate cache keys. All database work runs in a worker thread through
+    one shared connection, and WAL mode lets several uvicorn workers on the
+    same host share the file.
+    With no ``path`` or ``enabled=False`` every call is a no-op.
+    """
+
+    def __init__(
+        self, path: Optional[Path], *, enabled: bool = True, busy_timeout: float = 5.0
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.enabled = enabled and self.path is not None
+        self.busy_timeout = busy_timeout
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "QuoteStore":
+        """Build the store from ``INSURANCE_QUOTE_STORE_*`` environment variables."""
+        path = os.getenv("INSURANCE_QUOTE_STORE_PATH", "").strip()
+        return cls(
+            Path(path) if path else DEFAULT_QUOTE_STORE_PATH,
+            enabled=_env_bool("INSURANCE_QUOTE_STORE_ENABLED", True),
+            busy_timeout=_env_float("INSURANCE_QUOTE_STORE_BUSY_TIMEOUT_SECONDS", 5.0),
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            assert self.path is not None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, operation: str, fn, *args: Any) -> Any:
+        if not self.enabled:
+            return None
+
+        def call() -> Any:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    return fn(connection, *args)
+
+        try:
+            return await asyncio.to_thread(call)
+        except sqlite3.Error as exc:
+            self.errors += 1
+            logger.warning("Quote store %s failed: %s", operation, exc)
+            return None
+
+    async def record_submission(
+        self,
+        identifier: str,
+        transaction_id: str,
+        *,
+        request_body: Any,
+        request_hash: Optional[str] = None,
+        state: Optional[str] = None,
+        status: Optional[int] = None,
+    ) -> None:
+        """Remember that ``identifier`` was rated under ``transaction_id``."""
+        await self._run(
+            "record_submission",
+            _insert_quote,
+            identifier.strip(),
+            transaction_id.strip(),
+            request_hash,
+            state,
+            status,
+            _pack(request_body),
+            time.time(),
+        )
+
+    async def record_results(
+        self,
+        transaction_id: str,
+        rate_results: Any,
+        *,
+        status: Optional[int],
+        complete: bool,
+    ) -> None:
+        """Store the latest rate results for ``transaction_id``."""
+        await self._run(
+            "record_results",
+            _upsert_results,
+            transaction_id.strip(),
+            status,
+            int(complete),
+            _pack(rate_results),
+            time.time(),
+        )
+
+    async def lookup(self, key: str) -> Optional[StoredQuote]:
+        """Return the newest quote whose identifier or transaction id is ``key``."""
+        return await self._run("lookup", _select_quote, key.strip())
+
+    async def request_body(self, transaction_id: str) -> Any:
+        """Return the sanitized request stored for ``transaction_id``."""
+        blob = await self._run("request_body", _select_request, transaction_id.strip())
+        return _unpack(blob)
+
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "errors": self.errors}
+
+
+def _insert_quote(
+    connection: sqlite3.Connection,
+    identifier: str,
+    transaction_id: str,
+    request_hash: Optional[str],
+    state: Optional[str],
+    status: Optional[int],
+    request: bytes,
+    created_at: float,
+) -> None:
+    connection.execute(
+        "INSERT OR IGNORE INTO quotes "
+        "(identifier, transaction_id, request_hash, state, status, request, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (identifier, transaction_id, request_hash, state, status, request, created_at),
+    )
+
+
+def _upsert_results(
+    connection: sqlite3.Connection,
+    transaction_id: str,
+    status: Optional[int],
+    complete: int,
+    results: bytes,
+    updated_at: float,
+) -> None:
+    connection.execute(
+        "INSERT INTO rate_results (transaction_id, status, complete, results, updated_at) "
+        "VALUES (?, ?, ?, ?, ?) "
+        "ON CONFLICT (transaction_id) DO UPDATE SET status = excluded.status, "
+        "complete = excluded.complete, results = excluded.results, "
+        "updated_at = excluded.updated_at",
+        (transaction_id, status, complete, results, updated_at),
+    )
+
+
+def _select_quote(connection: sqlite3.Connection, key: str) -> Optional[StoredQuote]:
+    row = connection.execute(
+        "SELECT q.identifier, q.transaction_id, q.status, q.created_at, "
+        "r.results, r.status, r.complete "
+        "FROM quotes q LEFT JOIN rate_results r ON r.transaction_id = q.transaction_id "
+        "WHERE q.identifier = ? OR q.transaction_id = ? "
+        "ORDER BY q.created_at DESC LIMIT 1",
+        (key, key),
+    ).fetchone()
+    if row is None:
+        row = connection.execute(
+            "SELECT NULL, transaction_id, NULL, updated_at, results, status, complete "
+            "FROM rate_results WHERE transaction_id = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+    return StoredQuote(
+        identifier=row[0] or key,
+        transaction_id=row[1],
+        status=row[2],
+        created_at=row[3],
+        rate_results=_unpack(row[4]),
+        rate_results_status=row[5],
+        rate_results_complete=bool(row[6]),
+    )
+
+
+def _select_request(connection: sqlite3.Connection, transaction_id: str) -> Optional[bytes]:
+    row = connection.execute(
+        "SELECT request FROM quotes WHERE transaction_id = ? ORDER BY created_at DESC LIMIT 1",
+        (transaction_id,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+quote_store = QuoteStore.from_env()
+
+
+@asynccontextmanager
+async def quote_store_lifespan() -> AsyncIterator[QuoteStore]:
+    """Close the quote store connection when the ASGI app shuts down."""
+    try:
+        yield quote_store
+    finally:
+        await asyncio.to_thread(quote_store.close)
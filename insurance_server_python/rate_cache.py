@@ -0,0 +1,143 @@
+"""In-process cache of zrater rate results keyed by transaction identifier."""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .metrics import rate_cache_evictions, rate_cache_hits, rate_cache_misses
+from .utils import _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedRateResults:
+    """Rate results captured from the gateway for a single transaction."""
+
+    transaction_id: str
+    status: Optional[int]
+    rate_results: Any
+    is_final: bool
+    stored_at: float
+    expires_at: float
+
+
+def _normalize_key(key: str) -> str:
+    return key.strip().lower()
+
+
+class RateResultsCache:
+    """Size-bounded LRU cache with separate TTLs for partial and final results.
+
+    Entries can be reachable through several keys (the zrater transaction id
+    and the quote identifier) while sharing one stored value.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = 512,
+        partial_ttl: float = 5.0,
+        final_ttl: float = 900.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_entries = max(max_entries, 0)
+        self.partial_ttl = partial_ttl
+        self.final_ttl = final_ttl
+        self._clock = clock
+        self._entries: "OrderedDict[str, CachedRateResults]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "RateResultsCache":
+        """Build a cache from ``INSURANCE_RATE_CACHE_*`` environment variables."""
+        return cls(
+            max_entries=_env_int("INSURANCE_RATE_CACHE_MAX_ENTRIES", 512),
+            partial_ttl=_env_float("INSURANCE_RATE_CACHE_PARTIAL_TTL_SECONDS", 5.0),
+            final_ttl=_env_float("INSURANCE_RATE_CACHE_FINAL_TTL_SECONDS", 900.0),
+        )
+
+    def get(
+        self, key: str, *, allow_partial: bool = True, count: bool = True
+    ) -> Optional[CachedRateResults]:
+        """Return a live entry for ``key`` or ``None``, counting hits and misses.
+
+        Pass ``count=False`` for repeat lookups within one tool call, such as
+        poll ticks, so each call adds at most one hit or miss.
+        """
+        normalized = _normalize_key(key)
+        entry = self._entries.get(normalized)
+        if entry is not None and entry.expires_at <= self._clock():
+            del self._entries[normalized]
+            entry = None
+        if entry is None or (not allow_partial and not entry.is_final):
+            if count:
+                self.misses += 1
+                rate_cache_misses.inc()
+            return None
+        self._entries.move_to_end(normalized)
+        if count:
+            self.hits += 1
+            rate_cache_hits.inc()
+        return entry
+
+    def put(
+        self,
+        transaction_id: str,
+        rate_results: Any,
+        *,
+        status: Optional[int],
+        is_final: bool,
+        aliases: Iterable[str] = (),
+    ) -> Optional[CachedRateResults]:
+        """Store results under ``transaction_id`` and any ``aliases``."""
+        if self.max_entries == 0:
+            return None
+        now = self._clock()
+        ttl = self.final_ttl if is_final else self.partial_ttl
+        entry = CachedRateResults(
+            transaction_id=transaction_id,
+            status=status,
+            rate_results=rate_results,
+            is_final=is_final,
+            stored_at=now,
+            expires_at=now + ttl,
+        )
+        for key in (transaction_id, *aliases):
+            if not key:
+                continue
+            normalized = _normalize_key(key)
+            self._entries[normalized] = entry
+            self._entries.move_to_end(normalized)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+            rate_cache_evictions.inc()
+        return entry
+
+    def invalidate(self, key: str) -> None:
+        """Drop ``key`` from the cache if present."""
+        self._entries.pop(_normalize_key(key), None)
+
+    def clear(self) -> None:
+        """Remove every entry and reset counters."""
+        self._entries.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current size."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+rate_results_cache = RateResultsCache.from_env()
@@ -0,0 +1,239 @@
+"""Background job queue for personal auto rate requests."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .utils import _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+RATING = "rating"
+COMPLETE = "complete"
+FAILED = "failed"
+
+PENDING_STATES = frozenset({QUEUED, RUNNING, RATING})
+
+
+class RateJobQueueFull(RuntimeError):
+    """Raised when the job queue cannot accept another rate request."""
+
+
+@dataclass
+class RateJob:
+    """State of one queued rate request."""
+
+    job_id: str
+    identifier: str
+    request_hash: Optional[str] = None
+    state: str = QUEUED
+    transaction_id: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+
+    @property
+    def done(self) -> bool:
+        return self.state not in PENDING_STATES
+
+    def mark(self, state: str, **changes: Any) -> None:
+        self.state = state
+        for name, value in changes.items():
+            setattr(self, name, value)
+        self.updated_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "jobId": self.job_id,
+            "identifier": self.identifier,
+            "state": self.state,
+            "transactionId": self.transaction_id,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+
+RateJobRunner = Callable[[RateJob], Awaitable[Dict[str, Any]]]
+
+
+class RateJobQueue:
+    """Bounded queue of rate jobs driven by a fixed pool of worker tasks.
+
+    Workers run in a fresh context, detached from the MCP request that
+    enqueued the job, so a job keeps running when the client hangs up.
+    Jobs are looked up by job id, quote identifier, or transaction id and
+    are forgotten ``retention`` seconds after they finish.
+    """
+
+    def __init__(
+        self,
+        *,
+        workers: int = 4,
+        max_pending: int = 200,
+        retention: float = 3600.0,
+        max_jobs: int = 5000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.workers = max(workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self.retention = retention
+        self.max_jobs = max(max_jobs, 1)
+        self._clock = clock
+        self._jobs: "OrderedDict[str, RateJob]" = OrderedDict()
+        self._finished_at: Dict[str, float] = {}
+        self._aliases: Dict[str, str] = {}
+        self._queue: Optional["asyncio.Queue[tuple[RateJob, RateJobRunner]]"] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "RateJobQueue":
+        """Build the queue from ``INSURANCE_RATE_JOB_*`` environment variables."""
+        return cls(
+            workers=_env_int("INSURANCE_RATE_JOB_WORKERS", 4),
+            max_pending=_env_int("INSURANCE_RATE_JOB_QUEUE_LIMIT", 200),
+            retention=_env_float("INSURANCE_RATE_JOB_RETENTION_SECONDS", 3600.0),
+        )
+
+    def start(self) -> None:
+        """Start the worker pool on the running loop if it is not running."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks and not all(t.done() for t in self._tasks):
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        empty_context = contextvars.Context()
+        self._tasks = [
+            loop.create_task(self._worker(self._queue), context=empty_context.copy())
+            for _ in range(self.workers)
+        ]
+
+    async def close(self, timeout: float = 10.0) -> None:
+        """Let queued jobs finish for up to ``timeout`` seconds, then stop."""
+        queue, tasks = self._queue, self._tasks
+        self._queue, self._tasks = None, []
+        if queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            logger.warning("Stopping rate job workers with %s jobs pending", queue.qsize())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(
+        self, identifier: str, runner: RateJobRunner, *, request_hash: Optional[str] = None
+    ) -> RateJob:
+        """Enqueue ``runner`` and return its job without waiting for it."""
+        self.start()
+        assert self._queue is not None
+        self._prune()
+        job = RateJob(job_id=uuid.uuid4().hex, identifier=identifier, request_hash=request_hash)
+        try:
+            self._queue.put_nowait((job, runner))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise RateJobQueueFull(
+                "Too many rate requests are waiting; please try again shortly."
+            ) from None
+        self.submitted += 1
+        self._jobs[job.job_id] = job
+        self._aliases[identifier.lower()] = job.job_id
+        return job
+
+    def get(self, key: str) -> Optional[RateJob]:
+        """Return the job for a job id, quote identifier, or transaction id."""
+        job_id = self._aliases.get(key.lower(), key)
+        return self._jobs.get(job_id)
+
+    def set_transaction(self, job: RateJob, transaction_id: Optional[str]) -> None:
+        """Record the gateway transaction for ``job`` and index it."""
+        job.mark(RATING, transaction_id=transaction_id)
+        if transaction_id:
+            self._aliases[transaction_id.lower()] = job.job_id
+
+    async def _worker(self, queue: "asyncio.Queue[tuple[RateJob, RateJobRunner]]") -> None:
+        while True:
+            job, runner = await queue.get()
+            try:
+                job.mark(RUNNING)
+                result = await runner(job)
+            except asyncio.CancelledError:
+                job.mark(FAILED, error="Rate job was cancelled during shutdown.")
+                raise
+            except Exception as exc:
+                self.failed += 1
+                job.mark(FAILED, error=str(exc) or exc.__class__.__name__)
+                logger.warning("Rate job %s failed: %s", job.job_id, exc)
+            else:
+                self.completed += 1
+                job.mark(COMPLETE, result=result)
+            finally:
+                self._finished_at[job.job_id] = self._clock()
+                queue.task_done()
+
+    def _prune(self) -> None:
+        horizon = self._clock() - self.retention
+        for job_id, finished_at in list(self._finished_at.items()):
+            if finished_at <= horizon or len(self._jobs) > self.max_jobs:
+                self._forget(job_id)
+
+    def _forget(self, job_id: str) -> None:
+        self._finished_at.pop(job_id, None)
+        job = self._jobs.pop(job_id, None)
+        if job is None:
+            return
+        for key in (job.identifier, job.transaction_id):
+            if key and self._aliases.get(key.lower()) == job_id:
+                del self._aliases[key.lower()]
+
+    def stats(self) -> Dict[str, int]:
+        """Return queue depth, worker count, and job outcome counters."""
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": sum(1 for job in self._jobs.values() if job.state in (RUNNING, RATING)),
+            "jobs": len(self._jobs),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+
+def rate_job_mode() -> str:
+    """Return ``"async"`` when rate requests should be queued as jobs."""
+    mode = os.getenv("INSURANCE_RATE_JOB_MODE", "sync").strip().lower()
+    return "async" if mode == "async" else "sync"
+
+
+rate_job_queue = RateJobQueue.from_env()
+
+
+@asynccontextmanager
+async def rate_job_lifespan() -> AsyncIterator[RateJobQueue]:
+    """Run the rate job workers for the lifetime of the ASGI app."""
+    if rate_job_mode() == "async":
+        rate_job_queue.start()
+    try:
+        yield rate_job_queue
+    finally:
+        await rate_job_queue.close(_env_float("INSURANCE_RATE_JOB_SHUTDOWN_SECONDS", 10.0))
@@ -0,0 +1,210 @@
+"""Adaptive polling of zrater rate results until carriers finish rating."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable, Mapping, Optional, Tuple
+
+from .constants import DEFAULT_CARRIER_INFORMATION
+from .deadlines import remaining_time
+from .utils import _env_float
+
+logger = logging.getLogger(__name__)
+
+_COMPLETE_STATUSES = {"complete", "completed", "finished", "done", "success"}
+_PENDING_STATUSES = {"pending", "inprogress", "processing", "running", "queued", "started"}
+
+RateResultsFetcher = Callable[[], Awaitable[Tuple[Optional[int], Any]]]
+
+
+@dataclass(frozen=True)
+class RatePollSettings:
+    """Backoff schedule used while waiting for carrier results."""
+
+    deadline: float = 20.0
+    initial_delay: float = 0.5
+    max_delay: float = 4.0
+    multiplier: float = 2.0
+    jitter: float = 0.25
+    reserve: float = 2.0
+
+    @classmethod
+    def from_env(cls) -> "RatePollSettings":
+        """Build settings from ``ZRATER_POLL_*`` environment variables."""
+        return cls(
+            deadline=_env_float("ZRATER_POLL_DEADLINE_SECONDS", cls.deadline),
+            initial_delay=_env_float("ZRATER_POLL_INITIAL_DELAY_SECONDS", cls.initial_delay),
+            max_delay=_env_float("ZRATER_POLL_MAX_DELAY_SECONDS", cls.max_delay),
+            multiplier=_env_float("ZRATER_POLL_MULTIPLIER", cls.multiplier),
+            jitter=_env_float("ZRATER_POLL_JITTER", cls.jitter),
+            reserve=_env_float("ZRATER_POLL_DEADLINE_RESERVE_SECONDS", cls.reserve),
+        )
+
+    def delay_for(self, attempt: int, rng: Callable[[], float] = random.random) -> float:
+        """Return the jittered delay before poll ``attempt`` (1-based)."""
+        base = min(self.max_delay, self.initial_delay * self.multiplier ** max(attempt - 1, 0))
+        spread = base * self.jitter
+        return max(0.0, base - spread + 2 * spread * rng())
+
+
+@dataclass
+class RatePollOutcome:
+    """Result of polling the rate results endpoint."""
+
+    status: Optional[int]
+    rate_results: Any
+    complete: bool
+    attempts: int
+    elapsed: float
+
+
+def _carrier_results(rate_results: Any) -> Optional[list]:
+    if not isinstance(rate_results, Mapping):
+        return None
+    carrier_results = rate_results.get("CarrierResults")
+    if carrier_results is None:
+        carrier_results = rate_results.get("carrierResults")
+    return carrier_results if isinstance(carrier_results, list) else None
+
+
+def _explicit_completion(rate_results: Mapping[str, Any]) -> Optional[bool]:
+    for key in ("IsComplete", "isComplete", "Complete", "complete"):
+        value = rate_results.get(key)
+        if isinstance(value, bool):
+            return value
+    for key in ("Status", "status", "RateStatus", "rateStatus"):
+        value = rate_results.get(key)
+        if not isinstance(value, str):
+            continue
+        normalized = "".join(ch for ch in value.lower() if ch.isalnum())
+        if normalized in _COMPLETE_STATUSES:
+            return True
+        if normalized in _PENDING_STATUSES:
+            return False
+    return None
+
+
+def requested_products(
+    carrier_information: Mapping[str, Any] = DEFAULT_CARRIER_INFORMATION,
+) -> Tuple[Tuple[Optional[str], Optional[str]], ...]:
+    """Return ``(ProductId, ProductName)`` pairs requested from the gateway."""
+    products = carrier_information.get("Products") or []
+    return tuple(
+        (product.get("ProductId"), product.get("ProductName"))
+        for product in products
+        if isinstance(product, Mapping)
+    )
+
+
+def reported_products(rate_results: Any) -> set[str]:
+    """Return lower-cased product ids and names present in carrier results."""
+    reported: set[str] = set()
+    for result in _carrier_results(rate_results) or []:
+        if not isinstance(result, Mapping):
+            continue
+        for key in ("ProductId", "productId", "ProductName", "productName", "ProgramName", "programName"):
+            value = result.get(key)
+            if isinstance(value, str) and value.strip():
+                reported.add(value.strip().lower())
+    return reported
+
+
+def _product_keys(product: Tuple[Optional[str], Optional[str]]) -> set[str]:
+    return {value.strip().lower() for value in product if isinstance(value, str) and value.strip()}
+
+
+def completed_products(
+    rate_results: Any,
+    expected_products: Iterable[Tuple[Optional[str], Optional[str]]],
+) -> int:
+    """Return how many ``expected_products`` appear in the carrier results."""
+    reported = reported_products(rate_results)
+    return sum(1 for product in expected_products if _product_keys(product) & reported)
+
+
+def rate_results_complete(
+    rate_results: Any,
+    expected_products: Iterable[Tuple[Optional[str], Optional[str]]] = (),
+) -> bool:
+    """Return ``True`` once every requested carrier product has reported.
+
+    An explicit completion flag or status on the payload wins. Otherwise the
+    carrier results must mention each expected product by id or name; with no
+    expectations any non-empty carrier result list counts as complete.
+    """
+    if not isinstance(rate_results, Mapping):
+        return False
+
+    explicit = _explicit_completion(rate_results)
+    if explicit is not None:
+        return explicit
+
+    carrier_results = _carrier_results(rate_results)
+    if not carrier_results:
+        return False
+
+    # Products without an id or name cannot be matched, so they are not awaited.
+    expected = [product for product in expected_products if _product_keys(product)]
+    return completed_products(rate_results, expected) == len(expected)
+
+
+async def poll_rate_results(
+    fetch: RateResultsFetcher,
+    *,
+    is_complete: Callable[[Any], bool],
+    settings: Optional[RatePollSettings] = None,
+    sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    clock: Callable[[], float] = time.monotonic,
+    rng: Callable[[], float] = random.random,
+    on_update: Optional[Callable[[Any, bool], Awaitable[None]]] = None,
+) -> RatePollOutcome:
+    """Fetch rate results until ``is_complete`` holds or the deadline passes.
+
+    The first fetch happens immediately. Later fetches back off exponentially
+    with jitter; the last sleep is clipped so one final fetch lands on the
+    deadline, which is also clipped to the calling tool's deadline minus
+    ``settings.reserve``. ``on_update`` is awaited with ``(rate_results, complete)`` after
+    every fetch.
+    """
+    settings = settings or RatePollSettings.from_env()
+    started = clock()
+    budget = max(settings.deadline, 0.0)
+    remaining = remaining_time()
+    if remaining is not None:
+        # Leave part of the tool's remaining time for the final fetch and reply.
+        budget = min(budget, max(remaining - settings.reserve, 0.0))
+    deadline = started + budget
+    attempts = 0
+
+    while True:
+        attempts += 1
+        status, rate_results = await fetch()
+        complete = is_complete(rate_results)
+        if on_update is not None:
+            await on_update(rate_results, complete)
+        if complete:
+            break
+
+        remaining = deadline - clock()
+        if remaining <= 0:
+            break
+        delay = min(settings.delay_for(attempts, rng), remaining)
+
+        logger.debug(
+            "Rate results incomplete after attempt %s; polling again in %.2fs",
+            attempts,
+            delay,
+        )
+        await sleep(delay)
+
+    return RatePollOutcome(
+        status=status,
+        rate_results=rate_results,
+        complete=complete,
+        attempts=attempts,
+        elapsed=clock() - started,
+    )
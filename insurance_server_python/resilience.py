@@ -0,0 +1,271 @@
+"""Circuit breakers and a shared retry budget for rating gateway calls."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+
+from .deadlines import deadline_expired
+from .metrics import circuit_breaker_state
+from .utils import _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATES = (CLOSED, OPEN, HALF_OPEN)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the endpoint's circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        self.name = name
+        self.retry_after = max(retry_after, 0.0)
+        super().__init__(
+            f"The rating gateway is temporarily unavailable ({name} circuit open); "
+            f"retry in about {self.retry_after:.0f}s."
+        )
+
+
+def is_failure_status(status_code: int) -> bool:
+    """Return ``True`` for responses that indicate an unhealthy gateway."""
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(half_open_max_calls, 1)
+        self._clock = clock
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._half_open_in_flight = 0
+        self.rejected = 0
+        self.opened_count = 0
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        """Build a breaker from ``ZRATER_BREAKER_*`` environment variables."""
+        return cls(
+            name,
+            failure_threshold=_env_int("ZRATER_BREAKER_FAILURE_THRESHOLD", 5),
+            recovery_timeout=_env_float("ZRATER_BREAKER_RECOVERY_SECONDS", 30.0),
+            half_open_max_calls=_env_int("ZRATER_BREAKER_HALF_OPEN_CALLS", 1),
+        )
+
+    def before_call(self) -> None:
+        """Admit a call or raise :class:`CircuitOpenError`."""
+        if self.state == OPEN:
+            elapsed = self._clock() - (self.opened_at or 0.0)
+            if elapsed < self.recovery_timeout:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, self.recovery_timeout - elapsed)
+            logger.info("Circuit %s half-open; probing gateway", self.name)
+            self.state = HALF_OPEN
+            self._half_open_in_flight = 0
+
+        if self.state == HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.name, 0.0)
+            self._half_open_in_flight += 1
+
+    def release(self) -> None:
+        """Give back a half-open probe slot for a call that never completed."""
+        if self.state == HALF_OPEN and self._half_open_in_flight:
+            self._half_open_in_flight -= 1
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("Circuit %s closed after successful probe", self.name)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._half_open_in_flight = 0
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    "Circuit %s opened after %s consecutive failures",
+                    self.name,
+                    self.consecutive_failures,
+                )
+                self.opened_count += 1
+            self.state = OPEN
+            self.opened_at = self._clock()
+            self._half_open_in_flight = 0
+
+    def snapshot(self) -> Dict[str, object]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_count": self.opened_count,
+            "rejected": self.rejected,
+        }
+
+
+class RetryBudget:
+    """Cap retries to a fraction of recent requests, plus a small fixed floor."""
+
+    def __init__(
+        self,
+        *,
+        ratio: float = 0.2,
+        min_per_second: float = 1.0,
+        window: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.window = window
+        self._clock = clock
+        self._requests: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self.exhausted = 0
+
+    @classmethod
+    def from_env(cls) -> "RetryBudget":
+        """Build a budget from ``ZRATER_RETRY_BUDGET_*`` environment variables."""
+        return cls(
+            ratio=_env_float("ZRATER_RETRY_BUDGET_RATIO", 0.2),
+            min_per_second=_env_float("ZRATER_RETRY_BUDGET_MIN_PER_SECOND", 1.0),
+            window=_env_float("ZRATER_RETRY_BUDGET_WINDOW_SECONDS", 10.0),
+        )
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.window
+        for events in (self._requests, self._retries):
+            while events and events[0] <= horizon:
+                events.popleft()
+
+    def record_request(self) -> None:
+        self._requests.append(self._clock())
+
+    def try_spend(self) -> bool:
+        """Reserve one retry if the budget allows it."""
+        now = self._clock()
+        self._trim(now)
+        allowed = self.min_per_second * self.window + self.ratio * len(self._requests)
+        if len(self._retries) + 1 > allowed:
+            self.exhausted += 1
+            return False
+        self._retries.append(now)
+        return True
+
+    def snapshot(self) -> Dict[str, float]:
+        self._trim(self._clock())
+        return {
+            "requests": len(self._requests),
+            "retries": len(self._retries),
+            "exhausted": self.exhausted,
+        }
+
+
+async def call_with_breaker(
+    breaker: CircuitBreaker,
+    send: Callable[[], Awaitable[httpx.Response]],
+    *,
+    retry_budget: Optional[RetryBudget] = None,
+    max_retries: int = 0,
+    retry_delay: float = 0.2,
+    sleep: Callable[[float], Awaitable[object]] = asyncio.sleep,
+) -> httpx.Response:
+    """Send a request through ``breaker``, retrying transient failures.
+
+    Retries are only attempted when ``max_retries`` is positive and the shared
+    ``retry_budget`` still has room, so callers must only enable them for
+    idempotent requests. The final failing response is returned unchanged so
+    the caller can surface it; transport errors are re-raised. A timeout
+    that only happened because the calling tool's deadline clipped the
+    request says nothing about the gateway, so it is not counted as a
+    failure.
+    """
+    attempt = 0
+    if retry_budget is not None:
+        retry_budget.record_request()
+    while True:
+        breaker.before_call()
+        try:
+            response = await send()
+        except httpx.HTTPError as exc:
+            if isinstance(exc, httpx.TimeoutException) and deadline_expired():
+                breaker.release()
+                raise
+            breaker.record_failure()
+            if not _may_retry(attempt, max_retries, retry_budget):
+                raise
+        except BaseException:
+            breaker.release()
+            raise
+        else:
+            if not is_failure_status(response.status_code):
+                breaker.record_success()
+                return response
+            breaker.record_failure()
+            if (
+                response.status_code not in RETRYABLE_STATUS_CODES
+                or not _may_retry(attempt, max_retries, retry_budget)
+            ):
+                return response
+
+        attempt += 1
+        logger.info("Retrying %s request (attempt %s of %s)", breaker.name, attempt, max_retries)
+        await sleep(retry_delay * attempt)
+
+
+def _may_retry(attempt: int, max_retries: int, retry_budget: Optional[RetryBudget]) -> bool:
+    if attempt >= max_retries or retry_budget is None:
+        return False
+    return retry_budget.try_spend()
+
+
+SUBMIT_ENDPOINT = "submit"
+RESULTS_ENDPOINT = "getRateResultsById"
+
+circuit_breakers: Dict[str, CircuitBreaker] = {
+    SUBMIT_ENDPOINT: CircuitBreaker.from_env(SUBMIT_ENDPOINT),
+    RESULTS_ENDPOINT: CircuitBreaker.from_env(RESULTS_ENDPOINT),
+}
+retry_budget = RetryBudget.from_env()
+
+
+def resilience_snapshot() -> Dict[str, object]:
+    """Return breaker states and retry budget usage for dashboards."""
+    return {
+        "circuit_breakers": {
+            name: breaker.snapshot() for name, breaker in circuit_breakers.items()
+        },
+        "retry_budget": retry_budget.snapshot(),
+    }
+
+
+def export_breaker_states() -> None:
+    """Copy the current state of each gateway breaker into its metrics gauge."""
+    for name, breaker in circuit_breakers.items():
+        for state in STATES:
+            circuit_breaker_state.set(1.0 if state == breaker.state else 0.0, name, state)
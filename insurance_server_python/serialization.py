@@ -0,0 +1,90 @@
+"""JSON serialization backend shared by upstream calls, audit, and HTTP routes.
+
+``orjson`` is used when it is installed and falls back to the standard
+library otherwise. ``INSURANCE_JSON_BACKEND`` (``auto``, ``orjson``, or
+``json``) pins the choice. Both backends emit compact UTF-8 bytes.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Callable, Optional
+
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - depends on the optional dependency being installed
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+def _stdlib_dumps(value: Any, sort_keys: bool = False) -> bytes:
+    return json.dumps(
+        value,
+        sort_keys=sort_keys,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
+
+
+def _orjson_dumps(value: Any, sort_keys: bool = False) -> bytes:
+    option = orjson.OPT_NON_STR_KEYS
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(value, default=str, option=option)
+
+
+_dumps: Callable[..., bytes] = _stdlib_dumps
+_loads: Callable[[Any], Any] = json.loads
+backend_name = "json"
+
+
+def use_backend(name: Optional[str] = None) -> str:
+    """Select the serializer backend and return the name of the one in use."""
+    global _dumps, _loads, backend_name
+    requested = (name or os.getenv("INSURANCE_JSON_BACKEND", "auto")).strip().lower()
+    if requested in ("auto", "orjson") and orjson is not None:
+        _dumps, _loads, backend_name = _orjson_dumps, orjson.loads, "orjson"
+    else:
+        if requested == "orjson":
+            logger.warning(
+                "INSURANCE_JSON_BACKEND=orjson but orjson is not installed; using json."
+            )
+        _dumps, _loads, backend_name = _stdlib_dumps, json.loads, "json"
+    return backend_name
+
+
+def dumps(value: Any) -> bytes:
+    """Serialize ``value`` to compact JSON bytes."""
+    return _dumps(value)
+
+
+def dumps_canonical(value: Any) -> bytes:
+    """Serialize ``value`` with sorted keys, suitable for hashing."""
+    return _dumps(value, sort_keys=True)
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from ``bytes`` or ``str``."""
+    return _loads(data)
+
+
+class JSONBytesResponse(Response):
+    """Starlette response for a body that is already JSON bytes."""
+
+    media_type = JSON_MEDIA_TYPE
+
+
+def json_response(value: Any, status_code: int = 200) -> JSONBytesResponse:
+    """Serialize ``value`` once with the active backend into a response."""
+    return JSONBytesResponse(dumps(value), status_code=status_code)
+
+
+use_backend()
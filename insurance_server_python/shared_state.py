@@ -0,0 +1,308 @@
+"""SQLite-backed state shared by every uvicorn worker on one host.
+
+The rate results cache, recent submissions, and single-flight groups live in
+each process's memory, so running several workers would multiply gateway
+calls. :class:`SharedState` backs them with one SQLite file in WAL mode:
+expiring JSON entries that any worker can read, and short leases that let
+one worker submit a rate request while the others wait for its result.
+With no ``INSURANCE_SHARED_STATE_PATH`` it is disabled and every call is a
+no-op, which is the right setting for a single worker.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from .serialization import dumps, loads
+from .utils import _env_float
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RATE_RESULTS = "rate_results"
+SUBMISSIONS = "submissions"
+TRANSACTIONS = "transactions"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at);
+CREATE TABLE IF NOT EXISTS leases (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+
+def _normalize_key(key: str) -> str:
+    return key.strip().lower()
+
+
+class SharedState:
+    """Expiring key/value entries and leases in a SQLite file.
+
+    Expiry uses wall-clock time so every process agrees on it. Database work
+    runs in a worker thread through one connection per process; errors are
+    logged and counted, and callers fall back to their in-process state.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path],
+        *,
+        busy_timeout: float = 5.0,
+        poll_interval: float = 0.1,
+        transaction_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self.busy_timeout = busy_timeout
+        self.poll_interval = poll_interval
+        # How long quote identifier -> transaction id mappings are shared.
+        self.transaction_ttl = transaction_ttl
+        self._clock = clock
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.waited = 0
+        self.errors = 0
+
+    @classmethod
+    def from_env(cls) -> "SharedState":
+        """Build the store from ``INSURANCE_SHARED_STATE_*`` environment variables."""
+        path = os.getenv("INSURANCE_SHARED_STATE_PATH", "").strip()
+        return cls(
+            Path(path) if path else None,
+            busy_timeout=_env_float("INSURANCE_SHARED_STATE_BUSY_TIMEOUT_SECONDS", 5.0),
+            poll_interval=_env_float("INSURANCE_SHARED_STATE_POLL_SECONDS", 0.1),
+            transaction_ttl=_env_float("INSURANCE_SHARED_STATE_TRANSACTION_TTL_SECONDS", 3600.0),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            assert self.path is not None
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    async def _run(self, operation: str, fn, *args: Any) -> Any:
+        if not self.enabled:
+            return None
+
+        def call() -> Any:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    return fn(connection, *args)
+
+        try:
+            return await asyncio.to_thread(call)
+        except sqlite3.Error as exc:
+            self.errors += 1
+            logger.warning("Shared state %s failed: %s", operation, exc)
+            return None
+
+    async def get(self, namespace: str, key: str) -> Any:
+        """Return the live value stored under ``key``, or ``None``."""
+        if not self.enabled:
+            return None
+        blob = await self._run("get", _select_entry, namespace, _normalize_key(key), self._clock())
+        if blob is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return loads(blob)
+
+    async def put(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        """Store ``value`` (JSON-serializable) under ``key`` for ``ttl`` seconds."""
+        if ttl <= 0 or not key:
+            return
+        await self._run(
+            "put", _upsert_entry, namespace, _normalize_key(key), dumps(value), self._clock() + ttl
+        )
+
+    async def acquire(self, namespace: str, key: str, seconds: float) -> bool:
+        """Take the lease on ``key`` unless another live owner holds it."""
+        acquired = await self._run(
+            "acquire",
+            _acquire_lease,
+            namespace,
+            _normalize_key(key),
+            self._owner,
+            self._clock(),
+            seconds,
+        )
+        return bool(acquired)
+
+    async def release(self, namespace: str, key: str) -> None:
+        """Give up a lease this process holds on ``key``."""
+        await self._run("release", _release_lease, namespace, _normalize_key(key), self._owner)
+
+    async def run_once(
+        self,
+        namespace: str,
+        key: str,
+        fn: Callable[[], Awaitable[T]],
+        *,
+        encode: Callable[[T], Any],
+        decode: Callable[[Any], T],
+        ttl: float,
+        lease_seconds: float = 30.0,
+    ) -> Tuple[T, bool]:
+        """Run ``fn`` in one worker per ``key``; return ``(result, shared)``.
+
+        A value another worker already stored is decoded and returned.
+        Otherwise the caller takes a lease, runs ``fn``, and stores
+        ``encode(result)`` for ``ttl`` seconds (``None`` stores nothing).
+        Callers that find the lease taken poll for the stored value and run
+        ``fn`` themselves once the lease is released without a value or
+        ``lease_seconds`` pass.
+        """
+        if not self.enabled:
+            return await fn(), False
+        deadline = time.monotonic() + lease_seconds
+        leased = False
+        waited = False
+        while True:
+            stored = await self.get(namespace, key)
+            if stored is not None:
+                if waited:
+                    self.waited += 1
+                return decode(stored), True
+            outcome = await self._run(
+                "acquire",
+                _acquire_lease,
+                namespace,
+                _normalize_key(key),
+                self._owner,
+                self._clock(),
+                lease_seconds,
+            )
+            leased = bool(outcome)
+            # ``None`` means the database failed; run without coordination.
+            if outcome is None or leased or time.monotonic() >= deadline:
+                break
+            waited = True
+            await asyncio.sleep(self.poll_interval)
+        try:
+            result = await fn()
+            encoded = encode(result)
+            if encoded is not None:
+                await self.put(namespace, key, encoded, ttl)
+            return result, False
+        finally:
+            if leased:
+                await self.release(namespace, key)
+
+    async def purge_expired(self) -> None:
+        """Delete expired entries and leases."""
+        await self._run("purge", _purge, self._clock())
+
+    def close(self) -> None:
+        with self._lock:
+            connection, self._connection = self._connection, None
+        if connection is not None:
+            connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "waited": self.waited,
+            "errors": self.errors,
+        }
+
+
+def _select_entry(
+    connection: sqlite3.Connection, namespace: str, key: str, now: float
+) -> Optional[bytes]:
+    row = connection.execute(
+        "SELECT value FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+        (namespace, key, now),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _upsert_entry(
+    connection: sqlite3.Connection, namespace: str, key: str, value: bytes, expires_at: float
+) -> None:
+    connection.execute(
+        "INSERT INTO entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, "
+        "expires_at = excluded.expires_at",
+        (namespace, key, value, expires_at),
+    )
+
+
+def _acquire_lease(
+    connection: sqlite3.Connection,
+    namespace: str,
+    key: str,
+    owner: str,
+    now: float,
+    seconds: float,
+) -> bool:
+    cursor = connection.execute(
+        "INSERT INTO leases (namespace, key, owner, expires_at) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT (namespace, key) DO UPDATE SET owner = excluded.owner, "
+        "expires_at = excluded.expires_at WHERE leases.expires_at <= ?",
+        (namespace, key, owner, now + seconds, now),
+    )
+    return cursor.rowcount == 1
+
+
+def _release_lease(connection: sqlite3.Connection, namespace: str, key: str, owner: str) -> None:
+    connection.execute(
+        "DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?",
+        (namespace, key, owner),
+    )
+
+
+def _purge(connection: sqlite3.Connection, now: float) -> None:
+    connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+    connection.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+
+
+shared_state = SharedState.from_env()
+
+
+@asynccontextmanager
+async def shared_state_lifespan() -> AsyncIterator[SharedState]:
+    """Purge expired rows at startup and close the connection at shutdown."""
+    if shared_state.enabled:
+        await shared_state.purge_expired()
+    try:
+        yield shared_state
+    finally:
+        await asyncio.to_thread(shared_state.close)
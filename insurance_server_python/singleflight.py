@@ -0,0 +1,64 @@
+"""Coalesce concurrent identical async calls into a single in-flight task."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Tuple, TypeVar
+
+from .deadlines import detached_context
+from .metrics import singleflight_coalesced
+
+T = TypeVar("T")
+
+
+def _consume_exception(task: "asyncio.Task[object]") -> None:
+    # Retrieve the outcome so an orphaned failure does not log
+    # "Task exception was never retrieved" when every waiter went away.
+    if not task.cancelled():
+        task.exception()
+
+
+class SingleFlight(Generic[T]):
+    """Share one upstream call between concurrent callers using the same key.
+
+    The work runs in its own task, so a caller that is cancelled does not
+    cancel the call for the remaining waiters. That task runs without the
+    first caller's deadline, so a short budget does not fail the call for
+    waiters with more time; each caller still stops waiting at its own
+    deadline. The first caller's trace span is kept, and spans recorded
+    after that trace finishes are dropped. ``name`` labels the
+    ``singleflight_coalesced_total`` metric.
+    """
+
+    def __init__(self, name: str = "default") -> None:
+        self.name = name
+        self._inflight: Dict[str, "asyncio.Task[T]"] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """Run ``fn`` once per in-flight ``key``; return ``(result, shared)``."""
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            self.calls += 1
+            task = detached_context().run(asyncio.ensure_future, fn())
+            self._inflight[key] = task
+            task.add_done_callback(_consume_exception)
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            singleflight_coalesced.inc(self.name)
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: str, task: "asyncio.Task[T]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def stats(self) -> Dict[str, int]:
+        """Return leader calls, coalesced waiters, and current in-flight keys."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
@@ -0,0 +1,13 @@
+"""Tests for the insurance MCP server.
+
+Many tests submit rate requests through the real tool handlers. The shared
+audit sink and quote store are switched off here, once for the whole
+package, so those submissions never write an audit log or a quote database
+to disk. Tests that exercise the quote store patch in their own instance.
+"""
+
+from insurance_server_python.audit import rate_audit_sink
+from insurance_server_python.quote_store import quote_store
+
+rate_audit_sink.enabled = False
+quote_store.enabled = False
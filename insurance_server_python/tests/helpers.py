@@ -0,0 +1,39 @@
+"""Fakes and fixtures shared by the insurance server tests."""
+
+from __future__ import annotations
+
+import asyncio
+
+from insurance_server_python.idempotency import recent_submissions
+from insurance_server_python.rate_cache import rate_results_cache
+
+
+class FakeClock:
+    """Manually advanced clock whose ``sleep`` moves time instead of waiting."""
+
+    def __init__(self, now: float = 0.0) -> None:
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+        await asyncio.sleep(0)
+
+
+def reset_rate_state() -> None:
+    """Forget recent submissions and cached rate results."""
+    recent_submissions.clear()
+    rate_results_cache.clear()
+
+
+class RateStateIsolation:
+    """Test case mixin that starts and ends each test with empty rate caches."""
+
+    def setUp(self) -> None:
+        super().setUp()
+        reset_rate_state()
+        self.addCleanup(reset_rate_state)
@@ -0,0 +1,190 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from insurance_server_python import tool_handlers
+from insurance_server_python.admission import (
+    AdmissionRejected,
+    TokenBucket,
+    UpstreamAdmission,
+    _timeout_fallback,
+)
+from insurance_server_python.metrics import (
+    admission_queue_depth,
+    admission_rejected,
+    admission_wait,
+)
+from insurance_server_python.resilience import RetryBudget
+from insurance_server_python.tests.helpers import FakeClock
+
+
+class TokenBucketTests(unittest.TestCase):
+    def test_reservations_wait_once_burst_is_spent(self) -> None:
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.5)
+
+        clock.now = 1.0
+        self.assertEqual(bucket.reserve(), 0.0)
+
+
+class UpstreamAdmissionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_global_limit_serializes_calls(self) -> None:
+        admission = UpstreamAdmission(max_concurrency=1, state_rate=0, max_wait=5)
+        active = 0
+        peak = 0
+
+        async def call() -> None:
+            nonlocal active, peak
+            async with admission.admit():
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*(call() for _ in range(3)))
+
+        self.assertEqual(peak, 1)
+        stats = admission.stats()
+        self.assertEqual(stats["admitted"], 3)
+        self.assertEqual(stats["max_queue_depth"], 2)
+        self.assertGreater(stats["wait_seconds_max"], 0)
+
+    async def test_state_rate_limit_delays_and_rejects_past_deadline(self) -> None:
+        clock = FakeClock()
+        admission = UpstreamAdmission(
+            state_rate=1, state_burst=1, max_wait=1.5, clock=clock, sleep=clock.sleep
+        )
+
+        async with admission.admit("ca"):
+            pass
+        async with admission.admit("CA"):
+            pass
+        self.assertEqual(clock.now, 1.0)
+
+        async with admission.admit("NY"):
+            pass
+        self.assertEqual(clock.now, 1.0)
+
+        admission.max_wait = 0.5
+        with self.assertRaises(AdmissionRejected):
+            async with admission.admit("CA"):
+                pass
+        self.assertEqual(admission.stats()["rejected"], 1)
+
+    async def test_full_queue_rejects_immediately(self) -> None:
+        admission = UpstreamAdmission(max_concurrency=1, state_rate=0, max_queue=1)
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with admission.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+
+        with self.assertRaises(AdmissionRejected):
+            async with admission.admit():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    async def test_concurrency_wait_times_out_without_leaking_permits(self) -> None:
+        admission = UpstreamAdmission(max_concurrency=1, state_rate=0, max_wait=0.01)
+        release = asyncio.Event()
+
+        async def hold() -> None:
+            async with admission.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        with self.assertRaises(AdmissionRejected):
+            async with admission.admit():
+                pass
+
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+        self.assertEqual(admission.stats()["queue_depth"], 0)
+        self.assertEqual(admission.stats()["in_flight"], 0)
+        self.assertFalse(admission._get_semaphore().locked())
+
+    async def test_timeout_fallback_matches_asyncio_timeout(self) -> None:
+        with self.assertRaises(asyncio.TimeoutError):
+            async with _timeout_fallback(0.01):
+                await asyncio.sleep(1)
+        async with _timeout_fallback(1):
+            await asyncio.sleep(0)
+
+    async def test_queue_depth_and_wait_are_exported(self) -> None:
+        admission = UpstreamAdmission(max_concurrency=1, state_rate=0, max_queue=1, max_wait=5)
+        release = asyncio.Event()
+        waits = admission_wait.count()
+        rejections = admission_rejected.value()
+
+        async def hold() -> None:
+            async with admission.admit():
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        self.assertEqual(admission_queue_depth.value(), 1)
+        with self.assertRaises(AdmissionRejected):
+            async with admission.admit():
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+        self.assertEqual(admission_queue_depth.value(), 0)
+        self.assertEqual(admission_wait.count() - waits, 2)
+        self.assertEqual(admission_rejected.value() - rejections, 1)
+
+
+class GatewayAdmissionTests(unittest.IsolatedAsyncioTestCase):
+    async def test_slot_is_released_during_retry_backoff(self) -> None:
+        admission = UpstreamAdmission(max_concurrency=1, state_rate=0, max_wait=5)
+        responses = [httpx.Response(503), httpx.Response(200, json={"CarrierResults": []})]
+        first_attempt = asyncio.Event()
+
+        async def send(url, **kwargs):
+            first_attempt.set()
+            return responses.pop(0)
+
+        async def probe() -> None:
+            await first_attempt.wait()
+            await asyncio.sleep(0.01)
+            async with admission.admit():
+                pass
+
+        with patch.object(tool_handlers, "upstream_admission", admission), patch.object(
+            tool_handlers, "_upstream_get", side_effect=send
+        ), patch.object(tool_handlers, "retry_budget", RetryBudget()):
+            fetch = asyncio.create_task(
+                tool_handlers._fetch_personal_auto_rate_results("txn-1", {})
+            )
+            # The retry waits 0.2s; the other caller must not have to wait for it.
+            await asyncio.wait_for(probe(), timeout=0.1)
+            status, results = await fetch
+
+        self.assertEqual(status, 200)
+        self.assertEqual(admission.stats()["admitted"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from insurance_server_python.audit import DEFAULT_AUDIT_PATH, RateAuditSink
+from insurance_server_python.metrics import audit_records_dropped, audit_records_written
+
+
+class RateAuditSinkTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+        self.path = self.directory / "audit" / "rate_requests.ndjson"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    async def test_records_are_appended_as_ndjson(self) -> None:
+        sink = RateAuditSink(self.path)
+        self.assertTrue(
+            sink.record({"Identifier": "q-1"}, identifier="q-1", transaction_id="tx-1", status=200)
+        )
+        sink.record({"Identifier": "q-2"}, identifier="q-2", transaction_id="tx-2")
+        await sink.close()
+
+        lines = [json.loads(line) for line in self.path.read_text().splitlines()]
+        self.assertEqual([line["transactionId"] for line in lines], ["tx-1", "tx-2"])
+        self.assertEqual(lines[0]["status"], 200)
+        self.assertEqual(lines[1]["request"], {"Identifier": "q-2"})
+        self.assertEqual(sink.stats()["written"], 2)
+        self.assertGreaterEqual(sink.stats()["fsyncs"], 1)
+
+    async def test_each_batch_is_fsynced_before_close(self) -> None:
+        sink = RateAuditSink(self.path)
+        self.addAsyncCleanup(sink.close)
+        with patch("insurance_server_python.audit.os.fsync", wraps=os.fsync) as fsync:
+            for index in (1, 2):
+                sink.record({}, identifier=f"q-{index}", transaction_id=f"tx-{index}")
+                for _ in range(200):
+                    if sink.stats()["written"] == index:
+                        break
+                    await asyncio.sleep(0.01)
+
+            self.assertEqual(fsync.call_count, 2)
+        self.assertEqual(sink.stats()["fsyncs"], 2)
+        self.assertEqual(len(self.path.read_text().splitlines()), 2)
+
+    async def test_full_queue_drops_instead_of_blocking(self) -> None:
+        dropped, written = audit_records_dropped.value(), audit_records_written.value()
+        sink = RateAuditSink(self.path, queue_size=2)
+        results = [
+            sink.record({}, identifier=f"q-{index}", transaction_id=None) for index in range(5)
+        ]
+        await sink.close()
+
+        self.assertEqual(results, [True, True, False, False, False])
+        self.assertEqual(sink.stats()["dropped"], 3)
+        self.assertEqual(len(self.path.read_text().splitlines()), 2)
+        self.assertEqual(audit_records_dropped.value() - dropped, 3)
+        self.assertEqual(audit_records_written.value() - written, 2)
+
+    async def test_rotates_by_size(self) -> None:
+        sink = RateAuditSink(self.path, max_bytes=200, backups=2, batch_size=1)
+        for index in range(6):
+            sink.record({"padding": "x" * 120}, identifier=f"q-{index}", transaction_id=None)
+            await asyncio.sleep(0)
+        await sink.close()
+
+        self.assertGreaterEqual(sink.rotations, 2)
+        self.assertTrue(self.path.with_name("rate_requests.ndjson.1").exists())
+        self.assertFalse(self.path.with_name("rate_requests.ndjson.3").exists())
+
+    async def test_debug_pretty_file_is_opt_in(self) -> None:
+        pretty = self.directory / "latest.json"
+        sink = RateAuditSink(self.path, debug_pretty=True, debug_pretty_path=pretty)
+        sink.record({"b": 1, "a": 2}, identifier="q-1", transaction_id="tx-1")
+        await sink.close()
+
+        self.assertEqual(pretty.read_text(), '{\n  "a": 2,\n  "b": 1\n}')
+
+    async def test_disabled_sink_writes_nothing(self) -> None:
+        sink = RateAuditSink(self.path, enabled=False)
+        self.assertFalse(sink.record({}, identifier="q-1", transaction_id=None))
+        await sink.close()
+        self.assertFalse(self.path.exists())
+
+    def test_default_path_is_relative_to_the_working_directory(self) -> None:
+        self.assertFalse(DEFAULT_AUDIT_PATH.is_absolute())
+        self.assertEqual(DEFAULT_AUDIT_PATH, Path("audit") / "rate_requests.ndjson")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+import mcp.types as types
+from pydantic import ValidationError
+
+from insurance_server_python import main, tool_handlers
+from insurance_server_python.coverage_whatif import (
+    format_premium_matrix,
+    premium_matrix,
+    variant_arguments,
+    variant_label,
+)
+from insurance_server_python.fake_gateway import (
+    RESULTS_PATH,
+    FakeGatewaySettings,
+    create_fake_gateway_app,
+)
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS
+from insurance_server_python.widget_registry import TOOL_REGISTRY, ToolRegistration
+
+
+class PremiumMatrixTests(unittest.TestCase):
+    def test_variant_arguments_override_base_coverages(self) -> None:
+        base = {"Identifier": "q-1", "PolicyCoverages": {"LiabilityBiLimit": "30/60", "MedPayLimit": "1000"}}
+        arguments = variant_arguments(base, {"LiabilityBiLimit": "100/300"}, 1)
+
+        self.assertEqual(arguments["Identifier"], "q-1-v2")
+        self.assertEqual(
+            arguments["PolicyCoverages"], {"LiabilityBiLimit": "100/300", "MedPayLimit": "1000"}
+        )
+        self.assertEqual(base["PolicyCoverages"]["LiabilityBiLimit"], "30/60")
+        self.assertEqual(variant_label(arguments["PolicyCoverages"]), "BI 100/300, MedPay 1000")
+
+    def test_matrix_uses_lowest_premium_per_carrier(self) -> None:
+        variants = [
+            {
+                "label": "BI 30/60",
+                "rate_results": {
+                    "CarrierResults": [
+                        {"ProductName": "Anchor Gemini", "TotalPremium": 1200.0},
+                        {"ProductName": "Anchor Gemini", "TotalPremium": 1100.0},
+                        {"ProductName": "Anchor Motor Club", "TotalPremium": 1300.0},
+                    ]
+                },
+                "complete": True,
+            },
+            {"label": "BI 100/300", "rate_results": None, "error": "gateway busy"},
+        ]
+
+        matrix = premium_matrix(variants)
+
+        self.assertEqual(matrix["carriers"], ["Anchor Gemini", "Anchor Motor Club"])
+        self.assertEqual(matrix["variants"][0]["premiums"], [1100.0, 1300.0])
+        self.assertEqual(matrix["variants"][0]["bestPremium"], 1100.0)
+        self.assertEqual(matrix["variants"][1]["premiums"], [None, None])
+        table = format_premium_matrix(matrix)
+        self.assertIn("| BI 30/60 | $1,100.00 | $1,300.00 | $1,100.00 |", table)
+        self.assertIn("| BI 100/300 | error | error | — |", table)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class CoverageWhatIfToolTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_variants_are_rated_into_a_matrix(self) -> None:
+        app = create_fake_gateway_app(
+            FakeGatewaySettings(latency_mean=0.0, rating_seconds=0.0, seed=3)
+        )
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            result = await tool_handlers._compare_personal_auto_coverage_variants(
+                {
+                    "BaseRequest": RATE_ARGUMENTS,
+                    "CoverageVariants": [
+                        {"LiabilityBiLimit": "30/60"},
+                        {"LiabilityBiLimit": "100/300"},
+                        {"LiabilityBiLimit": "100/300", "LiabilityPdLimit": "50000"},
+                    ],
+                }
+            )
+        await client.aclose()
+
+        structured = result["structured_content"]
+        self.assertEqual(app.state.gateway.requests["submit"], 3)
+        self.assertEqual(len(structured["carriers"]), 3)
+        rows = structured["variants"]
+        self.assertEqual([row["identifier"] for row in rows], ["quote-fake-1-v1", "quote-fake-1-v2", "quote-fake-1-v3"])
+        self.assertTrue(all(row["complete"] and row["transactionId"] for row in rows))
+        self.assertNotEqual(rows[0]["premiums"], rows[1]["premiums"])
+        self.assertIn("| BI 100/300, PD 50000 |", result["content"][0].text)
+
+    async def test_invalid_variant_limit_is_rejected(self) -> None:
+        with self.assertRaises(ValidationError):
+            await tool_handlers._compare_personal_auto_coverage_variants(
+                {"BaseRequest": RATE_ARGUMENTS, "CoverageVariants": [{"LiabilityBiLimit": "1/2"}]}
+            )
+
+    @patch.dict(os.environ, {"INSURANCE_WHATIF_CONCURRENCY": "2"})
+    async def test_timeout_lists_only_submitted_variants(self) -> None:
+        async def slow_rate(*args, **kwargs):
+            await asyncio.sleep(5)
+
+        name = "compare-personal-auto-coverage-options"
+        registration = TOOL_REGISTRY[name]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name=name,
+                arguments={
+                    "BaseRequest": RATE_ARGUMENTS,
+                    "CoverageVariants": [
+                        {"LiabilityBiLimit": "30/60"},
+                        {"LiabilityBiLimit": "100/300"},
+                        {"LiabilityPdLimit": "50000"},
+                        {"MedPayLimit": "1000"},
+                    ],
+                },
+            ),
+        )
+        with patch.object(
+            tool_handlers, "_run_personal_auto_rate", side_effect=slow_rate
+        ), patch.dict(
+            TOOL_REGISTRY,
+            {name: ToolRegistration(
+                tool=registration.tool,
+                handler=registration.handler,
+                default_response_text=None,
+                time_budget=0.05,
+            )},
+        ):
+            result = await main._call_tool_request(request)
+
+        structured = result.root.structuredContent
+        self.assertEqual(structured["status"], "processing")
+        self.assertEqual(
+            structured["variant_identifiers"], ["quote-fake-1-v1", "quote-fake-1-v2"]
+        )
+        text = result.root.content[0].text
+        self.assertIn("identifiers quote-fake-1-v1, quote-fake-1-v2 ", text)
+        self.assertNotIn("quote-fake-1-v3", text)
+        self.assertIn("The other 2 coverage variants were not submitted", text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import os
+import time
+import unittest
+from unittest.mock import patch
+
+import httpx
+import mcp.types as types
+
+from insurance_server_python import main, tool_handlers
+from insurance_server_python.deadlines import (
+    DeadlineExceeded,
+    deadline_scope,
+    remaining_time,
+    timeout_for,
+)
+from insurance_server_python.fake_gateway import (
+    RESULTS_PATH,
+    FakeGatewaySettings,
+    create_fake_gateway_app,
+)
+from insurance_server_python.http_client import create_upstream_client, upstream_timeout
+from insurance_server_python.idempotency import RateSubmission
+from insurance_server_python.rate_polling import RatePollSettings, poll_rate_results
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS
+from insurance_server_python.widget_registry import TOOL_REGISTRY, ToolRegistration
+
+
+class DeadlineScopeTests(unittest.TestCase):
+    def test_nested_scope_keeps_earlier_deadline(self) -> None:
+        self.assertIsNone(remaining_time())
+        with deadline_scope(1.0):
+            with deadline_scope(60.0):
+                self.assertLessEqual(remaining_time(), 1.0)
+            self.assertLessEqual(timeout_for(15.0), 1.0)
+        self.assertIsNone(remaining_time())
+        self.assertEqual(timeout_for(15.0), 15.0)
+
+    def test_spent_budget_raises(self) -> None:
+        with deadline_scope(0.0):
+            with self.assertRaises(DeadlineExceeded):
+                timeout_for(15.0)
+
+    def test_upstream_timeout_is_clipped(self) -> None:
+        client = httpx.AsyncClient(timeout=httpx.Timeout(15.0))
+        self.assertEqual(upstream_timeout(client).read, 15.0)
+        with deadline_scope(2.0):
+            clipped = upstream_timeout(client)
+        self.assertLessEqual(clipped.read, 2.0)
+        self.assertLessEqual(clipped.connect, 2.0)
+
+
+class PollDeadlineTests(unittest.IsolatedAsyncioTestCase):
+    async def test_poll_stops_before_tool_deadline(self) -> None:
+        attempts = 0
+
+        async def fetch():
+            nonlocal attempts
+            attempts += 1
+            return 200, {"CarrierResults": []}
+
+        started = time.monotonic()
+        with deadline_scope(0.3):
+            outcome = await poll_rate_results(
+                fetch,
+                is_complete=lambda results: False,
+                settings=RatePollSettings(deadline=20, initial_delay=0.05, reserve=0.1),
+            )
+        self.assertFalse(outcome.complete)
+        self.assertLess(time.monotonic() - started, 0.3)
+
+
+class ToolTimeBudgetTests(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_tool_returns_still_processing(self) -> None:
+        async def slow(arguments):
+            await asyncio.sleep(5)
+
+        registration = ToolRegistration(
+            tool=types.Tool(name="slow-tool", inputSchema={"type": "object"}),
+            handler=slow,
+            default_response_text=None,
+            time_budget=0.05,
+        )
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name="slow-tool", arguments={"Identifier": "q-9"}),
+        )
+        with patch.dict(TOOL_REGISTRY, {"slow-tool": registration}):
+            result = await main._call_tool_request(request)
+
+        call_result = result.root
+        self.assertFalse(call_result.isError)
+        self.assertEqual(call_result.structuredContent["status"], "processing")
+        self.assertEqual(call_result.structuredContent["identifier"], "q-9")
+        self.assertIn("identifier q-9", call_result.content[0].text)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class RateToolDeadlineTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_timed_out_submission_is_retrievable_by_quote_identifier(self) -> None:
+        app = create_fake_gateway_app(FakeGatewaySettings(latency_mean=0.2, rating_seconds=0.0))
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        registration = TOOL_REGISTRY["request-personal-auto-rate"]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(
+                name="request-personal-auto-rate", arguments=RATE_ARGUMENTS
+            ),
+        )
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ), patch.dict(
+            TOOL_REGISTRY,
+            {"request-personal-auto-rate": ToolRegistration(
+                tool=registration.tool,
+                handler=registration.handler,
+                default_response_text=None,
+                time_budget=0.05,
+            )},
+        ):
+            result = await main._call_tool_request(request)
+            self.assertEqual(result.root.structuredContent["status"], "processing")
+
+            await asyncio.sleep(0.3)
+            retrieved = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": RATE_ARGUMENTS["Identifier"]}
+            )
+        await client.aclose()
+
+        self.assertEqual(len(retrieved["structured_content"]["rate_results"]["CarrierResults"]), 12)
+
+    async def test_coalesced_submission_keeps_its_own_budget(self) -> None:
+        submissions = 0
+
+        async def slow_submit(url, headers, body, state_code=None, serialized_body=None):
+            nonlocal submissions
+            submissions += 1
+            await asyncio.sleep(0.1)
+            # Clips the request timeout like the upstream client does, and
+            # raises if the first caller's spent deadline leaked into the POST.
+            timeout_for(15.0)
+            return RateSubmission(
+                transaction_id="txn-budget", status=200, response={"transactionId": "txn-budget"}
+            )
+
+        async def fetch(identifier, headers):
+            return 200, {"CarrierResults": [{"CarrierName": "Anchor", "TotalPremium": 900.0}]}
+
+        async def call(budget: float):
+            # Mirrors the tool dispatcher: a deadline plus a wait bounded by it.
+            with deadline_scope(budget):
+                return await asyncio.wait_for(
+                    tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS), timeout=budget
+                )
+
+        with patch.object(
+            tool_handlers, "_submit_personal_auto_rate", side_effect=slow_submit
+        ), patch.object(
+            tool_handlers, "_fetch_personal_auto_rate_results", side_effect=fetch
+        ), patch.object(tool_handlers, "_rate_results_complete", return_value=True):
+            short = asyncio.create_task(call(0.05))
+            await asyncio.sleep(0.01)
+            long = asyncio.create_task(call(5.0))
+            with self.assertRaises(asyncio.TimeoutError):
+                await short
+            result = await long
+
+        self.assertEqual(submissions, 1)
+        self.assertTrue(result["structured_content"]["deduplicated"])
+        carriers = result["structured_content"]["rate_results"]["CarrierResults"]
+        self.assertEqual(carriers[0]["CarrierName"], "Anchor")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from insurance_server_python import tool_handlers
+from insurance_server_python.fake_gateway import (
+    RATE_PATH,
+    RESULTS_PATH,
+    FakeGateway,
+    FakeGatewaySettings,
+    create_fake_gateway_app,
+)
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.tests.helpers import RateStateIsolation
+
+BASE_URL = "http://fake-gateway"
+RATE_ARGUMENTS = {
+    "Identifier": "quote-fake-1",
+    "EffectiveDate": "2026-06-01T00:00:00",
+    "Customer": {
+        "Identifier": "cust-1",
+        "FirstName": "Ada",
+        "LastName": "Lovelace",
+        "Address": {
+            "Street1": "1 Main St",
+            "City": "Austin",
+            "State": "TX",
+            "ZipCode": "73301",
+        },
+    },
+    "PolicyCoverages": {"LiabilityBiLimit": "100/300"},
+    "Vehicles": [{"VehicleId": 1}],
+    "RatedDrivers": [
+        {
+            "DriverId": 1,
+            "FirstName": "Ada",
+            "LastName": "Lovelace",
+            "DateOfBirth": "1990-01-01",
+            "Gender": "Female",
+            "MaritalStatus": "Single",
+            "LicenseInformation": {"LicenseStatus": "Valid"},
+        }
+    ],
+}
+
+
+def _settings(**overrides) -> FakeGatewaySettings:
+    values = {"latency_mean": 0.0, "rating_seconds": 0.0, "seed": 7}
+    values.update(overrides)
+    return FakeGatewaySettings(**values)
+
+
+class FakeGatewayTests(unittest.IsolatedAsyncioTestCase):
+    async def _client(self, settings: FakeGatewaySettings) -> httpx.AsyncClient:
+        app = create_fake_gateway_app(settings)
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url=BASE_URL)
+
+    async def test_submit_then_results_round_trip(self) -> None:
+        async with await self._client(_settings(plans_per_product=2)) as client:
+            submit = await client.post(
+                RATE_PATH.format(state_code="tx"), json={"PolicyCoverages": {}}
+            )
+            transaction_id = submit.json()["transactionId"]
+            results = await client.get(RESULTS_PATH, params={"Id": transaction_id})
+
+        body = results.json()
+        self.assertEqual(body["State"], "TX")
+        self.assertEqual(len(body["CarrierResults"]), 3 * 2)
+
+    async def test_results_are_partial_during_rating_window(self) -> None:
+        async with await self._client(_settings(rating_seconds=60)) as client:
+            submit = await client.post(RATE_PATH.format(state_code="CA"), json={})
+            results = await client.get(
+                RESULTS_PATH, params={"Id": submit.json()["transactionId"]}
+            )
+
+        self.assertLess(len(results.json()["CarrierResults"]), 3 * 4)
+
+    async def test_error_injection_and_unknown_transaction(self) -> None:
+        async with await self._client(_settings(error_rate_5xx=1.0)) as client:
+            failed = await client.post(RATE_PATH.format(state_code="CA"), json={})
+        self.assertIn(failed.status_code, (500, 502, 503))
+
+        async with await self._client(_settings(error_rate_429=1.0)) as client:
+            throttled = await client.get(RESULTS_PATH, params={"Id": "x"})
+        self.assertEqual(throttled.status_code, 429)
+
+        async with await self._client(_settings()) as client:
+            missing = await client.get(RESULTS_PATH, params={"Id": "missing"})
+        self.assertEqual(missing.status_code, 404)
+
+    def test_transactions_are_bounded_by_count_and_age(self) -> None:
+        gateway = FakeGateway(_settings(max_transactions=2, transaction_ttl=30))
+        first = gateway.create_transaction("CA", {})
+        second = gateway.create_transaction("CA", {})
+        gateway.get_transaction(first.transaction_id)
+        gateway.create_transaction("CA", {})
+
+        self.assertIsNone(gateway.get_transaction(second.transaction_id))
+        self.assertIsNotNone(gateway.get_transaction(first.transaction_id))
+
+        first.created_at -= 31
+        self.assertIsNone(gateway.get_transaction(first.transaction_id))
+        self.assertEqual((len(gateway.transactions), gateway.evicted), (1, 2))
+
+    def test_unknown_latency_distribution_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            create_fake_gateway_app(_settings(latency="gamma"))
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class RateToolAgainstFakeGatewayTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_rate_tool_completes_offline(self) -> None:
+        app = create_fake_gateway_app(_settings())
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            result = await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+        await client.aclose()
+
+        structured = result["structured_content"]
+        self.assertTrue(structured["rate_results_complete"])
+        self.assertEqual(structured["poll_attempts"], 1)
+        self.assertEqual(len(structured["rate_results"]["CarrierResults"]), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from insurance_server_python import http_client
+from insurance_server_python.http_client import (
+    UpstreamClientSettings,
+    create_upstream_client,
+    upstream_client_lifespan,
+    upstream_client_stats,
+)
+
+
+def _ok_transport() -> httpx.MockTransport:
+    return httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True}))
+
+
+class UpstreamClientSettingsTests(unittest.TestCase):
+    def test_settings_read_pool_limits_from_environment(self) -> None:
+        env = {
+            "ZRATER_MAX_CONNECTIONS": "8",
+            "ZRATER_MAX_KEEPALIVE_CONNECTIONS": "4",
+            "ZRATER_KEEPALIVE_EXPIRY_SECONDS": "12.5",
+            "ZRATER_HTTP2": "true",
+        }
+        with patch.dict("os.environ", env):
+            settings = UpstreamClientSettings.from_env()
+
+        self.assertEqual(settings.max_connections, 8)
+        self.assertEqual(settings.max_keepalive_connections, 4)
+        self.assertEqual(settings.keepalive_expiry, 12.5)
+        self.assertTrue(settings.http2)
+
+    def test_invalid_values_fall_back_to_defaults(self) -> None:
+        with patch.dict("os.environ", {"ZRATER_MAX_CONNECTIONS": "lots"}):
+            settings = UpstreamClientSettings.from_env()
+
+        self.assertEqual(settings.max_connections, UpstreamClientSettings.max_connections)
+
+
+class UpstreamClientTests(unittest.IsolatedAsyncioTestCase):
+    async def test_requests_without_new_connection_count_as_reused(self) -> None:
+        before = upstream_client_stats()
+        async with create_upstream_client(transport=_ok_transport()) as client:
+            await client.get("https://gateway.example/a")
+            await client.get("https://gateway.example/b")
+        after = upstream_client_stats()
+
+        self.assertEqual(after["requests"] - before["requests"], 2)
+        self.assertEqual(
+            after["connections_reused"] - before["connections_reused"], 2
+        )
+
+    async def test_lifespan_opens_and_closes_shared_client(self) -> None:
+        async with upstream_client_lifespan() as client:
+            self.assertIs(http_client.get_upstream_client(), client)
+            self.assertFalse(client.is_closed)
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(http_client._client)
+
+
+if __name__ == "__main__":
+    unittest.main()
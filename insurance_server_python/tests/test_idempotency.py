@@ -0,0 +1,117 @@
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from insurance_server_python.idempotency import (
+    RateSubmission,
+    RecentSubmissions,
+    canonical_request_hash,
+)
+from insurance_server_python.tests.helpers import FakeClock, RateStateIsolation
+from insurance_server_python.tool_handlers import _request_personal_auto_rate
+
+RATE_ARGUMENTS = {
+    "Identifier": "quote-dedupe-1",
+    "EffectiveDate": "2026-06-01T00:00:00",
+    "Customer": {
+        "Identifier": "cust-1",
+        "FirstName": "Jane",
+        "LastName": "Doe",
+        "Address": {
+            "Street1": "1 Market St",
+            "City": "San Francisco",
+            "State": "CA",
+            "ZipCode": "94105",
+        },
+    },
+    "PolicyCoverages": {},
+    "Vehicles": [{"VehicleId": 1}],
+    "RatedDrivers": [
+        {
+            "DriverId": 1,
+            "FirstName": "Jane",
+            "LastName": "Doe",
+            "DateOfBirth": "1990-01-01",
+            "Gender": "Female",
+            "MaritalStatus": "Single",
+            "LicenseInformation": {"LicenseStatus": "Valid"},
+        }
+    ],
+}
+
+
+class CanonicalRequestHashTests(unittest.TestCase):
+    def test_hash_ignores_key_order(self) -> None:
+        first = {"b": [1, {"y": 2, "x": 1}], "a": "value"}
+        second = {"a": "value", "b": [1, {"x": 1, "y": 2}]}
+
+        self.assertEqual(canonical_request_hash(first), canonical_request_hash(second))
+
+    def test_hash_changes_with_content(self) -> None:
+        self.assertNotEqual(
+            canonical_request_hash({"a": 1}), canonical_request_hash({"a": 2})
+        )
+
+
+class RecentSubmissionsTests(unittest.TestCase):
+    def test_submission_is_reused_only_inside_window(self) -> None:
+        clock = FakeClock()
+        index = RecentSubmissions(window=30, clock=clock)
+        submission = RateSubmission(transaction_id="txn-1", status=200, response={})
+
+        index.record("hash", submission)
+        clock.now = 29
+        self.assertIs(index.get("hash"), submission)
+        clock.now = 31
+        self.assertIsNone(index.get("hash"))
+        self.assertEqual(index.stats()["deduplicated"], 1)
+
+    def test_submissions_without_transaction_are_not_recorded(self) -> None:
+        index = RecentSubmissions(window=30)
+        index.record("hash", RateSubmission(transaction_id=None, status=200, response={}))
+
+        self.assertIsNone(index.get("hash"))
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class DuplicateRateRequestTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    @patch("insurance_server_python.tool_handlers.get_upstream_client")
+    @patch("insurance_server_python.tool_handlers._log_network_request")
+    @patch("insurance_server_python.tool_handlers._log_network_response")
+    async def test_identical_request_reuses_transaction_and_results(
+        self, mock_log_resp, mock_log_req, mock_get_client
+    ) -> None:
+        submit_response = MagicMock(status_code=200, is_error=False)
+        submit_response.text = '{"transactionId": "txn-dup"}'
+        submit_response.json.return_value = {"transactionId": "txn-dup"}
+        results_response = MagicMock(status_code=200, is_error=False)
+        results_response.text = '{"Status": "Complete"}'
+        results_response.json.return_value = {
+            "Status": "Complete",
+            "CarrierResults": [{"CarrierName": "Anchor", "TotalPremium": 900.0}],
+        }
+        client = AsyncMock()
+        client.post.return_value = submit_response
+        client.get.return_value = results_response
+        mock_get_client.return_value = client
+
+        first = await _request_personal_auto_rate(RATE_ARGUMENTS)
+        second = await _request_personal_auto_rate(RATE_ARGUMENTS)
+
+        self.assertEqual(client.post.await_count, 1)
+        self.assertEqual(client.get.await_count, 1)
+        self.assertFalse(first["structured_content"]["deduplicated"])
+        self.assertTrue(second["structured_content"]["deduplicated"])
+        self.assertEqual(
+            second["structured_content"]["request_hash"],
+            first["structured_content"]["request_hash"],
+        )
+        self.assertEqual(
+            second["structured_content"]["rate_results"],
+            first["structured_content"]["rate_results"],
+        )
+        self.assertIn("txn-dup", second["content"][0].text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main
+from insurance_server_python.widget_registry import INSURANCE_STATE_WIDGET_IDENTIFIER
+
+
+def _call(request_id, name="insurance-state-selector", arguments=None):
+    return {
+        "jsonrpc": "2.0",
+        "id": request_id,
+        "method": "callTool",
+        "params": {"name": name, "arguments": arguments or {}},
+    }
+
+
+class LegacyBatchTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(main.app)
+
+    def test_batch_responses_keep_request_order(self) -> None:
+        response = self.client.post(
+            "/mcp/messages",
+            json=[
+                _call(1, INSURANCE_STATE_WIDGET_IDENTIFIER),
+                {"jsonrpc": "2.0", "id": 2, "method": "listTools"},
+                _call(3, "collect-personal-auto-customer", {"customer": {}}),
+            ],
+        )
+        self.assertEqual(response.status_code, 200)
+        replies = response.json()
+        self.assertEqual([reply["id"] for reply in replies], [1, 2, 3])
+        self.assertIn("result", replies[0])
+        self.assertIn("tools", replies[1]["result"])
+        self.assertTrue(replies[2]["result"]["isError"])
+
+    def test_item_errors_stay_isolated(self) -> None:
+        response = self.client.post(
+            "/mcp/messages",
+            json=[
+                _call("a"),
+                {"jsonrpc": "2.0", "id": "b", "method": "unknownMethod"},
+                "not an object",
+                _call("d"),
+            ],
+        )
+        replies = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("result", replies[0])
+        self.assertEqual(replies[1]["error"]["code"], -32601)
+        self.assertEqual(
+            replies[2],
+            {"jsonrpc": "2.0", "id": None, "error": {"code": -32600, "message": "Invalid Request"}},
+        )
+        self.assertIn("result", replies[3])
+
+    def test_handler_exception_becomes_internal_error(self) -> None:
+        original = main._call_tool_request
+
+        async def flaky(request: types.CallToolRequest) -> types.ServerResult:
+            if request.params.arguments.get("state") == "boom":
+                raise RuntimeError("boom")
+            return await original(request)
+
+        with patch.object(main, "_call_tool_request", flaky):
+            response = self.client.post(
+                "/mcp/messages", json=[_call(1, arguments={"state": "boom"}), _call(2)]
+            )
+        replies = response.json()
+        self.assertEqual(replies[0]["error"]["code"], -32603)
+        self.assertIn("result", replies[1])
+
+    def test_notifications_get_no_entry(self) -> None:
+        notification = {"jsonrpc": "2.0", "method": "callTool", "params": _call(0)["params"]}
+        response = self.client.post("/mcp/messages", json=[notification, _call(7)])
+        self.assertEqual([reply["id"] for reply in response.json()], [7])
+
+        response = self.client.post("/mcp/messages", json=[notification])
+        self.assertEqual(response.status_code, 204)
+
+    @patch.dict(os.environ, {"INSURANCE_LEGACY_BATCH_MAX_ITEMS": "2"})
+    def test_empty_and_oversized_batches_are_rejected(self) -> None:
+        for batch in ([], [_call(1), _call(2), _call(3)]):
+            response = self.client.post("/mcp/messages", json=batch)
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json()["error"]["code"], -32600)
+
+    @patch.dict(os.environ, {"INSURANCE_LEGACY_BATCH_CONCURRENCY": "2"})
+    def test_items_run_concurrently_up_to_the_cap(self) -> None:
+        in_flight = 0
+        peak = 0
+
+        async def slow(request: types.CallToolRequest) -> types.ServerResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            return types.ServerResult(types.CallToolResult(content=[]))
+
+        with patch.object(main, "_call_tool_request", slow):
+            response = self.client.post("/mcp/messages", json=[_call(i) for i in range(5)])
+        self.assertEqual([reply["id"] for reply in response.json()], list(range(5)))
+        self.assertEqual(peak, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+import json
+import logging
+import queue
+import sys
+import threading
+import unittest
+from logging.handlers import QueueListener
+from unittest.mock import patch
+
+from insurance_server_python import log_config
+from insurance_server_python.log_config import (
+    CappedPayload,
+    JsonLogFormatter,
+    PayloadLogPolicy,
+    _DeferredQueueHandler,
+    _log_network_request,
+    _log_network_response,
+)
+
+
+class _CountingPayload(CappedPayload):
+    def __init__(self) -> None:
+        super().__init__("rendered", 0)
+        self.renders = 0
+
+    def __str__(self) -> str:
+        self.renders += 1
+        return super().__str__()
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.threads = []
+        self.lines = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.threads.append(threading.current_thread())
+        self.lines.append(self.format(record))
+
+
+class CappedPayloadTests(unittest.TestCase):
+    def test_short_payload_is_unchanged(self) -> None:
+        self.assertEqual(str(CappedPayload({"a": 1}, 100)), '{"a":1}')
+        self.assertEqual(str(CappedPayload(b'{"a":1}', 100)), '{"a":1}')
+
+    def test_long_payload_is_truncated_with_remainder(self) -> None:
+        text = str(CappedPayload("x" * 50, 10))
+        self.assertEqual(text, "x" * 10 + "…(+40 bytes)")
+
+    def test_zero_cap_keeps_full_payload(self) -> None:
+        self.assertEqual(str(CappedPayload("x" * 50, 0)), "x" * 50)
+
+
+class PayloadLogPolicyTests(unittest.TestCase):
+    def test_sampling_uses_rate(self) -> None:
+        policy = PayloadLogPolicy(max_bytes=5, sample_rate=0.5, rng=lambda: 0.9)
+        self.assertEqual(policy.body("abcdef"), "<not sampled>")
+        policy.rng = lambda: 0.1
+        self.assertEqual(str(policy.body("abcdef")), "abcde…(+1 bytes)")
+
+    def test_full_rate_always_samples(self) -> None:
+        policy = PayloadLogPolicy(max_bytes=0, sample_rate=1.0, rng=lambda: 0.999)
+        self.assertEqual(str(policy.body("abc")), "abc")
+
+
+class NetworkLoggingTests(unittest.TestCase):
+    def setUp(self) -> None:
+        patcher = patch.object(
+            log_config,
+            "payload_log_policy",
+            PayloadLogPolicy(max_bytes=8, sample_rate=1.0),
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_info_caps_payload_and_hides_headers(self) -> None:
+        with self.assertLogs("insurance.upstream", level="INFO") as captured:
+            _log_network_request(
+                method="POST",
+                url="http://gateway/rate",
+                headers={"x-api-key": "secret"},
+                payload=b'{"Identifier":"quote-1","Vehicles":[]}',
+            )
+            _log_network_response(
+                method="POST", url="http://gateway/rate", status=200, response_text="y" * 20
+            )
+        request_line, response_line = captured.output
+        self.assertIn('payload={"Identi…(+30 bytes)', request_line)
+        self.assertNotIn("x-api-key", request_line)
+        self.assertIn("status=200 body=yyyyyyyy…(+12 bytes)", response_line)
+        self.assertEqual(captured.records[1].body_length, 20)
+
+    def test_debug_logs_full_payload(self) -> None:
+        with self.assertLogs("insurance.upstream", level="DEBUG") as captured:
+            _log_network_request(
+                method="GET",
+                url="http://gateway/results",
+                headers={"x-api-key": "secret"},
+                payload={"params": {"Id": "transaction-123"}},
+            )
+        self.assertIn('{"params":{"Id":"transaction-123"}}', captured.output[0])
+        self.assertIn("***redacted***", captured.output[0])
+
+
+class QueueHandlerTests(unittest.TestCase):
+    def test_records_are_formatted_on_listener_thread(self) -> None:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        target = _RecordingHandler()
+        listener = QueueListener(log_queue, target)
+        logger = logging.getLogger("insurance.tests.queue")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = _DeferredQueueHandler(log_queue)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        payload = _CountingPayload()
+        listener.start()
+        try:
+            logger.info("payload=%s", payload)
+            logger.debug("skipped=%s", payload)
+        finally:
+            listener.stop()
+
+        self.assertEqual(target.lines, ["payload=rendered"])
+        self.assertEqual(payload.renders, 1)
+        self.assertIsNot(target.threads[0], threading.current_thread())
+
+    def test_message_is_resolved_before_queueing(self) -> None:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        handler = _DeferredQueueHandler(log_queue)
+        headers = {"x-request": "first"}
+        try:
+            raise ValueError("gateway down")
+        except ValueError:
+            record = logging.LogRecord(
+                name="insurance.upstream",
+                level=logging.ERROR,
+                pathname=__file__,
+                lineno=1,
+                msg="headers=%s count=%d body=%s",
+                args=(headers, 3, CappedPayload("abc", 0)),
+                exc_info=sys.exc_info(),
+            )
+        handler.handle(record)
+        headers["x-request"] = "mutated"
+
+        queued = log_queue.get_nowait()
+        self.assertEqual(
+            queued.getMessage(), "headers={'x-request': 'first'} count=3 body=abc"
+        )
+        self.assertIsNone(queued.exc_info)
+        self.assertIn("ValueError: gateway down", queued.exc_text)
+        self.assertIn("ValueError: gateway down", logging.Formatter().format(queued))
+        self.assertIn(
+            "ValueError: gateway down", json.loads(JsonLogFormatter().format(queued))["exception"]
+        )
+
+
+class JsonLogFormatterTests(unittest.TestCase):
+    def test_includes_extra_fields(self) -> None:
+        record = logging.makeLogRecord(
+            {
+                "name": "insurance.upstream",
+                "levelno": logging.INFO,
+                "levelname": "INFO",
+                "msg": "status=%s",
+                "args": (200,),
+                "event": "upstream_response",
+            }
+        )
+        entry = json.loads(JsonLogFormatter().format(record))
+        self.assertEqual(entry["message"], "status=200")
+        self.assertEqual(entry["event"], "upstream_response")
+        self.assertEqual(entry["logger"], "insurance.upstream")
+
+
+if __name__ == "__main__":
+    unittest.main()
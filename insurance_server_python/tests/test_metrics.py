@@ -0,0 +1,129 @@
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main, tool_handlers
+from insurance_server_python.fake_gateway import RESULTS_PATH, create_fake_gateway_app
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.metrics import (
+    SIZE_BUCKETS,
+    MetricsRegistry,
+    tool_latency,
+    upstream_latency,
+    upstream_request_bytes,
+    validation_failures,
+)
+from insurance_server_python.resilience import RESULTS_ENDPOINT, SUBMIT_ENDPOINT
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS, _settings
+
+
+def _call(name: str, arguments: dict) -> types.CallToolRequest:
+    return types.CallToolRequest(
+        method="tools/call",
+        params=types.CallToolRequestParams(name=name, arguments=arguments),
+    )
+
+
+class MetricsRegistryTests(unittest.TestCase):
+    def test_histogram_renders_cumulative_buckets(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("demo_seconds", "Demo.", ("tool",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "a")
+        histogram.observe(0.5, "a")
+        histogram.observe(3.0, "a")
+
+        lines = registry.render().splitlines()
+        self.assertEqual(lines[:2], ["# HELP demo_seconds Demo.", "# TYPE demo_seconds histogram"])
+        self.assertIn('demo_seconds_bucket{tool="a",le="0.1"} 1', lines)
+        self.assertIn('demo_seconds_bucket{tool="a",le="1"} 2', lines)
+        self.assertIn('demo_seconds_bucket{tool="a",le="+Inf"} 3', lines)
+        self.assertIn('demo_seconds_sum{tool="a"} 3.55', lines)
+        self.assertIn('demo_seconds_count{tool="a"} 3', lines)
+
+    def test_counter_escapes_label_values(self) -> None:
+        registry = MetricsRegistry()
+        counter = registry.counter("demo_total", "Demo.", ("model",))
+        counter.inc('say "hi"')
+        counter.inc('say "hi"', amount=2)
+        self.assertIn('demo_total{model="say \\"hi\\""} 3', registry.render())
+
+    def test_gauge_renders_current_value(self) -> None:
+        registry = MetricsRegistry()
+        gauge = registry.gauge("demo_depth", "Demo.", ("queue",))
+        gauge.inc("a")
+        gauge.inc("a")
+        gauge.dec("a")
+        gauge.set(5, "b")
+        body = registry.render()
+        self.assertIn("# TYPE demo_depth gauge", body)
+        self.assertIn('demo_depth{queue="a"} 1', body)
+        self.assertIn('demo_depth{queue="b"} 5', body)
+
+    def test_boundary_value_lands_in_its_bucket(self) -> None:
+        registry = MetricsRegistry()
+        histogram = registry.histogram("size_bytes", "Demo.", buckets=SIZE_BUCKETS)
+        histogram.observe(1024)
+        self.assertIn('size_bytes_bucket{le="1024"} 1', registry.render())
+
+
+class ToolMetricsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_validation_failure_is_counted_by_model(self) -> None:
+        failures = validation_failures.value("PersonalAutoCustomerIntake")
+        calls = tool_latency.count("collect-personal-auto-customer", "validation_error")
+
+        result = await main._call_tool_request(_call("collect-personal-auto-customer", {}))
+
+        self.assertTrue(result.root.isError)
+        self.assertEqual(validation_failures.value("PersonalAutoCustomerIntake"), failures + 1)
+        self.assertEqual(
+            tool_latency.count("collect-personal-auto-customer", "validation_error"), calls + 1
+        )
+
+    async def test_successful_call_is_timed(self) -> None:
+        calls = tool_latency.count("insurance-state-selector", "ok")
+        await main._call_tool_request(_call("insurance-state-selector", {"state": "CA"}))
+        self.assertEqual(tool_latency.count("insurance-state-selector", "ok"), calls + 1)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class UpstreamMetricsTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_gateway_calls_record_latency_and_sizes(self) -> None:
+        submits = upstream_latency.count(SUBMIT_ENDPOINT, "200")
+        fetches = upstream_latency.count(RESULTS_ENDPOINT, "200")
+        bodies = upstream_request_bytes.count(SUBMIT_ENDPOINT)
+
+        app = create_fake_gateway_app(_settings())
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+        await client.aclose()
+
+        self.assertEqual(upstream_latency.count(SUBMIT_ENDPOINT, "200"), submits + 1)
+        self.assertEqual(upstream_latency.count(RESULTS_ENDPOINT, "200"), fetches + 1)
+        self.assertEqual(upstream_request_bytes.count(SUBMIT_ENDPOINT), bodies + 1)
+
+
+class MetricsRouteTests(unittest.TestCase):
+    def test_metrics_route_serves_prometheus_text(self) -> None:
+        # Not entered as a context manager: the route needs no lifespan resources.
+        response = TestClient(main.app).get("/metrics")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/plain; version=0.0.4"))
+        self.assertIn("# TYPE insurance_tool_duration_seconds histogram", response.text)
+        self.assertIn("# TYPE insurance_validation_failures_total counter", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
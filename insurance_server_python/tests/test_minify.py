@@ -0,0 +1,101 @@
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from insurance_server_python.insurance_rate_results_widget import (
+    INSURANCE_RATE_RESULTS_WIDGET_HTML,
+)
+from insurance_server_python.insurance_state_widget import INSURANCE_STATE_WIDGET_HTML
+from insurance_server_python.minify import (
+    minify_css,
+    minify_js,
+    minify_widget_html,
+    minify_with_report,
+)
+from insurance_server_python.widget_registry import WIDGET_MINIFY_REPORTS, WIDGETS_BY_ID
+
+
+class MinifyJsTests(unittest.TestCase):
+    def test_removes_comments_and_indentation(self) -> None:
+        source = """
+            // leading comment
+            function add(a, b) {
+                /* block */
+                return a + b;
+            }
+        """
+        self.assertEqual(minify_js(source), "function add(a,b){return a + b;}")
+
+    def test_keeps_comment_markers_inside_strings_and_regex(self) -> None:
+        source = 'const url = "http://x/*y*/"; const re = /\\/\\/+/g;'
+        self.assertEqual(minify_js(source), 'const url="http://x/*y*/";const re=/\\/\\/+/g;')
+
+    def test_keeps_template_literal_text_and_minifies_expressions(self) -> None:
+        source = "const s = `a  // b ${ fn( 1,  2 ) }  c`;"
+        self.assertEqual(minify_js(source), "const s=`a  // b ${fn(1,2)}  c`;")
+
+    def test_keeps_line_breaks_that_end_statements(self) -> None:
+        self.assertEqual(minify_js("let a = 1\nlet b = a\nb++"), "let a=1\nlet b=a\nb++")
+
+    def test_strips_debug_logging_unless_testing(self) -> None:
+        source = 'console.log("x", {a: 1});\nconsole.error("kept");'
+        self.assertEqual(minify_js(source), 'console.error("kept");')
+        self.assertEqual(
+            minify_js(source, strip_debug_logging=False),
+            'console.log("x",{a:1});console.error("kept");',
+        )
+
+    def test_debug_call_inside_expression_becomes_void(self) -> None:
+        self.assertEqual(
+            minify_js("if (ok) console.debug('hi')\nrun()"), "if(ok)void 0\nrun()"
+        )
+
+    def test_unbalanced_script_is_left_unchanged(self) -> None:
+        source = "const s = \\`broken ${x}\\`;\n"
+        self.assertEqual(minify_js(source), source)
+
+
+class MinifyDocumentTests(unittest.TestCase):
+    def test_css_and_markup(self) -> None:
+        self.assertEqual(minify_css("a  {\n  color: red ;\n}\n/* c */"), "a{color:red}")
+        html = "<div>\n  <!-- note -->\n  <p>Hi</p>\n</div>\n<style>\n  p { margin: 0; }\n</style>"
+        self.assertEqual(minify_widget_html(html), "<div>\n<p>Hi</p>\n</div>\n<style>p{margin:0}</style>")
+
+    def test_report_counts_utf8_bytes(self) -> None:
+        minified, report = minify_with_report("w", "<p>  é  </p>\n\n")
+        self.assertEqual(minified, "<p>  é  </p>")
+        self.assertEqual(report.original_bytes, 15)
+        self.assertEqual(report.saved_bytes, 2)
+
+    def test_registry_widgets_are_minified_at_import(self) -> None:
+        self.assertEqual(
+            [report.name for report in WIDGET_MINIFY_REPORTS], list(WIDGETS_BY_ID)
+        )
+        for report in WIDGET_MINIFY_REPORTS:
+            self.assertGreater(report.saved_bytes, 0)
+            self.assertEqual(
+                len(WIDGETS_BY_ID[report.name].html.encode("utf-8")), report.minified_bytes
+            )
+
+    @unittest.skipUnless(shutil.which("node"), "node is not installed")
+    def test_minified_widget_scripts_still_parse(self) -> None:
+        script_re = re.compile(r"<script\b[^>]*>(.*?)</script>", re.DOTALL)
+        with tempfile.TemporaryDirectory() as directory:
+            for index, html in enumerate(
+                (INSURANCE_STATE_WIDGET_HTML, INSURANCE_RATE_RESULTS_WIDGET_HTML)
+            ):
+                for is_testing in (False, True):
+                    for body in script_re.findall(minify_widget_html(html, is_testing=is_testing)):
+                        path = Path(directory) / f"widget{index}.mjs"
+                        path.write_text(body)
+                        result = subprocess.run(
+                            ["node", "--check", str(path)], capture_output=True, text=True
+                        )
+                        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from insurance_server_python import main
+
+TOKEN = "admin-secret"
+
+
+class ProfilingRouteTests(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://worker"
+        )
+        self.addAsyncCleanup(self.client.aclose)
+
+    async def test_routes_are_hidden_when_disabled(self) -> None:
+        with patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": ""}):
+            response = await self.client.post("/debug/profile?seconds=0.1")
+        self.assertEqual(response.status_code, 404)
+
+    @patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": TOKEN})
+    async def test_wrong_token_is_rejected(self) -> None:
+        response = await self.client.post(
+            "/debug/tracemalloc?seconds=0.1", headers={"Authorization": "Bearer nope"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+    @patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": TOKEN})
+    async def test_sample_mode_returns_collapsed_stacks(self) -> None:
+        response = await self.client.post(
+            "/debug/profile?seconds=0.1", headers={"X-Admin-Token": TOKEN}
+        )
+        self.assertEqual(response.status_code, 200)
+        line = response.text.splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        self.assertIn(";", stack)
+        self.assertGreater(int(count), 0)
+
+    @patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": TOKEN})
+    async def test_cprofile_mode_returns_pstats(self) -> None:
+        response = await self.client.post(
+            "/debug/profile?seconds=0.1&mode=cprofile&sort=tottime",
+            headers={"Authorization": f"Bearer {TOKEN}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("function calls", response.text)
+
+    @patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": TOKEN})
+    async def test_concurrent_capture_is_refused(self) -> None:
+        headers = {"X-Admin-Token": TOKEN}
+        first = asyncio.create_task(
+            self.client.post("/debug/profile?seconds=0.3&mode=cprofile", headers=headers)
+        )
+        await asyncio.sleep(0.1)
+        second = await self.client.post("/debug/tracemalloc?seconds=0.1", headers=headers)
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual((await first).status_code, 200)
+
+    @patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": TOKEN})
+    async def test_tracemalloc_diff_is_returned(self) -> None:
+        response = await self.client.post(
+            "/debug/tracemalloc?seconds=0.1&package=true", headers={"X-Admin-Token": TOKEN}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.text.startswith("Top 25 allocation changes by line:"))
+        self.assertIn("Traced memory:", response.text)
+
+
+if __name__ == "__main__":
+    unittest.main()
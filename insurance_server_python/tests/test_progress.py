@@ -0,0 +1,171 @@
+import unittest
+
+import mcp.types as types
+from mcp.server.lowlevel.server import NotificationOptions, request_ctx
+from mcp.shared.context import RequestContext
+
+from insurance_server_python import main
+from insurance_server_python.progress import (
+    RateProgressReporter,
+    best_premium,
+    log_level_enabled,
+    set_session_log_level,
+)
+from insurance_server_python.rate_polling import poll_rate_results, RatePollSettings
+
+EXPECTED = (("p-1", "Anchor Premier"), ("p-2", "Anchor Gemini"))
+
+
+class RecordingSession:
+    def __init__(self) -> None:
+        self.progress: list[dict] = []
+        self.logs: list[dict] = []
+
+    async def send_progress_notification(self, token, progress, total=None, message=None, related_request_id=None):
+        self.progress.append(
+            {
+                "token": token,
+                "progress": progress,
+                "total": total,
+                "message": message,
+                "related_request_id": related_request_id,
+            }
+        )
+
+    async def send_log_message(self, level, data, logger=None, related_request_id=None):
+        self.logs.append({"level": level, "data": data, "logger": logger})
+
+
+def _bind(session: RecordingSession, progress_token=None):
+    meta = types.RequestParams.Meta(progressToken=progress_token) if progress_token else None
+    return request_ctx.set(
+        RequestContext(request_id=7, meta=meta, session=session, lifespan_context=None)
+    )
+
+
+class BestPremiumTests(unittest.TestCase):
+    def test_lowest_numeric_premium(self) -> None:
+        results = {
+            "CarrierResults": [
+                {"TotalPremium": 1200.5},
+                {"totalPremium": 980},
+                {"TotalPremium": "n/a"},
+            ]
+        }
+        self.assertEqual(best_premium(results), 980)
+        self.assertIsNone(best_premium({"CarrierResults": []}))
+
+
+class RateProgressReporterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_progress_sent_as_carriers_arrive(self) -> None:
+        session = RecordingSession()
+        token = _bind(session, progress_token="tok-1")
+        try:
+            reporter = RateProgressReporter("tx-1", EXPECTED)
+        finally:
+            request_ctx.reset(token)
+
+        partial = {"CarrierResults": [{"ProductId": "p-1", "TotalPremium": 1500.0}]}
+        full = {
+            "CarrierResults": [
+                {"ProductId": "p-1", "TotalPremium": 1500.0},
+                {"ProductId": "p-2", "TotalPremium": 1320.0},
+            ]
+        }
+        await reporter.update(partial, False)
+        await reporter.update(partial, False)
+        await reporter.update(full, True)
+
+        self.assertEqual([p["progress"] for p in session.progress], [1.0, 2.0])
+        self.assertEqual(session.progress[-1]["total"], 2.0)
+        self.assertEqual(session.progress[-1]["related_request_id"], 7)
+        self.assertIn("$1,320.00", session.progress[-1]["message"])
+        self.assertEqual(session.logs[-1]["data"]["carriersCompleted"], 2)
+        self.assertEqual(session.logs[-1]["data"]["bestPremium"], 1320.0)
+
+    async def test_logs_only_without_progress_token(self) -> None:
+        session = RecordingSession()
+        token = _bind(session)
+        try:
+            reporter = RateProgressReporter("tx-1", EXPECTED, send_logs=True)
+        finally:
+            request_ctx.reset(token)
+
+        await reporter.update({"CarrierResults": []}, False)
+
+        self.assertEqual(session.progress, [])
+        self.assertEqual(len(session.logs), 1)
+
+    async def test_client_log_level_filters_progress_logs(self) -> None:
+        session = RecordingSession()
+        token = _bind(session, progress_token="tok-1")
+        try:
+            reporter = RateProgressReporter("tx-1", EXPECTED, send_logs=True)
+        finally:
+            request_ctx.reset(token)
+
+        set_session_log_level(session, "warning")
+        await reporter.update({"CarrierResults": [{"ProductId": "p-1"}]}, False)
+        set_session_log_level(session, "debug")
+        await reporter.update({"CarrierResults": [{"ProductId": "p-1"}, {"ProductId": "p-2"}]}, True)
+
+        self.assertEqual(len(session.progress), 2)
+        self.assertEqual([log["data"]["carriersCompleted"] for log in session.logs], [2])
+
+    async def test_set_level_handler_records_the_session_level(self) -> None:
+        session = RecordingSession()
+        token = _bind(session)
+        try:
+            result = await main._set_logging_level_request(
+                types.SetLevelRequest(
+                    method="logging/setLevel", params=types.SetLevelRequestParams(level="error")
+                )
+            )
+        finally:
+            request_ctx.reset(token)
+
+        self.assertIsInstance(result.root, types.EmptyResult)
+        self.assertFalse(log_level_enabled(session, "info"))
+        self.assertTrue(log_level_enabled(session, "critical"))
+        self.assertTrue(log_level_enabled(RecordingSession(), "debug"))
+        capabilities = main.mcp._mcp_server.get_capabilities(
+            NotificationOptions(), experimental_capabilities={}
+        )
+        self.assertIsNotNone(capabilities.logging)
+
+    async def test_noop_outside_mcp_request(self) -> None:
+        reporter = RateProgressReporter("tx-1", EXPECTED)
+        await reporter.update({"CarrierResults": [{"ProductId": "p-1"}]}, False)
+        self.assertFalse(reporter.enabled)
+        self.assertEqual(reporter.sent, 0)
+
+    async def test_poller_reports_every_fetch(self) -> None:
+        responses = iter(
+            [
+                {"CarrierResults": [{"ProductId": "p-1"}]},
+                {"CarrierResults": [{"ProductId": "p-1"}, {"ProductId": "p-2"}]},
+            ]
+        )
+        updates: list[bool] = []
+
+        async def fetch():
+            return 200, next(responses)
+
+        async def on_update(results, complete):
+            updates.append(complete)
+
+        async def no_sleep(_):
+            return None
+
+        await poll_rate_results(
+            fetch,
+            is_complete=lambda results: len(results["CarrierResults"]) == 2,
+            settings=RatePollSettings(deadline=10),
+            sleep=no_sleep,
+            on_update=on_update,
+        )
+        self.assertEqual(updates, [False, True])
+
+
+if __name__ == "__main__":
+    unittest.main()
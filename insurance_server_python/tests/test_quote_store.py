@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+
+from insurance_server_python import tool_handlers
+from insurance_server_python.fake_gateway import (
+    RESULTS_PATH,
+    FakeGatewaySettings,
+    create_fake_gateway_app,
+)
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.quote_store import DEFAULT_QUOTE_STORE_PATH, QuoteStore
+from insurance_server_python.rate_cache import rate_results_cache
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS
+
+
+class QuoteStoreTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "quotes.sqlite3"
+        self.store = QuoteStore(self.path)
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self._tmp.cleanup()
+
+    async def test_round_trip_with_compressed_results(self) -> None:
+        await self.store.record_submission(
+            "Quote-1", "TX-1", request_body={"Identifier": "Quote-1"}, status=200
+        )
+        results = {"CarrierResults": [{"TotalPremium": 100.0}] * 50}
+        await self.store.record_results("tx-1", results, status=200, complete=True)
+
+        by_identifier = await self.store.lookup("quote-1")
+        by_transaction = await self.store.lookup("TX-1")
+
+        self.assertEqual(by_identifier, by_transaction)
+        self.assertEqual(by_identifier.transaction_id, "TX-1")
+        self.assertTrue(by_identifier.rate_results_complete)
+        self.assertEqual(by_identifier.rate_results, results)
+        self.assertEqual(await self.store.request_body("tx-1"), {"Identifier": "Quote-1"})
+
+        with sqlite3.connect(self.path) as connection:
+            mode = connection.execute("PRAGMA journal_mode").fetchone()[0]
+            blob = connection.execute("SELECT results FROM rate_results").fetchone()[0]
+            indexes = {row[1] for row in connection.execute("PRAGMA index_list(quotes)")}
+        self.assertEqual(mode, "wal")
+        self.assertLess(len(blob), len(str(results)))
+        self.assertTrue(
+            {"quotes_identifier", "quotes_transaction_id", "quotes_created_at"} <= indexes
+        )
+
+    async def test_unknown_key_and_disabled_store(self) -> None:
+        self.assertIsNone(await self.store.lookup("missing"))
+        disabled = QuoteStore(None)
+        await disabled.record_results("tx", {}, status=200, complete=True)
+        self.assertIsNone(await disabled.lookup("tx"))
+        switched_off = QuoteStore(self.path.with_name("off.sqlite3"), enabled=False)
+        await switched_off.record_results("tx", {}, status=200, complete=True)
+        self.assertFalse(switched_off.path.exists())
+
+    def test_enabled_by_default_under_working_directory(self) -> None:
+        with patch.dict(os.environ, {"INSURANCE_QUOTE_STORE_PATH": ""}):
+            store = QuoteStore.from_env()
+        self.assertTrue(store.enabled)
+        self.assertEqual(store.path, DEFAULT_QUOTE_STORE_PATH)
+        self.assertFalse(store.path.is_absolute())
+        with patch.dict(os.environ, {"INSURANCE_QUOTE_STORE_ENABLED": "false"}):
+            self.assertFalse(QuoteStore.from_env().enabled)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class QuoteStoreRetrievalTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self._tmp = tempfile.TemporaryDirectory()
+        self.store = QuoteStore(Path(self._tmp.name) / "quotes.sqlite3")
+
+    def tearDown(self) -> None:
+        self.store.close()
+        self._tmp.cleanup()
+
+    async def test_retrieve_by_quote_identifier_after_restart(self) -> None:
+        app = create_fake_gateway_app(FakeGatewaySettings(latency_mean=0.0, rating_seconds=0.0))
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers, "quote_store", self.store
+        ), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+            rate_results_cache.clear()
+            gets_before = app.state.gateway.requests["results"]
+
+            result = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": RATE_ARGUMENTS["Identifier"]}
+            )
+        await client.aclose()
+
+        structured = result["structured_content"]
+        self.assertEqual(app.state.gateway.requests["results"], gets_before)
+        self.assertTrue(structured["rate_results_complete"])
+        self.assertEqual(len(structured["rate_results"]["CarrierResults"]), 12)
+
+    @patch.dict(
+        os.environ,
+        {
+            "ZRATER_POLL_INITIAL_DELAY_SECONDS": "0.02",
+            "ZRATER_POLL_MAX_DELAY_SECONDS": "0.02",
+            "ZRATER_POLL_JITTER": "0",
+        },
+    )
+    async def test_store_is_consulted_once_per_tool_call(self) -> None:
+        app = create_fake_gateway_app(FakeGatewaySettings(latency_mean=0.0, rating_seconds=0.2))
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers, "quote_store", self.store
+        ), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ), patch.object(self.store, "lookup", wraps=self.store.lookup) as lookup:
+            await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+            self.assertGreater(app.state.gateway.requests["results"], 1)
+            self.assertEqual(lookup.await_count, 1)
+
+            rate_results_cache.clear()
+            lookup.reset_mock()
+            await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": RATE_ARGUMENTS["Identifier"]}
+            )
+            self.assertEqual(lookup.await_count, 1)
+        await client.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
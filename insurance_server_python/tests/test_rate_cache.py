@@ -0,0 +1,131 @@
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from insurance_server_python.metrics import rate_cache_evictions, rate_cache_hits, rate_cache_misses
+from insurance_server_python.rate_cache import RateResultsCache, rate_results_cache
+from insurance_server_python.tests.helpers import FakeClock, RateStateIsolation
+from insurance_server_python.tests.test_idempotency import RATE_ARGUMENTS
+from insurance_server_python.tool_handlers import (
+    _request_personal_auto_rate,
+    _retrieve_personal_auto_rate_results,
+)
+
+
+class RateResultsCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock(100.0)
+        self.cache = RateResultsCache(
+            max_entries=3, partial_ttl=5, final_ttl=60, clock=self.clock
+        )
+
+    def test_hit_and_miss_counters(self) -> None:
+        hits, misses = rate_cache_hits.value(), rate_cache_misses.value()
+        self.assertIsNone(self.cache.get("txn-1"))
+        self.cache.put("txn-1", {"CarrierResults": []}, status=200, is_final=False)
+
+        entry = self.cache.get("TXN-1")
+
+        self.assertIsNotNone(entry)
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 1)
+        self.assertEqual(
+            (rate_cache_hits.value(), rate_cache_misses.value()), (hits + 1, misses + 1)
+        )
+
+    def test_uncounted_lookups_leave_counters_alone(self) -> None:
+        misses = rate_cache_misses.value()
+        self.cache.put("txn-1", {}, status=200, is_final=False)
+
+        self.assertIsNone(self.cache.get("txn-1", allow_partial=False, count=False))
+        self.assertIsNotNone(self.cache.get("txn-1", count=False))
+
+        self.assertEqual((self.cache.stats()["hits"], self.cache.stats()["misses"]), (0, 0))
+        self.assertEqual(rate_cache_misses.value(), misses)
+
+    def test_partial_results_expire_before_final_results(self) -> None:
+        self.cache.put("partial", {}, status=200, is_final=False)
+        self.cache.put("final", {}, status=200, is_final=True)
+
+        self.clock.now += 10
+
+        self.assertIsNone(self.cache.get("partial"))
+        self.assertIsNotNone(self.cache.get("final"))
+
+        self.clock.now += 60
+        self.assertIsNone(self.cache.get("final"))
+
+    def test_partial_entries_skipped_when_final_required(self) -> None:
+        self.cache.put("txn-1", {}, status=200, is_final=False)
+
+        self.assertIsNone(self.cache.get("txn-1", allow_partial=False))
+        self.assertIsNotNone(self.cache.get("txn-1"))
+
+    def test_aliases_share_entry_and_lru_evicts_oldest(self) -> None:
+        evictions = rate_cache_evictions.value()
+        self.cache.put("txn-1", {"a": 1}, status=200, is_final=True, aliases=("quote-1",))
+        self.assertEqual(self.cache.get("quote-1").transaction_id, "txn-1")
+
+        self.cache.put("txn-2", {}, status=200, is_final=True)
+        self.cache.put("txn-3", {}, status=200, is_final=True)
+
+        self.assertIsNone(self.cache.get("txn-1"))
+        self.assertIsNotNone(self.cache.get("quote-1"))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+        self.assertEqual(rate_cache_evictions.value(), evictions + 1)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class RetrieveRateResultsCachingTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    @patch("insurance_server_python.tool_handlers._fetch_personal_auto_rate_results")
+    async def test_repeat_retrieve_is_served_from_cache(self, mock_fetch: AsyncMock) -> None:
+        mock_fetch.return_value = (200, {"CarrierResults": [{"CarrierName": "Anchor"}]})
+
+        first = await _retrieve_personal_auto_rate_results({"Identifier": "txn-42"})
+        second = await _retrieve_personal_auto_rate_results({"Identifier": "txn-42"})
+
+        self.assertEqual(mock_fetch.await_count, 1)
+        self.assertFalse(first["structured_content"]["cached"])
+        self.assertTrue(second["structured_content"]["cached"])
+        self.assertEqual(
+            second["structured_content"]["rate_results"],
+            first["structured_content"]["rate_results"],
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ZRATER_POLL_INITIAL_DELAY_SECONDS": "0",
+            "ZRATER_POLL_MAX_DELAY_SECONDS": "0",
+            "ZRATER_POLL_JITTER": "0",
+        },
+    )
+    @patch("insurance_server_python.tool_handlers.get_upstream_client")
+    @patch("insurance_server_python.tool_handlers._log_network_request")
+    @patch("insurance_server_python.tool_handlers._log_network_response")
+    async def test_polling_counts_one_lookup_per_call(
+        self, mock_log_resp, mock_log_req, mock_get_client
+    ) -> None:
+        submit_response = MagicMock(status_code=200, is_error=False)
+        submit_response.text = '{"transactionId": "txn-poll"}'
+        pending = MagicMock(status_code=200, is_error=False)
+        pending.text = '{"Status": "Pending", "CarrierResults": []}'
+        complete = MagicMock(status_code=200, is_error=False)
+        complete.text = '{"Status": "Complete", "CarrierResults": []}'
+        client = AsyncMock()
+        client.post.return_value = submit_response
+        client.get.side_effect = [pending, pending, complete]
+        mock_get_client.return_value = client
+        hits, misses = rate_cache_hits.value(), rate_cache_misses.value()
+
+        await _request_personal_auto_rate(RATE_ARGUMENTS)
+
+        self.assertEqual(client.get.await_count, 3)
+        self.assertEqual(rate_results_cache.stats()["misses"], 1)
+        self.assertEqual(
+            (rate_cache_hits.value(), rate_cache_misses.value()), (hits, misses + 1)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,168 @@
+import asyncio
+import contextvars
+import os
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import httpx
+
+from insurance_server_python import tool_handlers
+from insurance_server_python.fake_gateway import (
+    RESULTS_PATH,
+    FakeGatewaySettings,
+    create_fake_gateway_app,
+)
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.rate_jobs import (
+    COMPLETE,
+    FAILED,
+    QUEUED,
+    RateJobQueue,
+    RateJobQueueFull,
+)
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS
+
+marker: contextvars.ContextVar[str] = contextvars.ContextVar("marker", default="unset")
+
+
+class RateJobQueueTests(unittest.IsolatedAsyncioTestCase):
+    async def test_jobs_run_in_background_with_bounded_workers(self) -> None:
+        queue = RateJobQueue(workers=2)
+        release = asyncio.Event()
+        running = 0
+        peak = 0
+
+        async def runner(job):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+            return {"identifier": job.identifier}
+
+        jobs = [queue.submit(f"q-{index}", runner) for index in range(5)]
+        self.assertEqual(jobs[0].state, QUEUED)
+        await asyncio.sleep(0.01)
+        self.assertEqual(peak, 2)
+
+        release.set()
+        await queue.close()
+        self.assertTrue(all(job.state == COMPLETE for job in jobs))
+        self.assertEqual(queue.get("Q-3").result, {"identifier": "q-3"})
+
+    async def test_workers_do_not_inherit_request_context(self) -> None:
+        queue = RateJobQueue(workers=1)
+        marker.set("request")
+
+        async def runner(job):
+            return {"marker": marker.get()}
+
+        job = queue.submit("q-1", runner)
+        await queue.close()
+        self.assertEqual(job.result, {"marker": "unset"})
+
+    async def test_failures_and_lookup_by_transaction(self) -> None:
+        queue = RateJobQueue(workers=1)
+
+        async def runner(job):
+            queue.set_transaction(job, "TX-9")
+            raise RuntimeError("gateway said no")
+
+        job = queue.submit("q-1", runner)
+        await queue.close()
+        self.assertEqual(job.state, FAILED)
+        self.assertIs(queue.get("tx-9"), job)
+        self.assertEqual(job.error, "gateway said no")
+
+    async def test_full_queue_rejects(self) -> None:
+        queue = RateJobQueue(workers=1, max_pending=1)
+        gate = asyncio.Event()
+
+        async def runner(job):
+            await gate.wait()
+            return {}
+
+        queue.submit("q-1", runner)
+        await asyncio.sleep(0)
+        queue.submit("q-2", runner)
+        with self.assertRaises(RateJobQueueFull):
+            queue.submit("q-3", runner)
+        gate.set()
+        await queue.close()
+
+
+@patch.dict(
+    os.environ,
+    {"PERSONAL_AUTO_RATE_API_KEY": "test-key", "INSURANCE_RATE_JOB_MODE": "async"},
+)
+class AsyncRateToolTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_rate_tool_acknowledges_then_retrieve_reads_job(self) -> None:
+        app = create_fake_gateway_app(FakeGatewaySettings(latency_mean=0.0, rating_seconds=0.0))
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        queue = RateJobQueue(workers=1)
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers, "rate_job_queue", queue
+        ), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            ack = await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+            self.assertEqual(ack["structured_content"]["job"]["state"], QUEUED)
+
+            pending = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": RATE_ARGUMENTS["Identifier"]}
+            )
+            self.assertIsNone(pending["structured_content"]["rate_results"])
+
+            await queue.close()
+            result = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": RATE_ARGUMENTS["Identifier"]}
+            )
+        await client.aclose()
+
+        structured = result["structured_content"]
+        self.assertEqual(structured["job"]["state"], COMPLETE)
+        self.assertTrue(structured["rate_results_complete"])
+        self.assertTrue(structured["cached"])
+        self.assertEqual(len(structured["rate_results"]["CarrierResults"]), 12)
+
+    async def test_retrieve_handles_jobs_without_a_usable_transaction(self) -> None:
+        queue = RateJobQueue(workers=1)
+
+        async def no_transaction(job):
+            queue.set_transaction(job, None)
+            return {}
+
+        async def fail_after_submit(job):
+            queue.set_transaction(job, "tx-late")
+            raise RuntimeError("polling failed")
+
+        finished = queue.submit("q-none", no_transaction)
+        failed = queue.submit("q-late", fail_after_submit)
+        await queue.close()
+        self.assertEqual((finished.state, failed.state), (COMPLETE, FAILED))
+
+        fetch = AsyncMock(return_value=(200, {"Status": "Complete", "CarrierResults": []}))
+        with patch.object(tool_handlers, "rate_job_queue", queue), patch.object(
+            tool_handlers, "_fetch_personal_auto_rate_results", fetch
+        ):
+            terminal = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": "q-none"}
+            )
+            late = await tool_handlers._retrieve_personal_auto_rate_results(
+                {"identifier": "q-late"}
+            )
+
+        self.assertIn("without a transaction id", terminal["content"][0].text)
+        self.assertNotIn("again shortly", terminal["content"][0].text)
+        fetch.assert_awaited_once()
+        self.assertEqual(fetch.await_args.args[0], "tx-late")
+        self.assertTrue(late["structured_content"]["rate_results_complete"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+
+from insurance_server_python.rate_polling import (
+    RatePollSettings,
+    poll_rate_results,
+    rate_results_complete,
+    requested_products,
+)
+from insurance_server_python.tests.helpers import FakeClock
+
+EXPECTED = (("p-1", "Anchor Premier"), ("p-2", "Anchor Gemini"))
+
+
+class RateResultsCompleteTests(unittest.TestCase):
+    def test_all_requested_products_reported(self) -> None:
+        results = {
+            "CarrierResults": [
+                {"ProductId": "p-1", "TotalPremium": 100.0},
+                {"ProductName": "Anchor Gemini", "TotalPremium": 120.0},
+            ]
+        }
+        self.assertTrue(rate_results_complete(results, EXPECTED))
+
+    def test_missing_product_is_incomplete(self) -> None:
+        results = {"carrierResults": [{"ProductId": "p-1"}]}
+        self.assertFalse(rate_results_complete(results, EXPECTED))
+
+    def test_explicit_status_overrides_product_check(self) -> None:
+        self.assertTrue(rate_results_complete({"Status": "Completed"}, EXPECTED))
+        self.assertFalse(
+            rate_results_complete(
+                {"Status": "In Progress", "CarrierResults": [{"ProductId": "p-1"}, {"ProductId": "p-2"}]},
+                EXPECTED,
+            )
+        )
+
+    def test_empty_or_missing_results_are_incomplete(self) -> None:
+        self.assertFalse(rate_results_complete(None, EXPECTED))
+        self.assertFalse(rate_results_complete({"CarrierResults": []}, ()))
+
+    def test_requested_products_reads_default_carrier_information(self) -> None:
+        products = requested_products()
+        self.assertTrue(products)
+        self.assertTrue(all(product_id for product_id, _ in products))
+
+
+class PollRateResultsTests(unittest.IsolatedAsyncioTestCase):
+    async def test_returns_as_soon_as_results_complete(self) -> None:
+        clock = FakeClock()
+        responses = [
+            (200, {"CarrierResults": []}),
+            (200, {"CarrierResults": [{"ProductId": "p-1"}]}),
+            (200, {"CarrierResults": [{"ProductId": "p-1"}, {"ProductId": "p-2"}]}),
+        ]
+
+        async def fetch():
+            return responses.pop(0)
+
+        outcome = await poll_rate_results(
+            fetch,
+            is_complete=lambda results: rate_results_complete(results, EXPECTED),
+            settings=RatePollSettings(deadline=30, initial_delay=1, multiplier=2, jitter=0),
+            sleep=clock.sleep,
+            clock=clock,
+        )
+
+        self.assertTrue(outcome.complete)
+        self.assertEqual(outcome.attempts, 3)
+        self.assertEqual(clock.sleeps, [1, 2])
+
+    async def test_stops_at_deadline_with_partial_results(self) -> None:
+        clock = FakeClock()
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return 200, {"CarrierResults": [{"ProductId": "p-1"}]}
+
+        outcome = await poll_rate_results(
+            fetch,
+            is_complete=lambda results: rate_results_complete(results, EXPECTED),
+            settings=RatePollSettings(deadline=5, initial_delay=1, max_delay=2, jitter=0),
+            sleep=clock.sleep,
+            clock=clock,
+        )
+
+        self.assertFalse(outcome.complete)
+        self.assertEqual(outcome.rate_results["CarrierResults"][0]["ProductId"], "p-1")
+        self.assertLessEqual(sum(clock.sleeps), 5)
+        self.assertEqual(calls, outcome.attempts)
+
+    async def test_zero_deadline_fetches_once(self) -> None:
+        calls = 0
+
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return 200, None
+
+        outcome = await poll_rate_results(
+            fetch,
+            is_complete=lambda results: False,
+            settings=RatePollSettings(deadline=0),
+        )
+
+        self.assertEqual(calls, 1)
+        self.assertFalse(outcome.complete)
+
+    def test_delay_applies_jitter_within_bounds(self) -> None:
+        settings = RatePollSettings(initial_delay=2, multiplier=2, max_delay=10, jitter=0.5)
+        self.assertEqual(settings.delay_for(1, rng=lambda: 0.0), 1.0)
+        self.assertEqual(settings.delay_for(1, rng=lambda: 1.0), 3.0)
+        self.assertEqual(settings.delay_for(5, rng=lambda: 0.5), 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import os
 import unittest
 from unittest.mock import MagicMock, patch, AsyncMock
 import json
@@ -5,15 +6,19 @@ import json
 from insurance_server_python.tool_handlers import _request_personal_auto_rate
 
 class TestRateRequestHandler(unittest.IsolatedAsyncioTestCase):
-    @patch("insurance_server_python.tool_handlers.httpx.AsyncClient")
+    @patch.dict(
+        os.environ,
+        {"PERSONAL_AUTO_RATE_API_KEY": "test-key", "ZRATER_POLL_DEADLINE_SECONDS": "0"},
+    )
+    @patch("insurance_server_python.tool_handlers.get_upstream_client")
     @patch("insurance_server_python.tool_handlers._log_network_request")
     @patch("insurance_server_python.tool_handlers._log_network_response")
     async def test_request_personal_auto_rate_includes_identifier(
-        self, mock_log_resp, mock_log_req, mock_client_cls
+        self, mock_log_resp, mock_log_req, mock_get_client
     ):
         # Setup mocks
         mock_client = AsyncMock()
-        mock_client_cls.return_value.__aenter__.return_value = mock_client
+        mock_get_client.return_value = mock_client
         
         # Mock submission response (transaction ID)
         mock_submit_response = MagicMock()
@@ -0,0 +1,76 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main, widget_registry
+from insurance_server_python.widget_registry import (
+    TOOL_REGISTRY,
+    ToolRegistration,
+    register_tool,
+    registry_snapshot,
+)
+
+
+class RegistrySnapshotTests(unittest.IsolatedAsyncioTestCase):
+    async def test_list_handlers_return_the_prebuilt_results(self) -> None:
+        handlers = main.mcp._mcp_server.request_handlers
+        snapshot = registry_snapshot()
+
+        tools = await handlers[types.ListToolsRequest](types.ListToolsRequest(method="tools/list"))
+        resources = await handlers[types.ListResourcesRequest](
+            types.ListResourcesRequest(method="resources/list")
+        )
+
+        self.assertIs(tools, snapshot.list_tools)
+        self.assertIs(resources, snapshot.list_resources)
+        self.assertEqual([tool.name for tool in tools.root.tools], list(TOOL_REGISTRY))
+        self.assertEqual(
+            {str(resource.uri) for resource in resources.root.resources},
+            set(widget_registry.WIDGETS_BY_URI),
+        )
+
+    def test_serialized_results_match_models(self) -> None:
+        snapshot = registry_snapshot()
+        decoded = json.loads(snapshot.list_resource_templates_json)
+        self.assertEqual(
+            [template["uriTemplate"] for template in decoded["resourceTemplates"]],
+            [widget.template_uri for widget in widget_registry.widgets],
+        )
+        self.assertIn("_meta", decoded["resourceTemplates"][0])
+
+    def test_version_changes_only_with_the_registry(self) -> None:
+        version = registry_snapshot().version
+        self.assertEqual(widget_registry._build_snapshot().version, version)
+
+        with patch.dict(TOOL_REGISTRY), patch.object(widget_registry, "_snapshot", None):
+            register_tool(
+                ToolRegistration(
+                    tool=types.Tool(name="extra-tool", inputSchema={"type": "object"}),
+                    handler=lambda arguments: {},
+                    default_response_text=None,
+                )
+            )
+            changed = registry_snapshot()
+            self.assertNotEqual(changed.version, version)
+            self.assertIn("extra-tool", [tool.name for tool in changed.list_tools.root.tools])
+
+
+class LegacyListRouteTests(unittest.TestCase):
+    def test_legacy_list_tools_returns_serialized_snapshot(self) -> None:
+        snapshot = registry_snapshot()
+        response = TestClient(main.app).post(
+            "/mcp/messages", json={"jsonrpc": "2.0", "id": 3, "method": "listTools"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["x-registry-version"], snapshot.version)
+        payload = response.json()
+        self.assertEqual(payload["id"], 3)
+        self.assertEqual(payload["result"], json.loads(snapshot.list_tools_json))
+
+
+if __name__ == "__main__":
+    unittest.main()
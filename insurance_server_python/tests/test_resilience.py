@@ -0,0 +1,179 @@
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+from starlette.testclient import TestClient
+
+from insurance_server_python import main
+from insurance_server_python.deadlines import deadline_scope
+from insurance_server_python.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    SUBMIT_ENDPOINT,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryBudget,
+    call_with_breaker,
+    circuit_breakers,
+)
+from insurance_server_python.tests.helpers import FakeClock
+
+
+async def _no_sleep(seconds: float) -> None:
+    await asyncio.sleep(0)
+
+
+class CircuitBreakerTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "results", failure_threshold=2, recovery_timeout=10, clock=self.clock
+        )
+
+    def test_opens_after_threshold_and_rejects_calls(self) -> None:
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        with self.assertRaises(CircuitOpenError) as context:
+            self.breaker.before_call()
+        self.assertIn("results circuit open", str(context.exception))
+        self.assertEqual(self.breaker.snapshot()["rejected"], 1)
+
+    def test_half_open_allows_single_probe_then_closes(self) -> None:
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 11
+
+        self.breaker.before_call()
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self) -> None:
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.clock.now = 11
+        self.breaker.before_call()
+
+        self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.snapshot()["opened_count"], 2)
+
+
+class RetryBudgetTests(unittest.TestCase):
+    def test_budget_scales_with_requests(self) -> None:
+        clock = FakeClock()
+        budget = RetryBudget(ratio=0.5, min_per_second=0, window=10, clock=clock)
+        for _ in range(4):
+            budget.record_request()
+
+        self.assertTrue(budget.try_spend())
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+
+        clock.now = 11
+        self.assertFalse(budget.try_spend())
+        self.assertEqual(budget.snapshot()["exhausted"], 2)
+
+
+class CallWithBreakerTests(unittest.IsolatedAsyncioTestCase):
+    async def test_retries_transient_status_within_budget(self) -> None:
+        responses = [httpx.Response(503), httpx.Response(200)]
+        breaker = CircuitBreaker("results", failure_threshold=5)
+
+        async def send() -> httpx.Response:
+            return responses.pop(0)
+
+        response = await call_with_breaker(
+            breaker,
+            send,
+            retry_budget=RetryBudget(min_per_second=1),
+            max_retries=2,
+            sleep=_no_sleep,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(breaker.state, CLOSED)
+
+    async def test_does_not_retry_without_budget(self) -> None:
+        calls = 0
+
+        async def send() -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("boom")
+
+        with self.assertRaises(httpx.ConnectError):
+            await call_with_breaker(
+                CircuitBreaker("submit"), send, max_retries=3, sleep=_no_sleep
+            )
+        self.assertEqual(calls, 1)
+
+    async def test_open_circuit_fails_fast(self) -> None:
+        breaker = CircuitBreaker("submit", failure_threshold=1)
+        breaker.record_failure()
+        sent = False
+
+        async def send() -> httpx.Response:
+            nonlocal sent
+            sent = True
+            return httpx.Response(200)
+
+        with self.assertRaises(CircuitOpenError):
+            await call_with_breaker(breaker, send)
+        self.assertFalse(sent)
+
+    async def test_client_errors_do_not_trip_breaker(self) -> None:
+        breaker = CircuitBreaker("submit", failure_threshold=1)
+
+        async def send() -> httpx.Response:
+            return httpx.Response(400)
+
+        response = await call_with_breaker(breaker, send)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(breaker.state, CLOSED)
+
+    async def test_timeouts_from_a_spent_deadline_do_not_trip_breaker(self) -> None:
+        breaker = CircuitBreaker("submit", failure_threshold=1)
+
+        async def send() -> httpx.Response:
+            await asyncio.sleep(0.02)
+            raise httpx.ReadTimeout("clipped to the tool's budget")
+
+        for _ in range(3):
+            with deadline_scope(0.01):
+                with self.assertRaises(httpx.ReadTimeout):
+                    await call_with_breaker(breaker, send)
+
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.consecutive_failures, 0)
+
+        with self.assertRaises(httpx.ReadTimeout):
+            await call_with_breaker(breaker, send)
+        self.assertEqual(breaker.state, OPEN)
+
+
+class BreakerMetricsTests(unittest.TestCase):
+    def test_metrics_report_breaker_state(self) -> None:
+        breaker = circuit_breakers[SUBMIT_ENDPOINT]
+        self.addCleanup(breaker.record_success)
+        with patch.object(breaker, "failure_threshold", 1):
+            breaker.record_failure()
+
+        body = TestClient(main.app).get("/metrics").text
+
+        self.assertIn('insurance_circuit_breaker_state{endpoint="submit",state="open"} 1', body)
+        self.assertIn('insurance_circuit_breaker_state{endpoint="submit",state="closed"} 0', body)
+
+
+if __name__ == "__main__":
+    unittest.main()
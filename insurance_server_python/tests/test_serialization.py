@@ -0,0 +1,70 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+from starlette.testclient import TestClient
+
+from insurance_server_python import serialization
+from insurance_server_python.audit import _encode_line
+from insurance_server_python.idempotency import canonical_request_hash
+
+
+class SerializationTests(unittest.TestCase):
+    def tearDown(self) -> None:
+        serialization.use_backend()
+
+    def test_backends_agree(self) -> None:
+        value = {"b": [1, 2.5, None, True], "a": "Zoë", "c": {"y": 1, "x": 2}}
+        outputs = []
+        for backend in ("json", "auto"):
+            serialization.use_backend(backend)
+            outputs.append(serialization.dumps_canonical(value))
+            self.assertEqual(serialization.loads(serialization.dumps(value)), value)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertTrue(outputs[0].startswith(b'{"a":"Zo\xc3\xab"'))
+
+    def test_request_hash_accepts_serialized_bytes(self) -> None:
+        body = {"Identifier": "q-1", "Vehicles": [{"VehicleId": 1}]}
+        self.assertEqual(
+            canonical_request_hash(body),
+            canonical_request_hash(serialization.dumps_canonical(body)),
+        )
+
+    def test_audit_line_splices_serialized_request(self) -> None:
+        body = serialization.dumps_canonical({"Identifier": "q-1"})
+        line = _encode_line({"identifier": "q-1", "transactionId": None, "request": body})
+
+        self.assertTrue(line.endswith(b"}\n"))
+        self.assertEqual(
+            json.loads(line),
+            {"identifier": "q-1", "transactionId": None, "request": {"Identifier": "q-1"}},
+        )
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class LegacyRouteSerializationTests(unittest.TestCase):
+    def test_legacy_route_returns_json_rpc_envelope(self) -> None:
+        from insurance_server_python.main import app
+
+        with TestClient(app) as client:
+            response = client.post(
+                "/mcp/messages",
+                json={
+                    "jsonrpc": "2.0",
+                    "id": 7,
+                    "method": "callTool",
+                    "params": {"name": "insurance-state-selector", "arguments": {"state": "CA"}},
+                },
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-type"], "application/json")
+        payload = response.json()
+        self.assertEqual(payload["id"], 7)
+        self.assertIn("structuredContent", payload["result"])
+        self.assertFalse(payload["result"]["isError"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from insurance_server_python import tool_handlers
+from insurance_server_python.launcher import LaunchSettings, parse_args, prepare_shared_state
+from insurance_server_python.shared_state import RATE_RESULTS, TRANSACTIONS, SharedState
+from insurance_server_python.tests.helpers import FakeClock, RateStateIsolation, reset_rate_state
+from insurance_server_python.tests.test_idempotency import RATE_ARGUMENTS
+
+
+class SharedStateTests(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / "shared.sqlite3"
+        self.clock = FakeClock(1000.0)
+
+    def _worker(self) -> SharedState:
+        # Each instance has its own connection and lease owner, like a process.
+        state = SharedState(self.path, poll_interval=0.01, clock=self.clock)
+        self.addCleanup(state.close)
+        return state
+
+    async def test_entries_are_visible_to_other_workers_until_they_expire(self) -> None:
+        first, second = self._worker(), self._worker()
+        await first.put("ns", "Key-1", {"value": [1, 2]}, ttl=10)
+
+        self.assertEqual(await second.get("ns", "key-1"), {"value": [1, 2]})
+        self.clock.now += 11
+        self.assertIsNone(await second.get("ns", "key-1"))
+
+    async def test_lease_is_exclusive_until_released_or_expired(self) -> None:
+        first, second = self._worker(), self._worker()
+        self.assertTrue(await first.acquire("ns", "k", 5))
+        self.assertFalse(await second.acquire("ns", "k", 5))
+        await second.release("ns", "k")
+        self.assertFalse(await second.acquire("ns", "k", 5))
+
+        await first.release("ns", "k")
+        self.assertTrue(await second.acquire("ns", "k", 5))
+        self.clock.now += 6
+        self.assertTrue(await first.acquire("ns", "k", 5))
+
+    async def test_run_once_shares_one_call_between_workers(self) -> None:
+        calls = 0
+
+        async def submit() -> str:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return "txn-1"
+
+        results = await asyncio.gather(
+            *(
+                worker.run_once(
+                    "ns", "hash", submit, encode=lambda value: value, decode=str, ttl=60
+                )
+                for worker in (self._worker(), self._worker(), self._worker())
+            )
+        )
+        self.assertEqual(calls, 1)
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True])
+        self.assertEqual({value for value, _ in results}, {"txn-1"})
+
+    async def test_disabled_store_runs_every_call(self) -> None:
+        state = SharedState(None)
+        await state.put("ns", "k", 1, ttl=10)
+        self.assertIsNone(await state.get("ns", "k"))
+        value, shared = await state.run_once(
+            "ns", "k", AsyncMock(return_value=2), encode=lambda v: v, decode=int, ttl=10
+        )
+        self.assertEqual((value, shared), (2, False))
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class CrossWorkerRateTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.state = SharedState(Path(directory.name) / "shared.sqlite3")
+        self.addCleanup(self.state.close)
+
+    @patch("insurance_server_python.tool_handlers.get_upstream_client")
+    @patch("insurance_server_python.tool_handlers._log_network_request")
+    @patch("insurance_server_python.tool_handlers._log_network_response")
+    async def test_second_worker_reuses_submission_and_final_results(
+        self, mock_log_resp, mock_log_req, mock_get_client
+    ) -> None:
+        submit_response = MagicMock(status_code=200, is_error=False)
+        submit_response.text = '{"transactionId": "txn-shared"}'
+        results_response = MagicMock(status_code=200, is_error=False)
+        results_response.text = (
+            '{"Status": "Complete", "CarrierResults": '
+            '[{"CarrierName": "Anchor", "TotalPremium": 900.0}]}'
+        )
+        client = AsyncMock()
+        client.post.return_value = submit_response
+        client.get.return_value = results_response
+        mock_get_client.return_value = client
+
+        with patch.object(tool_handlers, "shared_state", self.state):
+            first = await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+            # A different worker starts with empty in-process caches.
+            reset_rate_state()
+            second = await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+
+        self.assertEqual(client.post.await_count, 1)
+        self.assertEqual(client.get.await_count, 1)
+        self.assertFalse(first["structured_content"]["deduplicated"])
+        self.assertTrue(second["structured_content"]["deduplicated"])
+        self.assertEqual(
+            await self.state.get(TRANSACTIONS, RATE_ARGUMENTS["Identifier"]), "txn-shared"
+        )
+
+    @patch.dict(
+        os.environ,
+        {
+            "ZRATER_POLL_INITIAL_DELAY_SECONDS": "0",
+            "ZRATER_POLL_MAX_DELAY_SECONDS": "0",
+            "ZRATER_POLL_JITTER": "0",
+        },
+    )
+    @patch("insurance_server_python.tool_handlers.get_upstream_client")
+    @patch("insurance_server_python.tool_handlers._log_network_request")
+    @patch("insurance_server_python.tool_handlers._log_network_response")
+    async def test_polling_reads_shared_results_once_per_call(
+        self, mock_log_resp, mock_log_req, mock_get_client
+    ) -> None:
+        submit_response = MagicMock(status_code=200, is_error=False)
+        submit_response.text = '{"transactionId": "txn-poll"}'
+        pending = MagicMock(status_code=200, is_error=False)
+        pending.text = '{"Status": "Pending", "CarrierResults": []}'
+        complete = MagicMock(status_code=200, is_error=False)
+        complete.text = '{"Status": "Complete", "CarrierResults": []}'
+        client = AsyncMock()
+        client.post.return_value = submit_response
+        client.get.side_effect = [pending, pending, complete]
+        mock_get_client.return_value = client
+
+        with patch.object(tool_handlers, "shared_state", self.state), patch.object(
+            self.state, "get", wraps=self.state.get
+        ) as shared_get:
+            await tool_handlers._request_personal_auto_rate(RATE_ARGUMENTS)
+
+        self.assertEqual(client.get.await_count, 3)
+        namespaces = [call.args[0] for call in shared_get.await_args_list]
+        self.assertEqual(namespaces.count(RATE_RESULTS), 1)
+
+
+class LauncherTests(unittest.TestCase):
+    @patch.dict(os.environ, {"INSURANCE_WORKERS": "3", "INSURANCE_BACKLOG": "512"})
+    def test_settings_default_to_environment(self) -> None:
+        settings = parse_args([])
+        self.assertEqual((settings.workers, settings.backlog, settings.port), (3, 512, 8000))
+        self.assertEqual(parse_args(["--workers", "2", "--keep-alive", "30"]).keep_alive, 30)
+        self.assertEqual(parse_args(["--workers", "auto"]).workers, os.cpu_count() or 1)
+
+    def test_auto_loop_and_parser_fall_back_when_not_installed(self) -> None:
+        with patch("insurance_server_python.launcher._available", return_value=False):
+            options = LaunchSettings().uvicorn_options()
+        self.assertEqual((options["loop"], options["http"]), ("asyncio", "h11"))
+        with patch("insurance_server_python.launcher._available", return_value=True):
+            options = LaunchSettings().uvicorn_options()
+        self.assertEqual((options["loop"], options["http"]), ("uvloop", "httptools"))
+
+    @patch.dict(os.environ, {"INSURANCE_SHARED_STATE_PATH": ""})
+    def test_multiple_workers_get_a_private_shared_state_path(self) -> None:
+        self.assertIsNone(prepare_shared_state(LaunchSettings(workers=1)))
+        path = prepare_shared_state(LaunchSettings(workers=4, port=9000))
+        directory = os.path.dirname(path)
+        self.addCleanup(shutil.rmtree, directory, True)
+
+        self.assertTrue(os.path.basename(directory).startswith("insurance-shared-state-9000-"))
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(os.environ["INSURANCE_SHARED_STATE_PATH"], path)
+        # Each launch gets its own directory instead of a predictable name.
+        os.environ["INSURANCE_SHARED_STATE_PATH"] = ""
+        other = prepare_shared_state(LaunchSettings(workers=4, port=9000))
+        self.addCleanup(shutil.rmtree, os.path.dirname(other), True)
+        self.assertNotEqual(os.path.dirname(other), directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import asyncio
+import os
+import unittest
+from unittest.mock import patch
+
+from starlette.testclient import TestClient
+
+from insurance_server_python import main
+from insurance_server_python.deadlines import deadline_scope, remaining_time, timeout_for
+from insurance_server_python.metrics import singleflight_coalesced
+from insurance_server_python.singleflight import SingleFlight
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tool_handlers import (
+    _retrieve_personal_auto_rate_results,
+    rate_results_flight,
+)
+
+
+class SingleFlightTests(unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_callers_share_one_call(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+        release = asyncio.Event()
+        calls = 0
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 7
+
+        waiters = [asyncio.create_task(flight.do("txn", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        self.assertEqual(calls, 1)
+        self.assertEqual([value for value, _ in results], [7, 7, 7])
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True])
+        self.assertEqual(flight.stats(), {"calls": 1, "coalesced": 2, "in_flight": 0})
+
+    async def test_errors_propagate_to_every_waiter(self) -> None:
+        flight: SingleFlight[int] = SingleFlight()
+
+        async def fail() -> int:
+            await asyncio.sleep(0)
+            raise RuntimeError("gateway down")
+
+        results = await asyncio.gather(
+            flight.do("txn", fail), flight.do("txn", fail), return_exceptions=True
+        )
+
+        self.assertTrue(all(isinstance(result, RuntimeError) for result in results))
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    async def test_cancelled_leader_does_not_cancel_waiters(self) -> None:
+        flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> str:
+            await release.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.do("txn", work))
+        follower = asyncio.create_task(flight.do("txn", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        self.assertEqual(await follower, ("done", True))
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+
+    async def test_waiter_is_not_bound_by_leader_deadline(self) -> None:
+        flight: SingleFlight[str] = SingleFlight()
+        budgets = []
+
+        async def work() -> str:
+            await asyncio.sleep(0.1)
+            budgets.append(remaining_time())
+            # Raises DeadlineExceeded if the leader's spent deadline leaked in.
+            timeout_for(15.0)
+            return "rated"
+
+        async def call(budget: float):
+            with deadline_scope(budget):
+                return await asyncio.wait_for(flight.do("txn", work), timeout=budget)
+
+        leader = asyncio.create_task(call(0.02))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(call(5.0))
+
+        with self.assertRaises(asyncio.TimeoutError):
+            await leader
+        self.assertEqual(await follower, ("rated", True))
+        self.assertEqual(budgets, [None])
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class RetrieveCoalescingTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    async def test_concurrent_retrieves_issue_one_upstream_get(self) -> None:
+        calls = 0
+
+        async def fake_fetch(identifier, headers):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return 200, {"CarrierResults": [{"CarrierName": "Anchor"}]}
+
+        before = rate_results_flight.stats()["coalesced"]
+        exported = singleflight_coalesced.value("rate_results")
+        with patch(
+            "insurance_server_python.tool_handlers._fetch_personal_auto_rate_results",
+            side_effect=fake_fetch,
+        ):
+            results = await asyncio.gather(
+                *(
+                    _retrieve_personal_auto_rate_results({"Identifier": "txn-7"})
+                    for _ in range(4)
+                )
+            )
+
+        self.assertEqual(calls, 1)
+        self.assertEqual(rate_results_flight.stats()["coalesced"] - before, 3)
+        self.assertEqual(singleflight_coalesced.value("rate_results") - exported, 3)
+        self.assertTrue(
+            all(result["structured_content"]["rate_results"] for result in results)
+        )
+
+    def test_upstream_status_reports_both_flights(self) -> None:
+        status = TestClient(main.app).get("/upstream/status").json()["singleflight"]
+        self.assertEqual(set(status), {"rate_results", "rate_submission"})
+        self.assertEqual(status["rate_results"], rate_results_flight.stats())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main, tool_handlers
+from insurance_server_python.fake_gateway import RESULTS_PATH, create_fake_gateway_app
+from insurance_server_python.http_client import create_upstream_client
+from insurance_server_python.tests.helpers import RateStateIsolation
+from insurance_server_python.tests.test_fake_gateway import BASE_URL, RATE_ARGUMENTS, _settings
+from insurance_server_python.tracing import (
+    OtlpFileExporter,
+    TraceBuffer,
+    Tracer,
+    span,
+    start_trace,
+    tracer,
+)
+
+
+class SpanTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tracer.buffer.clear()
+        self.addCleanup(tracer.buffer.clear)
+
+    def test_spans_nest_and_inherit_request_id(self) -> None:
+        with start_trace("tool_call", request_id="req-1"):
+            with span("outer") as outer:
+                with span("inner", model="M") as inner:
+                    pass
+
+        (trace,) = tracer.buffer.slowest(1)
+        self.assertEqual([s.name for s in trace.spans], ["tool_call", "outer", "inner"])
+        self.assertEqual(inner.parent_id, outer.span_id)
+        self.assertEqual(inner.attributes, {"model": "M", "request_id": "req-1"})
+        self.assertIsNotNone(inner.duration)
+
+    def test_span_outside_trace_is_noop(self) -> None:
+        with span("orphan") as orphan:
+            self.assertIsNone(orphan)
+        self.assertEqual(len(tracer.buffer), 0)
+
+    def test_exception_marks_span_as_error(self) -> None:
+        with self.assertRaises(ValueError):
+            with start_trace("tool_call"):
+                with span("boom"):
+                    raise ValueError("bad")
+        (trace,) = tracer.buffer.slowest(1)
+        self.assertEqual([s.error for s in trace.spans], ["ValueError", "ValueError"])
+
+    def test_buffer_keeps_most_recent_and_sorts_by_duration(self) -> None:
+        buffer = TraceBuffer(max_traces=2)
+        local = Tracer(buffer=buffer)
+        with patch("insurance_server_python.tracing.tracer", local):
+            for name in ("a", "b", "c"):
+                with start_trace(name) as root:
+                    pass
+                root.duration = {"a": 3.0, "b": 1.0, "c": 2.0}[name]
+        self.assertEqual([trace.root.name for trace in buffer.slowest(5)], ["c", "b"])
+
+
+class OtlpFileExporterTests(unittest.IsolatedAsyncioTestCase):
+    async def test_flush_writes_otlp_json_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as directory:
+            exporter = OtlpFileExporter(Path(directory) / "traces.jsonl")
+            local = Tracer(exporter=exporter)
+            with patch("insurance_server_python.tracing.tracer", local):
+                with start_trace("tool_call", request_id="req-2"):
+                    with span("validate", model="M"):
+                        pass
+            await exporter.flush()
+
+            (line,) = exporter.path.read_text().splitlines()
+        spans = json.loads(line)["resourceSpans"][0]["scopeSpans"][0]["spans"]
+        self.assertEqual([s["name"] for s in spans], ["tool_call", "validate"])
+        self.assertEqual(spans[1]["parentSpanId"], spans[0]["spanId"])
+        self.assertIn(
+            {"key": "request_id", "value": {"stringValue": "req-2"}}, spans[1]["attributes"]
+        )
+        self.assertEqual(exporter.exported, 1)
+
+
+@patch.dict(os.environ, {"PERSONAL_AUTO_RATE_API_KEY": "test-key"})
+class ToolCallTracingTests(RateStateIsolation, unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        tracer.buffer.clear()
+
+    def tearDown(self) -> None:
+        tracer.buffer.clear()
+
+    async def test_rate_call_records_each_stage(self) -> None:
+        app = create_fake_gateway_app(_settings())
+        client = create_upstream_client(transport=httpx.ASGITransport(app=app))
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams.model_validate(
+                {
+                    "name": "request-personal-auto-rate",
+                    "arguments": RATE_ARGUMENTS,
+                    "_meta": {"openai/requestId": "req-42"},
+                }
+            ),
+        )
+        with patch.object(tool_handlers, "get_upstream_client", return_value=client), patch.object(
+            tool_handlers,
+            "PERSONAL_AUTO_RATE_ENDPOINT",
+            f"{BASE_URL}/api/v2/linesOfBusiness/personalAuto/states",
+        ), patch.object(
+            tool_handlers, "PERSONAL_AUTO_RATE_RESULTS_ENDPOINT", f"{BASE_URL}{RESULTS_PATH}"
+        ):
+            await main._call_tool_request(request)
+        await client.aclose()
+
+        (trace,) = tracer.buffer.slowest(1)
+        names = [s.name for s in trace.spans]
+        for expected in (
+            "validate",
+            "sanitize",
+            "upstream.submit",
+            "upstream.getRateResultsById",
+            "format_summary",
+            "build_result",
+        ):
+            self.assertIn(expected, names)
+        self.assertEqual(trace.root.attributes["outcome"], "ok")
+        self.assertTrue(all(s.attributes.get("request_id") == "req-42" for s in trace.spans))
+
+        client = TestClient(main.app)
+        with patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": ""}):
+            self.assertEqual(client.get("/debug/traces").status_code, 404)
+        with patch.dict(os.environ, {"INSURANCE_PROFILING_TOKEN": "s3cret"}):
+            self.assertEqual(
+                client.get("/debug/traces", headers={"X-Admin-Token": "wrong"}).status_code, 401
+            )
+            response = client.get(
+                "/debug/traces?limit=1", headers={"Authorization": "Bearer s3cret"}
+            )
+        payload = response.json()
+        self.assertEqual(payload["buffered"], 1)
+        self.assertEqual(payload["traces"][0]["request_id"], "req-42")
+
+
+if __name__ == "__main__":
+    unittest.main()
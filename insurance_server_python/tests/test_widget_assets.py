@@ -0,0 +1,89 @@
+import gzip
+import json
+import unittest
+
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main
+from insurance_server_python.widget_assets import (
+    WIDGET_ASSETS,
+    choose_encoding,
+    etag_matches,
+    widget_path,
+)
+from insurance_server_python.widget_registry import INSURANCE_STATE_WIDGET_TEMPLATE_URI
+
+STATE_PATH = widget_path(INSURANCE_STATE_WIDGET_TEMPLATE_URI)
+
+
+class WidgetAssetTests(unittest.IsolatedAsyncioTestCase):
+    async def test_read_resource_returns_prebuilt_result(self) -> None:
+        request = types.ReadResourceRequest(
+            method="resources/read",
+            params=types.ReadResourceRequestParams(uri=INSURANCE_STATE_WIDGET_TEMPLATE_URI),
+        )
+        first = await main._handle_read_resource(request)
+        second = await main._handle_read_resource(request)
+
+        self.assertIs(first, second)
+        self.assertIs(first, WIDGET_ASSETS[INSURANCE_STATE_WIDGET_TEMPLATE_URI].read_result)
+
+    def test_compressed_variants_round_trip(self) -> None:
+        asset = WIDGET_ASSETS[INSURANCE_STATE_WIDGET_TEMPLATE_URI]
+        self.assertEqual(gzip.decompress(asset.encodings["gzip"]), asset.encodings["identity"])
+        self.assertLess(len(asset.encodings["gzip"]), len(asset.encodings["identity"]))
+        self.assertEqual(
+            json.loads(asset.read_result_json)["contents"][0]["text"],
+            asset.encodings["identity"].decode("utf-8"),
+        )
+
+    def test_encoding_negotiation(self) -> None:
+        asset = WIDGET_ASSETS[INSURANCE_STATE_WIDGET_TEMPLATE_URI]
+        self.assertEqual(choose_encoding(asset, "gzip, deflate"), "gzip")
+        self.assertEqual(choose_encoding(asset, "gzip;q=0"), "identity")
+        self.assertEqual(choose_encoding(asset, ""), "identity")
+        self.assertTrue(etag_matches('W/"abc", "def"', '"def"'))
+        self.assertFalse(etag_matches('"abc"', '"def"'))
+
+
+class WidgetRouteTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = TestClient(main.app)
+
+    def test_serves_gzip_and_revalidates(self) -> None:
+        asset = WIDGET_ASSETS[INSURANCE_STATE_WIDGET_TEMPLATE_URI]
+        response = self.client.get(STATE_PATH, headers={"Accept-Encoding": "gzip"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(response.headers["etag"], asset.etag("gzip"))
+        self.assertEqual(response.content, asset.encodings["identity"])
+
+        cached = self.client.get(
+            STATE_PATH,
+            headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["etag"]},
+        )
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+    def test_unknown_widget_is_404(self) -> None:
+        self.assertEqual(self.client.get("/widgets/missing.html").status_code, 404)
+
+    def test_legacy_read_resource_returns_serialized_bytes(self) -> None:
+        response = self.client.post(
+            "/mcp/messages",
+            json={
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "readResource",
+                "params": {"uri": INSURANCE_STATE_WIDGET_TEMPLATE_URI},
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        contents = response.json()["result"]["contents"]
+        self.assertEqual(contents[0]["uri"], INSURANCE_STATE_WIDGET_TEMPLATE_URI)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import json
+import os
+import unittest
+from unittest.mock import patch
+
+import mcp.types as types
+from starlette.testclient import TestClient
+
+from insurance_server_python import main
+from insurance_server_python.metrics import listing_bytes, tool_result_bytes, tool_result_meta_bytes
+from insurance_server_python.widget_assets import WIDGET_ASSETS
+from insurance_server_python.widget_registry import (
+    INSURANCE_RATE_RESULTS_WIDGET_IDENTIFIER,
+    INSURANCE_RATE_RESULTS_WIDGET_TEMPLATE_URI,
+    INSURANCE_STATE_WIDGET_IDENTIFIER,
+    INSURANCE_STATE_WIDGET_TEMPLATE_URI,
+    TOOL_REGISTRY,
+    WIDGETS_BY_ID,
+    _widget_result_meta,
+    registry_snapshot,
+)
+
+
+class ReferenceMetaTests(unittest.IsolatedAsyncioTestCase):
+    def test_tool_listing_does_not_embed_widget_html(self) -> None:
+        listing = registry_snapshot().list_tools_json.decode("utf-8")
+        self.assertNotIn("openai.com/widget", listing)
+        self.assertNotIn("<script", listing)
+
+    def test_rate_tool_references_results_widget_by_hash(self) -> None:
+        meta = TOOL_REGISTRY["request-personal-auto-rate"].tool.meta
+        self.assertEqual(meta["openai/outputTemplate"], INSURANCE_RATE_RESULTS_WIDGET_TEMPLATE_URI)
+        self.assertEqual(
+            meta["openai/widgetContentHash"],
+            WIDGET_ASSETS[INSURANCE_RATE_RESULTS_WIDGET_TEMPLATE_URI].content_hash,
+        )
+        default_meta = TOOL_REGISTRY["retrieve-personal-auto-rate-results"].default_meta
+        self.assertNotIn("openai.com/widget", default_meta)
+        self.assertEqual(default_meta["openai/widgetContentHash"], meta["openai/widgetContentHash"])
+
+    async def test_state_selector_result_carries_reference_and_counts_bytes(self) -> None:
+        calls = tool_result_meta_bytes.count(INSURANCE_STATE_WIDGET_IDENTIFIER)
+        result = await main._call_tool_request(
+            types.CallToolRequest(
+                method="tools/call",
+                params=types.CallToolRequestParams(
+                    name=INSURANCE_STATE_WIDGET_IDENTIFIER, arguments={}
+                ),
+            )
+        )
+        meta = result.root.meta
+        self.assertEqual(meta["openai/outputTemplate"], INSURANCE_STATE_WIDGET_TEMPLATE_URI)
+        self.assertIn("openai/widgetContentHash", meta)
+        self.assertNotIn("openai.com/widget", meta)
+        self.assertLess(len(json.dumps(meta)), 1024)
+        self.assertEqual(tool_result_meta_bytes.count(INSURANCE_STATE_WIDGET_IDENTIFIER), calls + 1)
+
+    async def test_listing_bytes_are_counted(self) -> None:
+        before = listing_bytes.value("tools/list")
+        await main._list_tools_request(types.ListToolsRequest(method="tools/list"))
+        self.assertEqual(
+            listing_bytes.value("tools/list") - before, len(registry_snapshot().list_tools_json)
+        )
+
+    def test_legacy_route_records_result_size(self) -> None:
+        calls = tool_result_bytes.count(INSURANCE_STATE_WIDGET_IDENTIFIER)
+        response = TestClient(main.app).post(
+            "/mcp/messages",
+            json={
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "callTool",
+                "params": {"name": INSURANCE_STATE_WIDGET_IDENTIFIER, "arguments": {}},
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(tool_result_bytes.count(INSURANCE_STATE_WIDGET_IDENTIFIER), calls + 1)
+
+
+class EmbeddedMetaTests(unittest.TestCase):
+    @patch.dict(os.environ, {"INSURANCE_WIDGET_META": "embedded"})
+    def test_embedded_mode_includes_widget_html(self) -> None:
+        widget = WIDGETS_BY_ID[INSURANCE_RATE_RESULTS_WIDGET_IDENTIFIER]
+        meta = _widget_result_meta(widget)
+        self.assertEqual(list(meta), ["openai.com/widget"])
+        self.assertEqual(meta["openai.com/widget"]["resource"]["text"], widget.html)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,11 @@
 """Tool handlers and business logic for insurance operations."""
 
+import asyncio
 import json
 import logging
 import os
-from pathlib import Path
-from typing import Any, Mapping, Optional
+import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Sequence, Tuple
 import httpx
 from pydantic import ValidationError
 
@@ -16,6 +17,7 @@ from .models import (
     PersonalAutoVehicleIntake,
     PersonalAutoRateRequest,
     PersonalAutoRateResultsRequest,
+    PersonalAutoCoverageWhatIfRequest,
     ToolInvocationResult,
 )
 from .constants import (
@@ -23,26 +25,75 @@ from .constants import (
     PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
     DEFAULT_CARRIER_INFORMATION,
 )
+from .admission import upstream_admission
+from .audit import rate_audit_sink
+from .coverage_whatif import (
+    format_premium_matrix,
+    premium_matrix,
+    record_started_variant,
+    variant_arguments,
+    variant_label,
+)
+from .deadlines import DeadlineExceeded, deadline_expired
+from .http_client import get_upstream_client, upstream_timeout
+from .idempotency import RateSubmission, canonical_request_hash, recent_submissions
+from .log_config import _log_network_request, _log_network_response
+from .metrics import upstream_latency, upstream_request_bytes, upstream_response_bytes
+from .quote_store import StoredQuote, quote_store
+from .rate_cache import CachedRateResults, rate_results_cache
+from .progress import RateProgressReporter
+from .rate_jobs import COMPLETE, FAILED, RateJob, rate_job_mode, rate_job_queue
+from .rate_polling import (
+    poll_rate_results,
+    rate_results_complete as _rate_results_complete,
+    requested_products,
+)
+from .resilience import (
+    RESULTS_ENDPOINT,
+    SUBMIT_ENDPOINT,
+    call_with_breaker,
+    circuit_breakers,
+    retry_budget,
+)
+from .serialization import dumps, dumps_canonical, loads
+from .shared_state import RATE_RESULTS, SUBMISSIONS, TRANSACTIONS, shared_state
+from .singleflight import SingleFlight
+from .tracing import span
 from .utils import (
+    _env_int,
     _extract_request_id,
     _sanitize_personal_auto_rate_request,
-    _log_network_request,
-    _log_network_response,
     state_abbreviation,
     format_rate_results_summary,
 )
 
 logger = logging.getLogger(__name__)
 
+# Concurrent retrievals of the same transaction share one upstream GET.
+rate_results_flight: SingleFlight[CachedRateResults] = SingleFlight("rate_results")
+# Identical submissions racing each other (double-clicks) share one POST.
+# The flag is true when another worker's submission was reused.
+rate_submission_flight: SingleFlight[Tuple[RateSubmission, bool]] = SingleFlight(
+    "rate_submission"
+)
+
 
 def _insurance_state_tool_handler(
-    arguments: Mapping[str, Any], widget_id: str, widget_meta: dict, widget_resource: dict
+    arguments: Mapping[str, Any],
+    widget_id: str,
+    widget_meta: dict,
+    widget_resource: Optional[dict],
 ) -> ToolInvocationResult:
-    """Handle insurance state selector tool invocation."""
+    """Handle insurance state selector tool invocation.
+
+    ``widget_resource`` is the embedded widget for clients that expect the
+    HTML inline, or ``None`` when ``widget_meta`` only references it.
+    """
     request_id = _extract_request_id(arguments) or "<unknown>"
 
     try:
-        InsuranceStateInput.model_validate(arguments)
+        with span("validate", model="InsuranceStateInput"):
+            InsuranceStateInput.model_validate(arguments)
     except ValidationError as error:
         logger.info(
             "Insurance state widget validation failed for %s (request_id=%s): %s",
@@ -57,18 +108,16 @@ def _insurance_state_tool_handler(
         widget_id,
         request_id,
     )
-    return {
-        "structured_content": {},
-        "meta": {
-            **widget_meta,
-            "openai.com/widget": widget_resource,
-        },
-    }
+    meta = dict(widget_meta)
+    if widget_resource is not None:
+        meta["openai.com/widget"] = widget_resource
+    return {"structured_content": {}, "meta": meta}
 
 
 def _collect_personal_auto_customer(arguments: Mapping[str, Any]) -> ToolInvocationResult:
     """Collect and validate customer profile information."""
-    payload = PersonalAutoCustomerIntake.model_validate(arguments)
+    with span("validate", model="PersonalAutoCustomerIntake"):
+        payload = PersonalAutoCustomerIntake.model_validate(arguments)
     customer = payload.customer
     full_name = " ".join(
         part
@@ -86,7 +135,8 @@ def _collect_personal_auto_driver_roster(
     arguments: Mapping[str, Any]
 ) -> ToolInvocationResult:
     """Collect and validate driver roster information."""
-    payload = PersonalAutoDriverRosterInput.model_validate(arguments)
+    with span("validate", model="PersonalAutoDriverRosterInput"):
+        payload = PersonalAutoDriverRosterInput.model_validate(arguments)
     entries = payload.driver_roster
     names = [
         " ".join(
@@ -115,7 +165,8 @@ def _collect_personal_auto_driver_roster(
 
 def _collect_personal_auto_drivers(arguments: Mapping[str, Any]) -> ToolInvocationResult:
     """Collect and validate rated driver information."""
-    payload = PersonalAutoDriverIntake.model_validate(arguments)
+    with span("validate", model="PersonalAutoDriverIntake"):
+        payload = PersonalAutoDriverIntake.model_validate(arguments)
     driver_count = len(payload.rated_drivers)
     names = [
         " ".join(
@@ -138,7 +189,8 @@ def _collect_personal_auto_drivers(arguments: Mapping[str, Any]) -> ToolInvocati
 
 def _collect_personal_auto_vehicles(arguments: Mapping[str, Any]) -> ToolInvocationResult:
     """Collect and validate vehicle information."""
-    payload = PersonalAutoVehicleIntake.model_validate(arguments)
+    with span("validate", model="PersonalAutoVehicleIntake"):
+        payload = PersonalAutoVehicleIntake.model_validate(arguments)
     vehicle_count = len(payload.vehicles)
     summaries = []
     for vehicle in payload.vehicles:
@@ -169,37 +221,281 @@ def _personal_auto_rate_headers() -> dict[str, str]:
     }
 
 
-async def _request_personal_auto_rate(arguments: Mapping[str, Any]) -> ToolInvocationResult:
-    """Request personal auto insurance rate."""
-    payload = PersonalAutoRateRequest.model_validate(arguments)
-    request_body = payload.model_dump(by_alias=True, exclude_none=True)
-    _sanitize_personal_auto_rate_request(request_body)
-    request_body["CarrierInformation"] = DEFAULT_CARRIER_INFORMATION
+async def _upstream_send(
+    endpoint: str, method: str, url: str, **kwargs: Any
+) -> httpx.Response:
+    """Send one gateway request and record its latency and body sizes."""
+    client = get_upstream_client()
+    send = client.post if method == "POST" else client.get
+    content = kwargs.get("content")
+    if content is not None:
+        upstream_request_bytes.observe(len(content), endpoint)
+    started = time.perf_counter()
+    status = "error"
+    with span(f"upstream.{endpoint}", method=method) as upstream_span:
+        try:
+            response = await send(url, timeout=upstream_timeout(client), **kwargs)
+            status = str(response.status_code)
+        finally:
+            upstream_latency.observe(time.perf_counter() - started, endpoint, status)
+            if upstream_span is not None:
+                upstream_span.set_attribute("status", status)
+    upstream_response_bytes.observe(len(response.content), endpoint)
+    return response
+
+
+def _upstream_get(url: str, **kwargs: Any) -> Awaitable[httpx.Response]:
+    return _upstream_send(RESULTS_ENDPOINT, "GET", url, **kwargs)
+
+
+def _upstream_post(url: str, **kwargs: Any) -> Awaitable[httpx.Response]:
+    return _upstream_send(SUBMIT_ENDPOINT, "POST", url, **kwargs)
+
+
+async def _admitted(
+    send: Callable[[], Awaitable[httpx.Response]], state_code: Optional[str] = None
+) -> httpx.Response:
+    """Send one gateway attempt while holding an admission slot.
+
+    Admission is taken per attempt, so retries and their backoff sleeps do
+    not keep a slot from other callers.
+    """
+    async with upstream_admission.admit(state_code):
+        return await send()
+
+
+def _raise_if_deadline_expired(exc: httpx.HTTPError) -> None:
+    """Report an upstream timeout caused by the tool's time budget as such."""
+    if isinstance(exc, httpx.TimeoutException) and deadline_expired():
+        raise DeadlineExceeded("The tool call's time budget ran out upstream.") from exc
+
+
+async def _fetch_personal_auto_rate_results(
+    identifier: str, headers: Mapping[str, str]
+) -> Tuple[int, Any]:
+    """Fetch rate results for a transaction once and return ``(status, results)``."""
+    _log_network_request(
+        method="GET",
+        url=PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
+        headers=headers,
+        payload={"params": {"Id": identifier}},
+    )
 
     try:
-        log_path = Path(__file__).with_name("personal_auto_rate_request.json")
-        log_path.write_text(
-            json.dumps(request_body, indent=2, sort_keys=True), encoding="utf-8"
+        response = await call_with_breaker(
+            circuit_breakers[RESULTS_ENDPOINT],
+            lambda: _admitted(
+                lambda: _upstream_get(
+                    PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
+                    headers=headers,
+                    params={"Id": identifier},
+                )
+            ),
+            retry_budget=retry_budget,
+            max_retries=_env_int("ZRATER_GET_MAX_RETRIES", 2),
+        )
+    except httpx.HTTPError as exc:  # pragma: no cover - network error handling
+        _raise_if_deadline_expired(exc)
+        logger.exception(
+            "Personal auto rate results retrieval failed due to network error"
         )
-    except OSError as exc:  # pragma: no cover - filesystem error handling
-        logger.warning("Failed to write personal auto rate request body: %s", exc)
+        raise RuntimeError(
+            f"Failed to retrieve personal auto rate results: {exc}"
+        ) from exc
 
-    state = payload.customer.address.state
-    state_code = state_abbreviation(state) or state
-    url = f"{PERSONAL_AUTO_RATE_ENDPOINT}/{state_code}/rates/latest?multiAgency=false"
+    status_code = response.status_code
+    response_text = response.text
+    _log_network_response(
+        method="GET",
+        url=PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
+        status=status_code,
+        response_text=response_text,
+    )
+    if response.is_error:
+        raise RuntimeError(
+            "Personal auto rate results request failed with "
+            f"status {status_code}: {response_text}"
+        )
 
-    headers = _personal_auto_rate_headers()
+    rate_results: Any = None
+    if response_text.strip():
+        try:
+            rate_results = loads(response_text)
+        except ValueError as exc:
+            raise RuntimeError(
+                f"Failed to parse personal auto rate results response: {exc}"
+            ) from exc
+    return status_code, rate_results
+
+
+async def _load_personal_auto_rate_results(
+    identifier: str,
+    headers: Mapping[str, str],
+    *,
+    allow_partial: bool,
+    expected_products: Sequence[Tuple[Optional[str], Optional[str]]] = (),
+    aliases: Sequence[str] = (),
+    stored: Optional[StoredQuote] = None,
+    check_stores: bool = True,
+) -> Tuple[CachedRateResults, bool]:
+    """Return rate results from the cache or the gateway and whether it was a hit.
+
+    ``stored`` is the quote store entry the caller looked up for this
+    transaction; its complete results, or those another worker published to
+    shared state, are served on a cache miss. Pollers pass
+    ``check_stores=False`` after their first fetch so later ticks only
+    consult the in-process cache and the gateway; those ticks are also left
+    out of the cache hit and miss counts. Concurrent misses for the
+    same identifier share one upstream GET. Fresh gateway responses are
+    written back to the cache; results that cover every expected carrier
+    product are stored as final and kept longer.
+    """
+    cached = rate_results_cache.get(
+        identifier, allow_partial=allow_partial, count=check_stores
+    )
+    if cached is not None:
+        logger.debug("Rate results cache hit for %s (final=%s)", identifier, cached.is_final)
+        return cached, True
+
+    if check_stores:
+        if stored is not None and stored.rate_results_complete:
+            logger.debug("Serving final rate results for %s from the quote store", identifier)
+            return (
+                _cache_final_results(
+                    stored.transaction_id,
+                    stored.rate_results,
+                    stored.rate_results_status,
+                    (identifier, *aliases),
+                ),
+                True,
+            )
 
-    _log_network_request(method="POST", url=url, headers=headers, payload=request_body)
+        shared = await shared_state.get(RATE_RESULTS, identifier)
+        if shared is not None:
+            logger.debug("Serving final rate results for %s from another worker", identifier)
+            return (
+                _cache_final_results(
+                    shared["transaction_id"],
+                    shared["rate_results"],
+                    shared["status"],
+                    (identifier, *aliases),
+                ),
+                True,
+            )
 
-    try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as client:
-            response = await client.post(
-                url,
-                headers=headers,
-                json=request_body,
+    async def fetch_and_store() -> CachedRateResults:
+        status_code, rate_results = await _fetch_personal_auto_rate_results(
+            identifier, headers
+        )
+        is_final = _rate_results_complete(
+            rate_results, expected_products or requested_products()
+        )
+        entry = rate_results_cache.put(
+            identifier,
+            rate_results,
+            status=status_code,
+            is_final=is_final,
+            aliases=aliases,
+        )
+        if is_final:
+            await quote_store.record_results(
+                identifier, rate_results, status=status_code, complete=True
+            )
+            shared_value = {
+                "transaction_id": identifier,
+                "status": status_code,
+                "rate_results": rate_results,
+            }
+            for key in (identifier, *aliases):
+                await shared_state.put(
+                    RATE_RESULTS, key, shared_value, rate_results_cache.final_ttl
+                )
+        if entry is None:
+            entry = CachedRateResults(
+                transaction_id=identifier,
+                status=status_code,
+                rate_results=rate_results,
+                is_final=is_final,
+                stored_at=0.0,
+                expires_at=0.0,
             )
+        return entry
+
+    entry, shared = await rate_results_flight.do(
+        identifier.strip().lower(), fetch_and_store
+    )
+    if shared:
+        logger.debug("Coalesced rate results request for %s onto in-flight fetch", identifier)
+    return entry, False
+
+
+def _cache_final_results(
+    transaction_id: str, rate_results: Any, status: Optional[int], aliases: Sequence[str]
+) -> CachedRateResults:
+    """Cache complete results found outside this process and return the entry."""
+    entry = rate_results_cache.put(
+        transaction_id, rate_results, status=status, is_final=True, aliases=aliases
+    )
+    if entry is None:
+        entry = CachedRateResults(
+            transaction_id=transaction_id,
+            status=status,
+            rate_results=rate_results,
+            is_final=True,
+            stored_at=0.0,
+            expires_at=0.0,
+        )
+    return entry
+
+
+def _encode_submission(submission: RateSubmission) -> Optional[Dict[str, Any]]:
+    if not submission.transaction_id:
+        return None
+    return {
+        "transaction_id": submission.transaction_id,
+        "status": submission.status,
+        "response": submission.response,
+    }
+
+
+def _decode_submission(value: Dict[str, Any]) -> RateSubmission:
+    return RateSubmission(
+        transaction_id=value["transaction_id"],
+        status=value["status"],
+        response=value["response"],
+    )
+
+
+async def _submit_personal_auto_rate(
+    url: str,
+    headers: Mapping[str, str],
+    request_body: Mapping[str, Any],
+    state_code: Optional[str] = None,
+    serialized_body: Optional[bytes] = None,
+) -> RateSubmission:
+    """POST a sanitized rate request to the gateway and parse the acknowledgement.
+
+    ``serialized_body`` is sent as-is when given so callers that already
+    encoded the body for hashing do not encode it again.
+    """
+    if serialized_body is None:
+        serialized_body = dumps(request_body)
+    _log_network_request(method="POST", url=url, headers=headers, payload=serialized_body)
+
+    try:
+        response = await call_with_breaker(
+            circuit_breakers[SUBMIT_ENDPOINT],
+            lambda: _admitted(
+                lambda: _upstream_post(
+                    url,
+                    headers=headers,
+                    content=serialized_body,
+                ),
+                state_code,
+            ),
+        )
     except httpx.HTTPError as exc:  # pragma: no cover - network error handling
+        _raise_if_deadline_expired(exc)
         logger.exception("Personal auto rate request failed due to network error")
         raise RuntimeError(f"Failed to request personal auto rate: {exc}") from exc
 
@@ -211,8 +507,8 @@ async def _request_personal_auto_rate(arguments: Mapping[str, Any]) -> ToolInvoc
     parsed_response: Any = {}
     if response_text.strip():
         try:
-            parsed_response = response.json()
-        except (json.JSONDecodeError, ValueError) as exc:
+            parsed_response = loads(response_text)
+        except ValueError as exc:
             raise RuntimeError(
                 f"Failed to parse personal auto rate response: {exc}"
             ) from exc
@@ -222,63 +518,245 @@ async def _request_personal_auto_rate(arguments: Mapping[str, Any]) -> ToolInvoc
             f"Personal auto rate request failed with status {status_code}: {response_text}"
         )
 
-    transaction_id = parsed_response.get("transactionId")
+    transaction_id = (
+        parsed_response.get("transactionId") if isinstance(parsed_response, dict) else None
+    )
+    return RateSubmission(
+        transaction_id=transaction_id,
+        status=status_code,
+        response=parsed_response,
+    )
+
+
+def _prepare_personal_auto_rate(
+    arguments: Mapping[str, Any]
+) -> Tuple[PersonalAutoRateRequest, Dict[str, Any], str]:
+    """Validate and sanitize a rate request; return payload, body, and state code."""
+    with span("validate", model="PersonalAutoRateRequest"):
+        payload = PersonalAutoRateRequest.model_validate(arguments)
+    with span("sanitize"):
+        request_body = payload.model_dump(by_alias=True, exclude_none=True)
+        _sanitize_personal_auto_rate_request(request_body)
+    request_body["CarrierInformation"] = DEFAULT_CARRIER_INFORMATION
+
+    state = payload.customer.address.state
+    state_code = state_abbreviation(state) or state
+    return payload, request_body, state_code
+
+
+async def _request_personal_auto_rate(arguments: Mapping[str, Any]) -> ToolInvocationResult:
+    """Request personal auto insurance rate."""
+    payload, request_body, state_code = _prepare_personal_auto_rate(arguments)
+    headers = _personal_auto_rate_headers()
+    if rate_job_mode() == "async":
+        return _enqueue_personal_auto_rate(payload, request_body, state_code, headers)
+    return await _run_personal_auto_rate(payload, request_body, state_code, headers)
+
+
+def _enqueue_personal_auto_rate(
+    payload: PersonalAutoRateRequest,
+    request_body: Dict[str, Any],
+    state_code: str,
+    headers: Mapping[str, str],
+) -> ToolInvocationResult:
+    """Queue a rate request as a background job and acknowledge it immediately."""
+    request_hash = canonical_request_hash(request_body)
+
+    async def run(job: RateJob) -> Dict[str, Any]:
+        return await _run_personal_auto_rate(
+            payload,
+            request_body,
+            state_code,
+            headers,
+            on_submitted=lambda submission: rate_job_queue.set_transaction(
+                job, submission.transaction_id
+            ),
+        )
+
+    job = rate_job_queue.submit(payload.identifier, run, request_hash=request_hash)
+    logger.info("Queued rate request %s as job %s", payload.identifier, job.job_id)
+
+    message = (
+        f"Queued personal auto rate request for {payload.identifier} (job {job.job_id}). "
+        "Carriers are being rated in the background; call "
+        f"retrieve-personal-auto-rate-results with identifier {payload.identifier} "
+        "to check progress and results."
+    )
+
+    import mcp.types as types
+    content = [
+        types.TextContent(type="text", text=message),
+        types.TextContent(
+            type="text",
+            text=json.dumps({"quoteId": payload.identifier, "jobId": job.job_id}),
+            annotations=types.Annotations(audience=["assistant"]),
+        ),
+    ]
+    return {
+        "structured_content": {
+            "identifier": payload.identifier,
+            "request": request_body,
+            "job": job.snapshot(),
+            "rate_results": None,
+            "rate_results_complete": False,
+            "request_hash": request_hash,
+        },
+        "content": content,
+    }
+
+
+async def _run_personal_auto_rate(
+    payload: PersonalAutoRateRequest,
+    request_body: Dict[str, Any],
+    state_code: str,
+    headers: Mapping[str, str],
+    *,
+    on_submitted: Optional[Callable[[RateSubmission], None]] = None,
+    report_progress: bool = True,
+) -> ToolInvocationResult:
+    """Submit a prepared rate request and poll for its carrier results."""
+    url = f"{PERSONAL_AUTO_RATE_ENDPOINT}/{state_code}/rates/latest?multiAgency=false"
+
+    # Serialize once: the same bytes are hashed, sent upstream, and audited.
+    serialized_body = dumps_canonical(request_body)
+    request_hash = canonical_request_hash(serialized_body)
+    submission = recent_submissions.get(request_hash)
+    deduplicated = submission is not None
+    if submission is None:
+
+        async def submit_and_record() -> Tuple[RateSubmission, bool]:
+            # Other workers submitting the same request wait for this POST
+            # and reuse its transaction instead of creating another one.
+            result, from_peer = await shared_state.run_once(
+                SUBMISSIONS,
+                request_hash,
+                lambda: _submit_personal_auto_rate(
+                    url, headers, request_body, state_code, serialized_body
+                ),
+                encode=_encode_submission,
+                decode=_decode_submission,
+                ttl=recent_submissions.window,
+            )
+            recent_submissions.record(request_hash, result)
+            # Recorded inside the shared task so the mapping survives a
+            # caller that times out while the POST is still in flight.
+            recent_submissions.remember_identifier(payload.identifier, result.transaction_id)
+            if result.transaction_id:
+                await shared_state.put(
+                    TRANSACTIONS,
+                    payload.identifier,
+                    result.transaction_id,
+                    shared_state.transaction_ttl,
+                )
+            return result, from_peer
+
+        (submission, from_peer), coalesced = await rate_submission_flight.do(
+            request_hash, submit_and_record
+        )
+        deduplicated = coalesced or from_peer
+    if deduplicated:
+        recent_submissions.remember_identifier(payload.identifier, submission.transaction_id)
+    if on_submitted is not None:
+        on_submitted(submission)
+    if submission.transaction_id:
+        await quote_store.record_submission(
+            payload.identifier,
+            submission.transaction_id,
+            request_body=serialized_body,
+            request_hash=request_hash,
+            state=state_code,
+            status=submission.status,
+        )
+    rate_audit_sink.record(
+        serialized_body,
+        identifier=payload.identifier,
+        transaction_id=submission.transaction_id,
+        requestHash=request_hash,
+        state=state_code,
+        status=submission.status,
+        deduplicated=deduplicated,
+    )
+    if deduplicated:
+        logger.info(
+            "Reusing transaction %s for identical rate request %s (hash %s)",
+            submission.transaction_id,
+            payload.identifier,
+            request_hash[:12],
+        )
+
+    status_code = submission.status
+    parsed_response = submission.response
+    transaction_id = submission.transaction_id
     rate_results: Any = None
     rate_results_status: Optional[int] = None
+    rate_results_complete = False
+    poll_attempts = 0
     if transaction_id:
-        results_url = PERSONAL_AUTO_RATE_RESULTS_ENDPOINT
-        _log_network_request(
-            method="GET",
-            url=results_url,
-            headers=headers,
-            payload={"params": {"Id": transaction_id}},
-        )
-        try:
-            async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as client:
-                rate_results_response = await client.get(
-                    results_url,
-                    headers=headers,
-                    params={"Id": transaction_id},
-                )
-        except httpx.HTTPError as exc:  # pragma: no cover - network error handling
-            logger.exception(
-                "Personal auto rate results request failed due to network error"
+        expected_products = requested_products(request_body["CarrierInformation"])
+        # The quote store and shared state are consulted on the first fetch
+        # only; later polls cannot find results there the gateway lacks.
+        stored = await quote_store.lookup(transaction_id)
+        first_fetch = True
+
+        async def fetch_rate_results() -> Tuple[Optional[int], Any]:
+            nonlocal first_fetch
+            entry, _ = await _load_personal_auto_rate_results(
+                transaction_id,
+                headers,
+                allow_partial=False,
+                expected_products=expected_products,
+                aliases=(payload.identifier,),
+                stored=stored,
+                check_stores=first_fetch,
             )
-            raise RuntimeError(
-                f"Failed to request personal auto rate results: {exc}"
-            ) from exc
-
-        rate_results_status = rate_results_response.status_code
-        rate_results_text = rate_results_response.text
-        _log_network_response(
-            method="GET",
-            url=results_url,
-            status=rate_results_status,
-            response_text=rate_results_text,
+            first_fetch = False
+            return entry.status, entry.rate_results
+
+        progress = RateProgressReporter(transaction_id, expected_products)
+        outcome = await poll_rate_results(
+            fetch_rate_results,
+            is_complete=lambda results: _rate_results_complete(results, expected_products),
+            on_update=progress.update if report_progress else None,
         )
-        if rate_results_response.is_error:
-            raise RuntimeError(
-                "Personal auto rate results request failed with "
-                f"status {rate_results_status}: {rate_results_text}"
+        rate_results = outcome.rate_results
+        rate_results_status = outcome.status
+        rate_results_complete = outcome.complete
+        poll_attempts = outcome.attempts
+        if not rate_results_complete:
+            # Final results are persisted by the fetch path; keep partial
+            # results too so a restart can still show what was rated.
+            await quote_store.record_results(
+                transaction_id,
+                rate_results,
+                status=rate_results_status,
+                complete=False,
             )
-        if rate_results_text.strip():
-            try:
-                rate_results = rate_results_response.json()
-            except (json.JSONDecodeError, ValueError) as exc:
-                raise RuntimeError(
-                    f"Failed to parse personal auto rate results response: {exc}"
-                ) from exc
+        logger.info(
+            "Polled rate results for transaction %s: attempts=%s complete=%s elapsed=%.2fs",
+            transaction_id,
+            outcome.attempts,
+            outcome.complete,
+            outcome.elapsed,
+        )
 
     message = (
         f"Submitted personal auto rate request for {payload.identifier} (transaction {transaction_id})."
         if transaction_id
         else f"Submitted personal auto rate request for {payload.identifier}."
     )
+    if deduplicated:
+        message += " An identical request was already rating, so its results were reused."
     if transaction_id and rate_results is not None:
         message += " Retrieved carrier rate results."
-        summary = format_rate_results_summary(rate_results)
+        with span("format_summary"):
+            summary = format_rate_results_summary(rate_results)
         if summary:
             message += f"\n\n{summary}"
+    if transaction_id and not rate_results_complete:
+        message += (
+            " Some carriers are still rating; call retrieve-personal-auto-rate-results "
+            f"with identifier {transaction_id} to check for the remaining results."
+        )
 
     # Build content array with model-visible transaction ID
     import mcp.types as types
@@ -305,70 +783,172 @@ async def _request_personal_auto_rate(arguments: Mapping[str, Any]) -> ToolInvoc
             "status": status_code,
             "rate_results": rate_results,
             "rate_results_status": rate_results_status,
+            "rate_results_complete": rate_results_complete,
+            "poll_attempts": poll_attempts,
+            "deduplicated": deduplicated,
+            "request_hash": request_hash,
         },
         "content": content,
     }
 
 
-async def _retrieve_personal_auto_rate_results(
+async def _compare_personal_auto_coverage_variants(
     arguments: Mapping[str, Any]
 ) -> ToolInvocationResult:
-    """Retrieve personal auto rate results by identifier."""
-    payload = PersonalAutoRateResultsRequest.model_validate(arguments)
-    identifier = payload.identifier
-
+    """Rate coverage variants of one quote concurrently and return a premium matrix."""
+    with span("validate", model="PersonalAutoCoverageWhatIfRequest"):
+        payload = PersonalAutoCoverageWhatIfRequest.model_validate(arguments)
+    base_arguments = payload.base_request.model_dump(by_alias=True, exclude_none=True)
     headers = _personal_auto_rate_headers()
-
-    _log_network_request(
-        method="GET",
-        url=PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
-        headers=headers,
-        payload={"params": {"Id": identifier}},
+    limit = asyncio.Semaphore(max(_env_int("INSURANCE_WHATIF_CONCURRENCY", 4), 1))
+
+    async def rate_variant(index: int, coverages: Dict[str, Any]) -> Dict[str, Any]:
+        variant_args = variant_arguments(base_arguments, coverages, index)
+        variant = {
+            "label": variant_label(variant_args["PolicyCoverages"]),
+            "coverages": coverages,
+            "identifier": variant_args["Identifier"],
+            "transaction_id": None,
+            "rate_results": None,
+            "complete": False,
+            "error": None,
+        }
+        try:
+            prepared = _prepare_personal_auto_rate(variant_args)
+            async with limit:
+                record_started_variant(variant["identifier"])
+                result = await _run_personal_auto_rate(
+                    *prepared,
+                    headers,
+                    on_submitted=lambda submission: variant.update(
+                        transaction_id=submission.transaction_id
+                    ),
+                    report_progress=False,
+                )
+        except (ValidationError, RuntimeError, httpx.HTTPError) as exc:
+            logger.warning("Coverage variant %s failed: %s", variant["identifier"], exc)
+            variant["error"] = str(exc) or exc.__class__.__name__
+            return variant
+        structured = result["structured_content"]
+        variant["rate_results"] = structured.get("rate_results")
+        variant["complete"] = structured.get("rate_results_complete", False)
+        return variant
+
+    variants = await asyncio.gather(
+        *(
+            rate_variant(index, coverages.model_dump(by_alias=True, exclude_none=True))
+            for index, coverages in enumerate(payload.coverage_variants)
+        )
     )
+    matrix = premium_matrix(variants)
 
-    try:
-        async with httpx.AsyncClient(timeout=httpx.Timeout(15.0)) as client:
-            response = await client.get(
-                PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
-                headers=headers,
-                params={"Id": identifier},
-            )
-    except httpx.HTTPError as exc:  # pragma: no cover - network error handling
-        logger.exception(
-            "Personal auto rate results retrieval failed due to network error"
+    rated = sum(1 for row in matrix["variants"] if not row["error"])
+    message = (
+        f"Rated {rated} of {len(variants)} coverage variants for "
+        f"{payload.base_request.identifier}.\n\n{format_premium_matrix(matrix)}"
+    )
+    if any(not row["complete"] and not row["error"] for row in matrix["variants"]):
+        message += (
+            "\n\nSome carriers were still rating; call retrieve-personal-auto-rate-results "
+            "with a variant identifier for its remaining results."
         )
-        raise RuntimeError(
-            f"Failed to retrieve personal auto rate results: {exc}"
-        ) from exc
 
-    status_code = response.status_code
-    response_text = response.text
-    _log_network_response(
-        method="GET",
-        url=PERSONAL_AUTO_RATE_RESULTS_ENDPOINT,
-        status=status_code,
-        response_text=response_text,
-    )
-    rate_results: Any = None
-    if response_text.strip():
-        try:
-            rate_results = response.json()
-        except (json.JSONDecodeError, ValueError) as exc:
-            raise RuntimeError(
-                f"Failed to parse personal auto rate results response: {exc}"
-            ) from exc
+    import mcp.types as types
+    return {
+        "structured_content": {
+            "identifier": payload.base_request.identifier,
+            **matrix,
+        },
+        "content": [
+            types.TextContent(type="text", text=message),
+            types.TextContent(
+                type="text",
+                text=json.dumps(
+                    {
+                        "quoteId": payload.base_request.identifier,
+                        "variants": {
+                            row["identifier"]: row["transactionId"]
+                            for row in matrix["variants"]
+                        },
+                    }
+                ),
+                annotations=types.Annotations(audience=["assistant"]),
+            ),
+        ],
+    }
 
-    if response.is_error:
-        raise RuntimeError(
-            "Personal auto rate results request failed with "
-            f"status {status_code}: {response_text}"
+
+def _rate_job_status_result(identifier: str, job: RateJob) -> ToolInvocationResult:
+    """Describe a rate job that has no gateway transaction to read results from."""
+    if job.state == COMPLETE:
+        message = (
+            f"The rate request for {job.identifier} finished without a transaction id "
+            "from the rating gateway, so there are no carrier results to retrieve. "
+            "Submit it again with request-personal-auto-rate."
+        )
+    else:
+        message = (
+            f"The rate request for {job.identifier} is still {job.state}; "
+            f"call retrieve-personal-auto-rate-results with identifier {identifier} again shortly."
         )
 
+    import mcp.types as types
+    return {
+        "structured_content": {
+            "identifier": identifier,
+            "rate_results": None,
+            "status": None,
+            "rate_results_complete": False,
+            "cached": False,
+            "job": job.snapshot(),
+        },
+        "content": [types.TextContent(type="text", text=message)],
+    }
+
+
+async def _retrieve_personal_auto_rate_results(
+    arguments: Mapping[str, Any]
+) -> ToolInvocationResult:
+    """Retrieve personal auto rate results by identifier."""
+    with span("validate", model="PersonalAutoRateResultsRequest"):
+        payload = PersonalAutoRateResultsRequest.model_validate(arguments)
+    identifier = payload.identifier
+
+    job = rate_job_queue.get(identifier)
+    if job is not None:
+        # A job that failed after submitting still has results to read.
+        if job.transaction_id:
+            lookup = job.transaction_id
+        elif job.state == FAILED:
+            raise RuntimeError(f"Rate job for {job.identifier} failed: {job.error}")
+        else:
+            return _rate_job_status_result(identifier, job)
+        stored = await quote_store.lookup(lookup)
+    else:
+        # One lookup resolves quote identifiers and transaction ids alike.
+        stored = await quote_store.lookup(identifier)
+        if stored is not None:
+            lookup = stored.transaction_id
+        else:
+            lookup = (
+                recent_submissions.transaction_for(identifier)
+                or await shared_state.get(TRANSACTIONS, identifier)
+                or identifier
+            )
+
+    headers = _personal_auto_rate_headers()
+    entry, from_cache = await _load_personal_auto_rate_results(
+        lookup, headers, allow_partial=True, stored=stored
+    )
+    status_code = entry.status
+    rate_results = entry.rate_results
+
     message = f"Retrieved personal auto rate results for {identifier}."
     if not rate_results:
         message += " No carrier results were returned."
     elif rate_results:
-        summary = format_rate_results_summary(rate_results)
+        with span("format_summary"):
+            summary = format_rate_results_summary(rate_results)
         if summary:
             message += f"\n\n{summary}"
 
@@ -382,33 +962,37 @@ async def _retrieve_personal_auto_rate_results(
             type="text",
             text=json.dumps({
                 "quoteId": identifier,
-                "transactionId": identifier
+                "transactionId": entry.transaction_id
             }),
             annotations=types.Annotations(audience=["assistant"])
         )
     )
 
     # Log the structure we're returning for debugging
-    logger.info("=== RETRIEVE TOOL RETURNING ===")
-    logger.info("Message: %s", message)
-    logger.info("Rate results type: %s", type(rate_results))
-    if rate_results:
-        logger.info("Rate results keys: %s", list(rate_results.keys()) if isinstance(rate_results, dict) else "not a dict")
-        if isinstance(rate_results, dict) and "carrierResults" in rate_results:
-            logger.info("carrierResults found at top level, length: %s", len(rate_results.get("carrierResults", [])))
-        if isinstance(rate_results, dict) and "CarrierResults" in rate_results:
-            logger.info("CarrierResults found at top level, length: %s", len(rate_results.get("CarrierResults", [])))
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("=== RETRIEVE TOOL RETURNING ===")
+        logger.debug("Message: %s", message)
+        logger.debug("Rate results type: %s", type(rate_results))
+        if rate_results:
+            logger.debug("Rate results keys: %s", list(rate_results.keys()) if isinstance(rate_results, dict) else "not a dict")
+            if isinstance(rate_results, dict) and "carrierResults" in rate_results:
+                logger.debug("carrierResults found at top level, length: %s", len(rate_results.get("carrierResults", [])))
+            if isinstance(rate_results, dict) and "CarrierResults" in rate_results:
+                logger.debug("CarrierResults found at top level, length: %s", len(rate_results.get("CarrierResults", [])))
 
     result = {
         "structured_content": {
             "identifier": identifier,
             "rate_results": rate_results,
             "status": status_code,
+            "rate_results_complete": entry.is_final,
+            "cached": from_cache,
+            "job": job.snapshot() if job is not None else None,
         },
         "content": content,
     }
 
-    logger.info("Structured content keys: %s", list(result["structured_content"].keys()))
-    logger.info("=== END RETRIEVE TOOL RETURN ===")
+    logger.debug("Structured content keys: %s", list(result["structured_content"].keys()))
+    logger.debug("=== END RETRIEVE TOOL RETURN ===")
 
     return result
@@ -0,0 +1,347 @@
+"""Lightweight in-process tracing for tool calls.
+
+:func:`start_trace` opens a root span for one tool call and :func:`span`
+opens child spans beneath whatever span is current. Outside a trace
+:func:`span` does nothing, so instrumented helpers cost almost nothing when
+called from tests or background work. Finished traces go to an in-memory
+ring buffer (served by ``GET /debug/traces``) and, when
+``INSURANCE_TRACE_OTLP_PATH`` is set, to an OTLP/JSON file for offline
+analysis.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional
+
+from .serialization import dumps
+from .utils import _env_bool, _env_float, _env_int
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "insurance-python"
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    __slots__ = (
+        "trace",
+        "name",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "start_ns",
+        "_started",
+        "duration",
+        "error",
+    )
+
+    def __init__(
+        self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]
+    ) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self._started = time.perf_counter()
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        self.duration = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_offset_ms": round((self.start_ns - self.trace.root.start_ns) / 1e6, 3),
+            "duration_ms": round((self.duration or 0.0) * 1000, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """All spans recorded for one tool call."""
+
+    __slots__ = ("trace_id", "root", "spans", "finished")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.root = Span(self, name, None, attributes)
+        self.spans: List[Span] = [self.root]
+        self.finished = False
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration or 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "request_id": self.root.attributes.get("request_id"),
+            "duration_ms": round(self.duration * 1000, 3),
+            "spans": [span.to_dict() for span in self.spans],
+        }
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "insurance_current_span", default=None
+)
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost active span, or ``None`` outside a trace."""
+    return _current_span.get()
+
+
+class TraceBuffer:
+    """Ring buffer of the most recently finished traces."""
+
+    def __init__(self, max_traces: int = 256) -> None:
+        self._traces: Deque[Trace] = deque(maxlen=max(max_traces, 1))
+
+    def add(self, trace: Trace) -> None:
+        self._traces.append(trace)
+
+    def slowest(self, limit: int = 10) -> List[Trace]:
+        """Return up to ``limit`` buffered traces, slowest first."""
+        return sorted(self._traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+
+    def clear(self) -> None:
+        self._traces.clear()
+
+    def __len__(self) -> int:
+        return len(self._traces)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_span(span: Span) -> Dict[str, Any]:
+    end_ns = span.start_ns + int((span.duration or 0.0) * 1e9)
+    encoded: Dict[str, Any] = {
+        "traceId": span.trace.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": 1,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(end_ns),
+        "attributes": [
+            {"key": key, "value": _otlp_value(value)}
+            for key, value in span.attributes.items()
+            if value is not None
+        ],
+        "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    return encoded
+
+
+def encode_otlp(trace: Trace) -> bytes:
+    """Encode a trace as one OTLP/JSON ``ExportTraceServiceRequest`` line."""
+    return dumps(
+        {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": SERVICE_NAME}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": __name__},
+                            "spans": [_otlp_span(span) for span in trace.spans],
+                        }
+                    ],
+                }
+            ]
+        }
+    ) + b"\n"
+
+
+class OtlpFileExporter:
+    """Append finished traces to a file as OTLP/JSON lines.
+
+    :meth:`export` only buffers the trace; a background task encodes and
+    writes buffered traces from a worker thread every ``flush_interval``
+    seconds. When more than ``max_pending`` traces are waiting, new ones are
+    dropped.
+    """
+
+    def __init__(
+        self, path: Path, *, flush_interval: float = 1.0, max_pending: int = 1000
+    ) -> None:
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self.max_pending = max(max_pending, 1)
+        self._pending: List[Trace] = []
+        self._task: Optional["asyncio.Task[None]"] = None
+        self.exported = 0
+        self.dropped = 0
+
+    def export(self, trace: Trace) -> None:
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append(trace)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+
+    async def flush(self) -> None:
+        traces, self._pending = self._pending, []
+        if traces:
+            await asyncio.to_thread(self._write, traces)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError:
+                logger.exception("Failed to write traces to %s", self.path)
+
+    def _write(self, traces: List[Trace]) -> None:
+        payload = b"".join(encode_otlp(trace) for trace in traces)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("ab") as handle:
+            handle.write(payload)
+        self.exported += len(traces)
+
+
+class Tracer:
+    """Creates traces and hands finished ones to the buffer and exporter."""
+
+    def __init__(
+        self,
+        *,
+        enabled: bool = True,
+        buffer: Optional[TraceBuffer] = None,
+        exporter: Optional[OtlpFileExporter] = None,
+    ) -> None:
+        self.enabled = enabled
+        self.buffer = buffer if buffer is not None else TraceBuffer()
+        self.exporter = exporter
+
+    @classmethod
+    def from_env(cls) -> "Tracer":
+        """Build the tracer from ``INSURANCE_TRACE_*`` environment variables."""
+        otlp_path = os.getenv("INSURANCE_TRACE_OTLP_PATH")
+        exporter = None
+        if otlp_path:
+            exporter = OtlpFileExporter(
+                Path(otlp_path),
+                flush_interval=_env_float("INSURANCE_TRACE_OTLP_FLUSH_SECONDS", 1.0),
+            )
+        return cls(
+            enabled=_env_bool("INSURANCE_TRACING", True),
+            buffer=TraceBuffer(_env_int("INSURANCE_TRACE_BUFFER_SIZE", 256)),
+            exporter=exporter,
+        )
+
+    def finish(self, trace: Trace) -> None:
+        trace.finished = True
+        self.buffer.add(trace)
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+
+tracer = Tracer.from_env()
+
+
+@contextmanager
+def start_trace(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record the enclosed code as the root span of a new trace."""
+    if not tracer.enabled:
+        yield None
+        return
+    trace = Trace(name, attributes)
+    root = trace.root
+    token = _current_span.set(root)
+    try:
+        yield root
+    except BaseException as exc:
+        root.error = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        root.end()
+        tracer.finish(trace)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Record the enclosed code as a child of the current span, if any.
+
+    Spans inherit the trace's ``request_id``. Work that outlives its trace
+    (such as a queued rate job) is not recorded.
+    """
+    parent = _current_span.get()
+    if parent is None or parent.trace.finished:
+        yield None
+        return
+    trace = parent.trace
+    request_id = trace.root.attributes.get("request_id")
+    if request_id is not None:
+        attributes.setdefault("request_id", request_id)
+    child = Span(trace, name, parent.span_id, attributes)
+    trace.spans.append(child)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as exc:
+        child.error = type(exc).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+@asynccontextmanager
+async def tracing_lifespan() -> AsyncIterator[Tracer]:
+    """Run the OTLP file exporter, when configured, for the app's lifetime."""
+    exporter = tracer.exporter
+    if exporter is not None:
+        exporter.start()
+    try:
+        yield tracer
+    finally:
+        if exporter is not None:
+            await exporter.close()
@@ -7,6 +7,7 @@ from uuid import uuid4
 from pydantic import BaseModel, ValidationError
 from typing import Type, cast
 import logging
+import os
 
 from .constants import (
     STATE_ABBREVIATION_TO_NAME,
@@ -35,6 +36,38 @@ def _model_schema(model: Type[BaseModel]) -> Dict[str, Any]:
     return cast(Dict[str, Any], model.model_json_schema(by_alias=True))
 
 
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment, falling back on bad input."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid integer for %s: %r", name, raw)
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment, falling back on bad input."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        logger.warning("Ignoring invalid number for %s: %r", name, raw)
+        return default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean flag from the environment."""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    return raw.strip().lower() in {"1", "true", "yes", "on"}
+
+
 def _sanitize_headers_for_logging(headers: Mapping[str, str]) -> Dict[str, str]:
     """Return a copy of headers with sensitive values masked."""
     sanitized = dict(headers)
@@ -43,32 +76,6 @@ def _sanitize_headers_for_logging(headers: Mapping[str, str]) -> Dict[str, str]:
     return sanitized
 
 
-def _log_network_request(
-    *, method: str, url: str, headers: Mapping[str, str], payload: Mapping[str, Any] | None
-) -> None:
-    """Log an outgoing network request."""
-    logger.info(
-        "Sending %s request to %s with headers=%s payload=%s",
-        method,
-        url,
-        _sanitize_headers_for_logging(headers),
-        payload,
-    )
-
-
-def _log_network_response(
-    *, method: str, url: str, status: int, response_text: str
-) -> None:
-    """Log the response received for a network request."""
-    logger.info(
-        "Received %s response from %s with status=%s body=%s",
-        method,
-        url,
-        status,
-        response_text,
-    )
-
-
 def normalize_state_name(value: Optional[str]) -> Optional[str]:
     """Normalize state values to their canonical long-form name."""
     if value is None or not isinstance(value, str):
@@ -0,0 +1,124 @@
+"""Widget resources built once at startup with precompressed variants.
+
+Each widget's ``resources/read`` result is built a single time, together with
+its serialized JSON, a content hash, and gzip (and, when the optional
+``brotli`` package is installed, brotli) encodings of the HTML. Reads and the
+``/widgets/<name>`` HTTP route then hand out those prebuilt objects and bytes.
+"""
+
+from __future__ import annotations
+
+import gzip
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+import mcp.types as types
+
+from .constants import MIME_TYPE
+from .widget_registry import WidgetDefinition, _tool_meta, widget_content_hash, widgets
+
+try:  # pragma: no cover - optional dependency
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore[assignment]
+
+WIDGET_ROUTE_PREFIX = "/widgets/"
+_TEMPLATE_URI_PREFIX = "ui://widget/"
+
+
+@dataclass(frozen=True)
+class WidgetAsset:
+    """Prebuilt read result and HTTP bodies for one widget.
+
+    ``encodings`` maps a ``Content-Encoding`` value (``identity``, ``gzip``,
+    ``br``) to the body in that encoding.
+    """
+
+    uri: str
+    content_hash: str
+    read_result: types.ServerResult
+    read_result_json: bytes
+    encodings: Dict[str, bytes]
+
+    def etag(self, encoding: str) -> str:
+        """Return the strong ETag for the body in ``encoding``."""
+        if encoding == "identity":
+            return f'"{self.content_hash}"'
+        return f'"{self.content_hash}-{encoding}"'
+
+
+def widget_path(template_uri: str) -> Optional[str]:
+    """Return the ``/widgets/<name>`` path for a ``ui://widget/<name>`` URI."""
+    if not template_uri.startswith(_TEMPLATE_URI_PREFIX):
+        return None
+    return WIDGET_ROUTE_PREFIX + template_uri[len(_TEMPLATE_URI_PREFIX):]
+
+
+def build_widget_asset(widget: WidgetDefinition) -> WidgetAsset:
+    """Build the read result, content hash, and compressed bodies for a widget."""
+    html = widget.html.encode("utf-8")
+    read_result = types.ServerResult(
+        types.ReadResourceResult(
+            contents=[
+                types.TextResourceContents(
+                    uri=widget.template_uri,
+                    mimeType=MIME_TYPE,
+                    text=widget.html,
+                    _meta=_tool_meta(widget),
+                )
+            ]
+        )
+    )
+    encodings = {"identity": html, "gzip": gzip.compress(html, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings["br"] = brotli.compress(html, quality=11)
+    return WidgetAsset(
+        uri=widget.template_uri,
+        content_hash=widget_content_hash(widget),
+        read_result=read_result,
+        read_result_json=read_result.model_dump_json(by_alias=True, exclude_none=True).encode(
+            "utf-8"
+        ),
+        encodings=encodings,
+    )
+
+
+def build_widget_assets(definitions: Iterable[WidgetDefinition]) -> Dict[str, WidgetAsset]:
+    """Build assets for every widget, keyed by template URI."""
+    return {widget.template_uri: build_widget_asset(widget) for widget in definitions}
+
+
+WIDGET_ASSETS: Dict[str, WidgetAsset] = build_widget_assets(widgets)
+WIDGET_ASSETS_BY_PATH: Dict[str, WidgetAsset] = {
+    widget_path(uri): asset for uri, asset in WIDGET_ASSETS.items() if widget_path(uri)
+}
+
+
+def choose_encoding(asset: WidgetAsset, accept_encoding: str) -> str:
+    """Pick the smallest encoding the client accepts (``br`` > ``gzip`` > identity)."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        key, _, value = params.partition("=")
+        if key.strip() == "q":
+            try:
+                if float(value) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name.strip())
+    for encoding in ("br", "gzip"):
+        if encoding in asset.encodings and (encoding in accepted or "*" in accepted):
+            return encoding
+    return "identity"
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return ``True`` when an ``If-None-Match`` header matches ``etag``."""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
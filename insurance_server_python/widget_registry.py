@@ -1,14 +1,21 @@
 """Widget definitions and tool registry for the insurance server."""
 
+import hashlib
+import logging
+import os
 from copy import deepcopy
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import mcp.types as types
 
 from .insurance_state_widget import INSURANCE_STATE_WIDGET_HTML
 from .insurance_rate_results_widget import INSURANCE_RATE_RESULTS_WIDGET_HTML
 from .constants import MIME_TYPE
+from .minify import MinifyReport, minify_with_report
 from .models import ToolHandler
+from .utils import _env_bool
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -34,15 +41,39 @@ class ToolRegistration:
     handler: ToolHandler
     default_response_text: Optional[str]
     default_meta: Optional[Dict[str, Any]] = None
+    # Seconds the handler may run before the call returns a "still
+    # processing" result; upstream calls inherit it as their deadline.
+    time_budget: Optional[float] = None
+
+
+@dataclass(frozen=True)
+class RegistrySnapshot:
+    """Pre-built list responses for the registry as it stood when frozen.
+
+    The results are shared by every request and must not be mutated. The
+    ``*_json`` fields hold the same results serialized for the legacy HTTP
+    route, and ``version`` changes only when those bytes change.
+    """
+
+    version: str
+    list_tools: types.ServerResult
+    list_resources: types.ServerResult
+    list_resource_templates: types.ServerResult
+    list_tools_json: bytes
+    list_resources_json: bytes
+    list_resource_templates_json: bytes
 
 
 # Tool registry
 TOOL_REGISTRY: Dict[str, ToolRegistration] = {}
+_snapshot: Optional[RegistrySnapshot] = None
 
 
 def register_tool(registration: ToolRegistration) -> None:
     """Register a tool so it can be listed and invoked."""
+    global _snapshot
     TOOL_REGISTRY[registration.tool.name] = registration
+    _snapshot = None
 
 
 # Widget identifiers and URIs
@@ -51,6 +82,31 @@ INSURANCE_STATE_WIDGET_TEMPLATE_URI = "ui://widget/insurance-state.html"
 INSURANCE_RATE_RESULTS_WIDGET_IDENTIFIER = "insurance-rate-results"
 INSURANCE_RATE_RESULTS_WIDGET_TEMPLATE_URI = "ui://widget/insurance-rate-results.html"
 
+# Minification reports for the widgets built at import, in definition order.
+WIDGET_MINIFY_REPORTS: List[MinifyReport] = []
+
+
+def _widget_html(name: str, html: str) -> str:
+    """Return ``html`` minified unless ``INSURANCE_MINIFY_WIDGETS`` is off.
+
+    ``INSURANCE_WIDGET_TESTING`` keeps the widgets' ``console`` debug logging.
+    """
+    if not _env_bool("INSURANCE_MINIFY_WIDGETS", True):
+        return html
+    minified, report = minify_with_report(
+        name, html, is_testing=_env_bool("INSURANCE_WIDGET_TESTING", False)
+    )
+    WIDGET_MINIFY_REPORTS.append(report)
+    logger.info(
+        "Minified widget %s: %d -> %d bytes (saved %d)",
+        name,
+        report.original_bytes,
+        report.minified_bytes,
+        report.saved_bytes,
+    )
+    return minified
+
+
 # Input schema for insurance state selector
 INSURANCE_STATE_INPUT_SCHEMA: Dict[str, Any] = {
     "type": "object",
@@ -71,7 +127,7 @@ DEFAULT_WIDGETS: Tuple[WidgetDefinition, ...] = (
         template_uri=INSURANCE_STATE_WIDGET_TEMPLATE_URI,
         invoking="Collecting a customer's state",
         invoked="Captured the customer's state",
-        html=INSURANCE_STATE_WIDGET_HTML,
+        html=_widget_html(INSURANCE_STATE_WIDGET_IDENTIFIER, INSURANCE_STATE_WIDGET_HTML),
         response_text=None,
         input_schema=INSURANCE_STATE_INPUT_SCHEMA,
         tool_description=
@@ -86,7 +142,9 @@ ADDITIONAL_WIDGETS: Tuple[WidgetDefinition, ...] = (
         template_uri=INSURANCE_RATE_RESULTS_WIDGET_TEMPLATE_URI,
         invoking="Retrieving personal auto rate results",
         invoked="Displayed personal auto rate results",
-        html=INSURANCE_RATE_RESULTS_WIDGET_HTML,
+        html=_widget_html(
+            INSURANCE_RATE_RESULTS_WIDGET_IDENTIFIER, INSURANCE_RATE_RESULTS_WIDGET_HTML
+        ),
         response_text="Here are the carrier premiums returned for this quote.",
         input_schema=None,
         tool_description=(
@@ -158,6 +216,100 @@ def _tool_meta(widget: WidgetDefinition) -> Dict[str, Any]:
     }
 
 
+def _serialize_result(result: types.ServerResult) -> bytes:
+    return result.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+
+
+def _build_snapshot() -> RegistrySnapshot:
+    list_tools = types.ServerResult(
+        types.ListToolsResult(
+            tools=[deepcopy(registration.tool) for registration in TOOL_REGISTRY.values()]
+        )
+    )
+    list_resources = types.ServerResult(
+        types.ListResourcesResult(
+            resources=[
+                types.Resource(
+                    name=widget.title,
+                    title=widget.title,
+                    uri=widget.template_uri,
+                    description=_resource_description(widget),
+                    mimeType=MIME_TYPE,
+                    _meta=_tool_meta(widget),
+                )
+                for widget in widgets
+            ]
+        )
+    )
+    list_resource_templates = types.ServerResult(
+        types.ListResourceTemplatesResult(
+            resourceTemplates=[
+                types.ResourceTemplate(
+                    name=widget.title,
+                    title=widget.title,
+                    uriTemplate=widget.template_uri,
+                    description=_resource_description(widget),
+                    mimeType=MIME_TYPE,
+                    _meta=_tool_meta(widget),
+                )
+                for widget in widgets
+            ]
+        )
+    )
+    encoded = [
+        _serialize_result(result)
+        for result in (list_tools, list_resources, list_resource_templates)
+    ]
+    digest = hashlib.sha256()
+    for chunk in encoded:
+        digest.update(chunk)
+    return RegistrySnapshot(
+        version=digest.hexdigest()[:16],
+        list_tools=list_tools,
+        list_resources=list_resources,
+        list_resource_templates=list_resource_templates,
+        list_tools_json=encoded[0],
+        list_resources_json=encoded[1],
+        list_resource_templates_json=encoded[2],
+    )
+
+
+def registry_snapshot() -> RegistrySnapshot:
+    """Return the frozen list responses, rebuilding them after a registration."""
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is None:
+        snapshot = _snapshot = _build_snapshot()
+    return snapshot
+
+
+def widget_content_hash(widget: WidgetDefinition) -> str:
+    """Return a short hash of the widget HTML that changes with its content."""
+    return hashlib.sha256(widget.html.encode("utf-8")).hexdigest()[:16]
+
+
+def _widget_meta_mode() -> str:
+    """Return ``reference`` (the default) or ``embedded`` from ``INSURANCE_WIDGET_META``."""
+    mode = os.getenv("INSURANCE_WIDGET_META", "reference").strip().lower()
+    return "embedded" if mode == "embedded" else "reference"
+
+
+def _widget_result_meta(widget: WidgetDefinition) -> Dict[str, Any]:
+    """Return the ``_meta`` entries that point a tool or result at its widget.
+
+    In ``reference`` mode these are the output template URI and a content
+    hash, and the client fetches the HTML once with ``resources/read``. In
+    ``embedded`` mode the full widget resource is included, as older clients
+    expect.
+    """
+    if _widget_meta_mode() == "embedded":
+        return {"openai.com/widget": _embedded_widget_resource(widget).model_dump(mode="json")}
+    return {
+        "openai/outputTemplate": widget.template_uri,
+        "openai/widgetContentHash": widget_content_hash(widget),
+    }
+
+
 def _embedded_widget_resource(widget: WidgetDefinition) -> types.EmbeddedResource:
     """Create an embedded widget resource for a widget."""
     return types.EmbeddedResource(
@@ -193,14 +345,11 @@ def _register_default_tools() -> None:
             _meta=meta,
         )
 
-        widget_resource = _embedded_widget_resource(widget)
-        default_meta = {
-            **meta,
-            "openai.com/widget": widget_resource.model_dump(mode="json"),
-        }
+        widget_meta = _widget_result_meta(widget)
+        default_meta = {**meta, **widget_meta}
 
         # Create a closure to capture widget-specific data
-        def make_handler(w_id: str, w_meta: dict, w_resource: dict):
+        def make_handler(w_id: str, w_meta: dict, w_resource: Optional[dict]):
             def handler(arguments):
                 return _insurance_state_tool_handler(arguments, w_id, w_meta, w_resource)
             return handler
@@ -208,7 +357,9 @@ def _register_default_tools() -> None:
         register_tool(
             ToolRegistration(
                 tool=tool,
-                handler=make_handler(widget.identifier, meta, widget_resource.model_dump(mode="json")),
+                handler=make_handler(
+                    widget.identifier, default_meta, widget_meta.get("openai.com/widget")
+                ),
                 default_response_text=widget.response_text,
                 default_meta=default_meta,
             )
@@ -219,15 +370,17 @@ def _register_personal_auto_intake_tools() -> None:
     """Register personal auto insurance intake tools."""
     from .tool_handlers import (
         _collect_personal_auto_customer,
+        _compare_personal_auto_coverage_variants,
         _request_personal_auto_rate,
         _retrieve_personal_auto_rate_results,
     )
     from .models import (
+        PersonalAutoCoverageWhatIfRequest,
         PersonalAutoCustomerIntake,
         PersonalAutoRateRequest,
         PersonalAutoRateResultsRequest,
     )
-    from .utils import _model_schema
+    from .utils import _env_float, _model_schema
     from .constants import AIS_POLICY_COVERAGE_SUMMARY
 
     register_tool(
@@ -256,7 +409,7 @@ def _register_personal_auto_intake_tools() -> None:
     }
     rate_results_default_meta = {
         **rate_results_meta,
-        "openai.com/widget": _embedded_widget_resource(rate_results_widget).model_dump(mode="json"),
+        **_widget_result_meta(rate_results_widget),
     }
 
     rate_tool_description = (
@@ -270,9 +423,7 @@ def _register_personal_auto_intake_tools() -> None:
     rate_tool_meta = {
         "openai/widgetAccessible": True,
         "openai/resultCanProduceWidget": True,
-        "openai.com/widget": _embedded_widget_resource(rate_results_widget).model_dump(
-            mode="json"
-        ),
+        **_widget_result_meta(rate_results_widget),
         "annotations": {
             "destructiveHint": False,
             "openWorldHint": False,
@@ -291,6 +442,34 @@ def _register_personal_auto_intake_tools() -> None:
             ),
             handler=_request_personal_auto_rate,
             default_response_text="Submitted personal auto rating request.",
+            time_budget=_env_float("INSURANCE_RATE_TOOL_TIME_BUDGET_SECONDS", 25.0),
+        )
+    )
+
+    register_tool(
+        ToolRegistration(
+            tool=types.Tool(
+                name="compare-personal-auto-coverage-options",
+                title="Compare personal auto coverage options",
+                description=(
+                    "Rate several coverage variants of one personal auto quote at once and return a premium "
+                    "matrix (variants by carrier). Use this when the user asks 'what if' questions about "
+                    "different limits, e.g. 100/300 BI or 50000 PD, instead of re-running the rate tool for "
+                    "each option. Pass the complete rate request as BaseRequest and one PolicyCoverages "
+                    f"object per option as CoverageVariants. Limits must match AIS enumerations ({AIS_POLICY_COVERAGE_SUMMARY})."
+                ),
+                inputSchema=_model_schema(PersonalAutoCoverageWhatIfRequest),
+                _meta={
+                    "annotations": {
+                        "destructiveHint": False,
+                        "openWorldHint": False,
+                        "readOnlyHint": False,
+                    },
+                },
+            ),
+            handler=_compare_personal_auto_coverage_variants,
+            default_response_text="Rated personal auto coverage variants.",
+            time_budget=_env_float("INSURANCE_WHATIF_TOOL_TIME_BUDGET_SECONDS", 45.0),
         )
     )
 
@@ -310,6 +489,7 @@ def _register_personal_auto_intake_tools() -> None:
             ),
             handler=_retrieve_personal_auto_rate_results,
             default_response_text="Retrieved personal auto rate results.",
+            time_budget=_env_float("INSURANCE_RETRIEVE_TOOL_TIME_BUDGET_SECONDS", 15.0),
             default_meta=rate_results_default_meta,
         )
     )
@@ -318,3 +498,4 @@ def _register_personal_auto_intake_tools() -> None:
 # Initialize the registry
 _register_default_tools()
 _register_personal_auto_intake_tools()
+registry_snapshot()